@@ -0,0 +1,215 @@
+import random
+
+from django.db import transaction
+
+from cms.export import closure_sql
+from cms.export.graph import RELATION_FIELDS
+from cms.models import Gloss, Language, Situation
+from cms.models.gloss import normalize_search_key
+
+
+# Average number of edges per gloss for each relation type
+DEFAULT_EDGE_DENSITY = {
+    "contains": 0.5,
+    "translations": 1.0,
+    "near_synonyms": 0.2,
+    "near_homophones": 0.1,
+    "clarifies_usage": 0.1,
+    "to_be_differentiated_from": 0.1,
+    "collocations": 0.2,
+}
+
+# Same-language edges only point this many glosses back, so closures stay
+# local like in hand-curated data instead of spanning the whole corpus
+NEIGHBOURHOOD = 50
+
+BATCH_SIZE = 2000
+
+
+def generate_corpus(
+    languages=5,
+    glosses_per_language=200,
+    situations=50,
+    edge_density=None,
+    paraphrase_ratio=0.1,
+    glosses_per_situation=5,
+    prefix="z",
+    seed=0,
+):
+    """
+    Fill the database with a synthetic, reproducible gloss corpus.
+
+    Gloss n of every language stands for the same concept, so translations
+    connect glosses with the same index across languages. All other relations
+    stay within one language and point to recent glosses; contains only points
+    to earlier glosses, which keeps it acyclic. Every situation is described in
+    every language and starts from glosses_per_situation random glosses.
+
+    Rows are written with bulk_create, so no signals fire; the new glosses are
+    not related to existing ones, so no cached export goes stale. The closure
+    table is filled for the new situations at the end.
+
+    Args:
+        languages: Number of languages (ISO codes are prefix + two digits)
+        glosses_per_language: Glosses created per language
+        situations: Number of situations
+        edge_density: Dict of relation field -> average edges per gloss,
+                      merged over DEFAULT_EDGE_DENSITY
+        paraphrase_ratio: Share of glosses whose content is [paraphrased]
+        glosses_per_situation: Root glosses per situation
+        prefix: One-letter prefix of language codes and situation ids
+        seed: Random seed
+
+    Returns:
+        Dict with the number of created languages, glosses, edges and situations
+
+    Raises:
+        ValueError: If the parameters are out of range or languages with the
+                    generated ISO codes already exist
+    """
+    density = {**DEFAULT_EDGE_DENSITY, **(edge_density or {})}
+    unknown = set(density) - set(RELATION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown relation types: {', '.join(sorted(unknown))}")
+    if len(prefix) != 1 or not 2 <= languages <= 100:
+        raise ValueError("Use a one-letter prefix and between 2 and 100 languages.")
+    if not 0 <= paraphrase_ratio <= 1:
+        raise ValueError("paraphrase_ratio must be between 0 and 1.")
+
+    rng = random.Random(seed)
+    isos = [f"{prefix}{index:02d}" for index in range(languages)]
+    if Language.objects.filter(iso__in=isos).exists():
+        raise ValueError(f"Languages {isos[0]}..{isos[-1]} already exist.")
+
+    with transaction.atomic():
+        Language.objects.bulk_create(
+            Language(iso=iso, name=f"Synthetic {iso}") for iso in isos
+        )
+
+        gloss_ids = {}
+        for iso in isos:
+            glosses = Gloss.objects.bulk_create(
+                (
+                    _gloss(
+                        f"[{iso} phrase {index}]" if rng.random() < paraphrase_ratio
+                        else f"{iso} word {index}",
+                        iso,
+                    )
+                    for index in range(glosses_per_language)
+                ),
+                batch_size=BATCH_SIZE,
+            )
+            gloss_ids[iso] = [gloss.pk for gloss in glosses]
+
+        edge_count = 0
+        for field_name in RELATION_FIELDS:
+            pairs = _relation_pairs(rng, field_name, gloss_ids, density[field_name])
+            edge_count += _write_pairs(field_name, pairs)
+
+        situation_objects = Situation.objects.bulk_create(
+            Situation(id=f"{prefix}-situation-{index}") for index in range(situations)
+        )
+        descriptions = Gloss.objects.bulk_create(
+            (
+                _gloss(f"[{situation.id} in {iso}]", iso)
+                for situation in situation_objects
+                for iso in isos
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        all_ids = [gloss_id for ids in gloss_ids.values() for gloss_id in ids]
+        Situation.glosses.through.objects.bulk_create(
+            (
+                Situation.glosses.through(situation_id=situation.id, gloss_id=gloss_id)
+                for situation in situation_objects
+                for gloss_id in rng.sample(all_ids, min(glosses_per_situation, len(all_ids)))
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        Situation.descriptions.through.objects.bulk_create(
+            (
+                Situation.descriptions.through(
+                    situation_id=situation_objects[index // languages].id, gloss_id=gloss.pk
+                )
+                for index, gloss in enumerate(descriptions)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        closure_sql.refresh_situation_closure(situation.id for situation in situation_objects)
+
+    return {
+        "languages": languages,
+        "glosses": len(all_ids) + len(descriptions),
+        "edges": edge_count,
+        "situations": situations,
+    }
+
+
+def _gloss(content, language_iso):
+    # bulk_create bypasses Gloss.save(), which fills search_key
+    return Gloss(content=content, language_id=language_iso, search_key=normalize_search_key(content))
+
+
+def _relation_pairs(rng, field_name, gloss_ids, density):
+    """Yield (from_id, to_id) pairs for one relation type."""
+    isos = list(gloss_ids)
+    for iso, ids in gloss_ids.items():
+        for index, gloss_id in enumerate(ids):
+            for _ in range(_edge_count(rng, density)):
+                if field_name == "translations":
+                    other_iso = rng.choice([other for other in isos if other != iso])
+                    other_ids = gloss_ids[other_iso]
+                    if index < len(other_ids):
+                        yield gloss_id, other_ids[index]
+                elif field_name == "contains":
+                    if index:
+                        yield gloss_id, ids[rng.randrange(max(0, index - NEIGHBOURHOOD), index)]
+                else:
+                    start = max(0, index - NEIGHBOURHOOD)
+                    related_index = rng.randrange(start, min(len(ids), index + NEIGHBOURHOOD))
+                    if related_index != index:
+                        yield gloss_id, ids[related_index]
+
+
+def _edge_count(rng, density):
+    """Whole part of density, plus one more edge with the fractional probability."""
+    count = int(density)
+    if rng.random() < density - count:
+        count += 1
+    return count
+
+
+def _write_pairs(field_name, pairs):
+    """Insert pairs into the relation's through table; returns edges written."""
+    field = Gloss._meta.get_field(field_name)
+    rows = set()
+    for from_id, to_id in pairs:
+        rows.add((from_id, to_id))
+        if field.remote_field.symmetrical:
+            rows.add((to_id, from_id))
+
+    through = field.remote_field.through
+    through.objects.bulk_create(
+        (through(from_gloss_id=from_id, to_gloss_id=to_id) for from_id, to_id in sorted(rows)),
+        batch_size=BATCH_SIZE,
+    )
+    return len(rows)
+
+
+def parse_edge_density(values):
+    """
+    Parse FIELD=VALUE strings into an edge_density dict for generate_corpus().
+
+    Raises:
+        ValueError: If a value is malformed or negative
+    """
+    density = {}
+    for value in values or ():
+        field_name, _, number = value.partition("=")
+        try:
+            density[field_name] = float(number)
+        except ValueError:
+            raise ValueError(f"Invalid density {value!r}, expected FIELD=NUMBER") from None
+        if density[field_name] < 0:
+            raise ValueError(f"Invalid density {value!r}, must not be negative")
+    return density
@@ -0,0 +1,125 @@
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from cms.export.closure_sql import collect_gloss_rows
+from cms.export.graph import RELATION_FIELDS, GlossGraph
+from cms.export.serialize import serialize_gloss_to_jsonl
+from cms.export.situations import SituationDescriptions
+from cms.models import Gloss, Language, Situation, SituationExportCache
+from cms.views import gloss_download_all, situation_download_all
+from cms.views.gloss.utils import collect_glosses_recursively
+
+
+def measure(stage, function):
+    """
+    Run function once and record wall time, query count and peak memory.
+
+    Memory is the peak of Python allocations traced by tracemalloc while the
+    stage runs, so allocations in worker processes are not included. Tracing
+    slows allocation-heavy code down, which affects every run alike.
+
+    Returns:
+        Dict with stage, seconds, queries, peak_memory_bytes and the value
+        returned by function as items
+    """
+    queries = _QueryCounter()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(queries):
+            items = function()
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "stage": stage,
+        "seconds": round(seconds, 4),
+        "queries": queries.count,
+        "peak_memory_bytes": peak,
+        "items": items,
+    }
+
+
+class _QueryCounter:
+    """Execute wrapper counting queries, without the 9000 entry debug log limit."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_export_stages(workers=1, sample_situations=3, sample_glosses=500):
+    """
+    Measure every export stage against the current database.
+
+    The ORM traversal, its recursive CTE counterpart and the serializer are
+    measured on samples, since they are per-situation and per-gloss
+    operations; the Download All views export everything, first with an empty
+    export cache and then with a warm one.
+
+    Returns:
+        List of measure() results; items is the number of glosses or bytes produced
+    """
+    factory = RequestFactory()
+    stages = []
+
+    stages.append(measure("graph_load", lambda: len(GlossGraph.load().contents)))
+
+    def collect(collect_glosses):
+        all_languages = list(Language.objects.all())
+        situations = Situation.objects.order_by("pk")[:sample_situations]
+        descriptions = SituationDescriptions.load(all_languages, situations)
+        collected = 0
+        for situation in situations:
+            for target_lang, native_lang in descriptions.pairs(situation.id):
+                collected += len(collect_glosses(situation, native_lang.iso, target_lang.iso))
+        return collected
+    stages.append(measure("collect_glosses_recursively", lambda: collect(collect_glosses_recursively)))
+    stages.append(measure("collect_gloss_rows", lambda: collect(
+        lambda situation, native_iso, target_iso: collect_gloss_rows(situation.id, native_iso, target_iso)
+    )))
+
+    def serialize():
+        glosses = Gloss.objects.select_related("language").prefetch_related(
+            *(f"{field_name}__language" for field_name in RELATION_FIELDS),
+            "usage_of_clarified__language",
+        ).order_by("pk")[:sample_glosses]
+        return sum(1 for gloss in glosses if serialize_gloss_to_jsonl(gloss))
+    stages.append(measure("serialize_gloss_to_jsonl", serialize))
+
+    def download(view, request):
+        response = view(request)
+        if getattr(response, "streaming", False):
+            return sum(len(chunk) for chunk in response.streaming_content)
+        return len(response.content)
+
+    with override_settings(EXPORT_WORKERS=workers):
+        SituationExportCache.objects.all().delete()
+        for stage in ("situation_download_all", "situation_download_all_cached"):
+            stages.append(measure(stage, lambda: download(situation_download_all, factory.post("/"))))
+        stages.append(measure("gloss_download_all", lambda: download(gloss_download_all, factory.get("/"))))
+    return stages
+
+
+def compare_runs(previous, current):
+    """
+    Yield (glosses, stage, previous, current) rows for stages present in both
+    result files, matching runs by corpus size.
+    """
+    previous_runs = {run["glosses"]: run for run in previous["runs"]}
+    for run in current["runs"]:
+        previous_run = previous_runs.get(run["glosses"])
+        if previous_run is None:
+            continue
+        previous_stages = {stage["stage"]: stage for stage in previous_run["stages"]}
+        for stage in run["stages"]:
+            if stage["stage"] in previous_stages:
+                yield run["glosses"], stage["stage"], previous_stages[stage["stage"]], stage
+
@@ -0,0 +1,72 @@
+import io
+import zipfile
+from pathlib import Path
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def write_zip(fileobj, files):
+    """Write (filename, content) pairs into a deflated ZIP on fileobj."""
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for filename, content in files:
+            zip_file.writestr(filename, content)
+
+
+def iter_zip_stream(files):
+    """
+    Yield a deflated ZIP of (filename, content) pairs as byte chunks.
+
+    Each entry is compressed and handed out as soon as it is written, so only
+    one entry is held in memory at a time. The central directory comes last.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for filename, content in files:
+            zip_file.writestr(filename, content)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    yield sink.drain()
+
+
+class DirectoryWriter:
+    """Write archive entries as files below a root directory."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def __enter__(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def writestr(self, filename, content):
+        path = self.root / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def open_archive(path):
+    """Open a ZIP writer for *.zip paths, otherwise a DirectoryWriter on path."""
+    if str(path).endswith(".zip"):
+        return zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+    return DirectoryWriter(path)
@@ -0,0 +1,179 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from cms.models import Situation, SituationExportCache, SituationExportDependency
+
+from .engine import iter_situation_entries
+from .graph import GlossGraph
+from .situations import SituationDescriptions, compute_situation_entries
+
+
+def iter_cached_situation_exports(all_languages, situations=None, workers=1, progress=None, only_pairs=None):
+    """
+    Yield situation exports, reusing cached entries where they are still valid.
+
+    A situation is recomputed only if some of its candidate pairs have no cache
+    entry, which happens after signals invalidated the entries depending on an
+    edited gloss or situation. The GlossGraph snapshot is loaded only if at
+    least one situation has to be recomputed. Fresh entries are stored as they
+    are yielded, in situation order.
+
+    Entries are not checked against the data they were built from. Writes that
+    skip signals (bulk_create, QuerySet.update, raw SQL) must call
+    invalidate_glosses() or invalidate_situations(), as the ingest services do.
+
+    Entries are read one situation at a time while the export streams, so an
+    edit made meanwhile can drop entries checked above; such a situation is
+    recomputed in-process against a snapshot loaded at that point.
+
+    Args:
+        all_languages: List of Language objects, in pair loop order
+        situations: Optional Situation queryset (defaults to all situations)
+        workers: Number of worker processes used for recomputation
+        progress: Optional callable receiving the number of situations done
+        only_pairs: Optional set of (target_iso, native_iso) pairs; other
+                    pairs are neither read, computed nor replaced in the cache
+
+    Yields:
+        Export dicts as produced by export_situation()
+    """
+    if situations is None:
+        situations = Situation.objects.all()
+    situations = situations.order_by("pk")
+
+    descriptions = SituationDescriptions.load(all_languages, situations, only_pairs)
+    cached_pairs = defaultdict(set)
+    for situation_id, target_iso, native_iso in SituationExportCache.objects.values_list(
+        "situation_id", "target_iso", "native_iso"
+    ):
+        cached_pairs[situation_id].add((target_iso, native_iso))
+
+    pairs_by_situation = {}
+    stale_ids = []
+    for situation_id in situations.values_list("id", flat=True):
+        pairs = [
+            (target_lang.iso, native_lang.iso)
+            for target_lang, native_lang in descriptions.pairs(situation_id)
+        ]
+        pairs_by_situation[situation_id] = pairs
+        cached = cached_pairs[situation_id]
+        if only_pairs is not None:
+            # Entries of other pairs are neither read nor replaced
+            cached = cached & set(pairs)
+        if set(pairs) != cached:
+            stale_ids.append(situation_id)
+
+    fresh_entries = None
+    if stale_ids:
+        graph = GlossGraph.load()
+        fresh_entries = iter_situation_entries(
+            graph,
+            all_languages,
+            Situation.objects.filter(pk__in=stale_ids).order_by("pk"),
+            workers,
+            with_dependencies=True,
+            descriptions=descriptions,
+        )
+
+    stale = set(stale_ids)
+    late_graph = None
+    for done, (situation_id, pairs) in enumerate(pairs_by_situation.items(), start=1):
+        if progress:
+            progress(done)
+        if situation_id in stale:
+            fresh_situation_id, entries = next(fresh_entries)
+            store_situation_entries(fresh_situation_id, entries, partial=only_pairs is not None)
+            exports = [entry["export"] for entry in entries]
+        elif not pairs:
+            continue
+        else:
+            exports = _load_situation_exports(situation_id, pairs)
+            if exports is None:
+                # Invalidated since the staleness check
+                situation = Situation.objects.filter(pk=situation_id).first()
+                if situation is None:
+                    continue
+                if late_graph is None:
+                    late_graph = GlossGraph.load()
+                entries = compute_situation_entries(late_graph, descriptions, situation, with_dependencies=True)
+                store_situation_entries(situation_id, entries, partial=only_pairs is not None)
+                exports = [entry["export"] for entry in entries]
+        for export in exports:
+            if export is not None:
+                yield export
+
+
+def store_situation_entries(situation_id, entries, partial=False):
+    """
+    Replace the cached entries of a situation with freshly computed ones.
+
+    With partial, only the entries of the pairs in entries are replaced and
+    those of other pairs are kept.
+    """
+    with transaction.atomic():
+        stored = SituationExportCache.objects.filter(situation_id=situation_id)
+        if partial:
+            pairs = Q()
+            for entry in entries:
+                pairs |= Q(target_iso=entry["target_iso"], native_iso=entry["native_iso"])
+            stored = stored.filter(pairs) if entries else stored.none()
+        stored.delete()
+        cache_entries = SituationExportCache.objects.bulk_create(
+            SituationExportCache(
+                situation_id=situation_id,
+                target_iso=entry["target_iso"],
+                native_iso=entry["native_iso"],
+                jsonl_content=entry["export"]["jsonl_content"] if entry["export"] else "",
+                index_row=entry["export"]["index_row"] if entry["export"] else None,
+            )
+            for entry in entries
+        )
+        SituationExportDependency.objects.bulk_create(
+            SituationExportDependency(entry=cache_entry, gloss_id=gloss_id)
+            for cache_entry, entry in zip(cache_entries, entries)
+            for gloss_id in entry["dependencies"]
+        )
+
+
+def invalidate_glosses(gloss_ids):
+    """Drop every cache entry that depends on one of gloss_ids."""
+    gloss_ids = [gloss_id for gloss_id in gloss_ids if gloss_id is not None]
+    if not gloss_ids:
+        return
+    entry_ids = SituationExportDependency.objects.filter(gloss_id__in=gloss_ids).values("entry_id")
+    SituationExportCache.objects.filter(pk__in=entry_ids).delete()
+
+
+def invalidate_situations(situation_ids):
+    """Drop every cache entry of the given situations."""
+    SituationExportCache.objects.filter(situation_id__in=list(situation_ids)).delete()
+
+
+def _load_situation_exports(situation_id, pairs):
+    """
+    Rebuild export dicts for a situation from its cache entries, in pair order.
+
+    Returns None if an entry of one of the pairs is missing.
+    """
+    cached = {
+        (entry.target_iso, entry.native_iso): entry
+        for entry in SituationExportCache.objects.filter(situation_id=situation_id)
+    }
+    if any(pair not in cached for pair in pairs):
+        return None
+    exports = []
+    for target_iso, native_iso in pairs:
+        entry = cached[(target_iso, native_iso)]
+        if entry.index_row is None:
+            exports.append(None)
+            continue
+        exports.append({
+            "situation_id": situation_id,
+            "target_iso": target_iso,
+            "native_iso": native_iso,
+            "jsonl_content": entry.jsonl_content,
+            "index_row": entry.index_row,
+        })
+    return exports
@@ -0,0 +1,199 @@
+from collections import deque
+
+
+# Relationship fields expanded in phase 2 (plus reverse clarifies_usage)
+PHASE2_FIELDS = [
+    "near_synonyms",
+    "near_homophones",
+    "clarifies_usage",
+    "to_be_differentiated_from",
+    "collocations",
+    "usage_of_clarified",
+]
+
+
+def collect_gloss_ids(graph, situation_id, native_language_iso, target_language_iso):
+    """
+    In-memory equivalent of collect_glosses_recursively() on a GlossGraph.
+
+    Follows the same two phases and visiting order, so the returned ids match
+    the glosses returned by the ORM implementation one for one.
+
+    Args:
+        graph: GlossGraph snapshot
+        situation_id: Situation primary key
+        native_language_iso: ISO code of native language (str)
+        target_language_iso: ISO code of target language (str)
+
+    Returns:
+        List of gloss ids
+    """
+    languages = graph.languages
+    pair_languages = (native_language_iso, target_language_iso)
+
+    # PHASE 1: BFS over contains and native<->target translations
+    visited = set()
+    result_ids = []
+    queue = deque(graph.situation_glosses.get(situation_id, ()))
+
+    while queue:
+        gloss_id = queue.popleft()
+        if gloss_id in visited:
+            continue
+        visited.add(gloss_id)
+        result_ids.append(gloss_id)
+
+        for contained_id in graph.neighbours("contains", gloss_id):
+            if languages[contained_id] in pair_languages and contained_id not in visited:
+                queue.append(contained_id)
+
+        current_language = languages[gloss_id]
+        if current_language == native_language_iso:
+            wanted_language = target_language_iso
+        elif current_language == target_language_iso:
+            wanted_language = native_language_iso
+        else:
+            continue
+        for translation_id in graph.neighbours("translations", gloss_id):
+            if languages[translation_id] == wanted_language and translation_id not in visited:
+                queue.append(translation_id)
+
+    # PHASE 2: related glosses and their translations at 1.5 depth
+    additional_ids = []
+    for gloss_id in list(result_ids):
+        current_language = languages[gloss_id]
+        if current_language == native_language_iso:
+            other_language_iso = target_language_iso
+        elif current_language == target_language_iso:
+            other_language_iso = native_language_iso
+        else:
+            continue
+
+        for field_name in PHASE2_FIELDS:
+            for related_id in graph.neighbours(field_name, gloss_id):
+                if related_id not in visited:
+                    visited.add(related_id)
+                    additional_ids.append(related_id)
+
+                for translation_id in graph.neighbours("translations", related_id):
+                    if languages[translation_id] == other_language_iso and translation_id not in visited:
+                        visited.add(translation_id)
+                        additional_ids.append(translation_id)
+
+    result_ids.extend(additional_ids)
+    return result_ids
+
+
+def collect_gloss_ids_for_pairs(graph, situation_id, language_pairs):
+    """
+    Collect gloss ids for many (native, target) pairs in one traversal.
+
+    The collection rules are symmetric in native and target, so both orders of a
+    language pair share one result. Phase 1 runs a single BFS whose queue entries
+    carry a bitmask of the language pairs still expanding that gloss; each pair
+    sees its entries in the same order its own BFS would, so per-pair ordering
+    matches collect_gloss_ids(). Phase 2 expansions are computed once per
+    (gloss, other language) and shared between pairs.
+
+    Args:
+        graph: GlossGraph snapshot
+        situation_id: Situation primary key
+        language_pairs: Iterable of (native_language_iso, target_language_iso)
+                        with two different languages each
+
+    Returns:
+        Dict mapping each (native_language_iso, target_language_iso) to a list of
+        gloss ids, identical to collect_gloss_ids() for that pair
+    """
+    languages = graph.languages
+    language_pairs = list(language_pairs)
+
+    # Assign one bit per unordered language pair
+    pair_bits = {}
+    for native_iso, target_iso in language_pairs:
+        if native_iso == target_iso:
+            raise ValueError(f"Language pair needs two different languages, got {native_iso!r} twice")
+        pair_bits.setdefault(frozenset((native_iso, target_iso)), 1 << len(pair_bits))
+
+    language_masks = {}
+    for pair, bit in pair_bits.items():
+        for iso in pair:
+            language_masks[iso] = language_masks.get(iso, 0) | bit
+
+    # PHASE 1: shared BFS, one result list per unordered pair
+    results = {bit: [] for bit in pair_bits.values()}
+    visited = {}
+    all_pairs = sum(pair_bits.values())
+    queue = deque((gloss_id, all_pairs) for gloss_id in graph.situation_glosses.get(situation_id, ()))
+
+    while queue:
+        gloss_id, mask = queue.popleft()
+        mask &= ~visited.get(gloss_id, 0)
+        if not mask:
+            continue
+        visited[gloss_id] = visited.get(gloss_id, 0) | mask
+        for bit in _iter_bits(mask):
+            results[bit].append(gloss_id)
+
+        for contained_id in graph.neighbours("contains", gloss_id):
+            contained_mask = mask & language_masks.get(languages[contained_id], 0)
+            contained_mask &= ~visited.get(contained_id, 0)
+            if contained_mask:
+                queue.append((contained_id, contained_mask))
+
+        current_language = languages[gloss_id]
+        for translation_id in graph.neighbours("translations", gloss_id):
+            translation_language = languages[translation_id]
+            if translation_language == current_language:
+                continue
+            translation_mask = mask & pair_bits.get(frozenset((current_language, translation_language)), 0)
+            translation_mask &= ~visited.get(translation_id, 0)
+            if translation_mask:
+                queue.append((translation_id, translation_mask))
+
+    # PHASE 2: per pair, reusing expansions shared across pairs
+    expansions = {}
+    for pair, bit in pair_bits.items():
+        result_ids = results[bit]
+        pair_visited = set(result_ids)
+        additional_ids = []
+        for gloss_id in result_ids:
+            current_language = languages[gloss_id]
+            if current_language not in pair:
+                continue
+            (other_language_iso,) = pair - {current_language}
+            key = (gloss_id, other_language_iso)
+            if key not in expansions:
+                expansions[key] = _phase2_expansion(graph, gloss_id, other_language_iso)
+            for candidate_id in expansions[key]:
+                if candidate_id not in pair_visited:
+                    pair_visited.add(candidate_id)
+                    additional_ids.append(candidate_id)
+        result_ids.extend(additional_ids)
+
+    return {
+        (native_iso, target_iso): list(results[pair_bits[frozenset((native_iso, target_iso))]])
+        for native_iso, target_iso in language_pairs
+    }
+
+
+def _phase2_expansion(graph, gloss_id, other_language_iso):
+    """Phase 2 candidates of one gloss in visiting order, before deduplication."""
+    candidates = []
+    for field_name in PHASE2_FIELDS:
+        for related_id in graph.neighbours(field_name, gloss_id):
+            candidates.append(related_id)
+            candidates.extend(
+                translation_id
+                for translation_id in graph.neighbours("translations", related_id)
+                if graph.languages[translation_id] == other_language_iso
+            )
+    return candidates
+
+
+def _iter_bits(mask):
+    """Yield each set bit of mask as its own int."""
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
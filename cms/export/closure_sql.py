@@ -0,0 +1,237 @@
+from django.db import connection, transaction
+
+from cms.models import Gloss, Situation, SituationGlossClosure
+
+from .closure import PHASE2_FIELDS
+
+
+# Situations per refresh statement
+REFRESH_CHUNK_SIZE = 500
+
+
+def collect_gloss_rows(situation_id, native_language_iso, target_language_iso):
+    """
+    Database-side equivalent of collect_glosses_recursively().
+
+    Both phases run in one statement over the M2M through tables:
+    1. A WITH RECURSIVE query starts from the situation glosses and follows
+       contains to glosses in either language of the pair, and translations
+       from a native gloss to a target one or the other way round. UNION
+       drops rows already found, which ends the recursion on cycles.
+    2. Set-based joins add, for every phase 1 gloss in the pair, the glosses
+       related by PHASE2_FIELDS and the translations of those into the other
+       language of the pair.
+
+    The result holds the same glosses as collect_glosses_recursively(), but
+    ordered by phase and id rather than in traversal order. Works on SQLite
+    and PostgreSQL.
+
+    Args:
+        situation_id: Situation primary key
+        native_language_iso: ISO code of native language (str)
+        target_language_iso: ISO code of target language (str)
+
+    Returns:
+        List of (gloss_id, language_iso) tuples
+    """
+    sql, params = _closure_sql("SELECT %s, %s, %s", [situation_id, native_language_iso, target_language_iso])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"{sql} SELECT gloss_id, language_id FROM found "
+            "GROUP BY gloss_id, language_id ORDER BY MIN(phase), gloss_id",
+            params,
+        )
+        return [tuple(row) for row in cursor.fetchall()]
+
+
+def closure_gloss_ids(situation_id, native_language_iso, target_language_iso):
+    """
+    Read the glosses of one situation and pair from SituationGlossClosure.
+
+    One query on the (situation, native, target, gloss) unique index.
+
+    Returns:
+        List of gloss ids ordered like collect_gloss_rows()
+    """
+    return list(
+        SituationGlossClosure.objects.filter(
+            situation_id=situation_id, native_iso=native_language_iso, target_iso=target_language_iso
+        ).order_by("phase", "gloss_id").values_list("gloss_id", flat=True)
+    )
+
+
+def gloss_situations(gloss_id, limit=None):
+    """
+    Return the situations and language pairs whose closure holds a gloss.
+
+    The reverse of closure_gloss_ids(), read through the gloss index of
+    SituationGlossClosure: these are the situation exports an edit of the
+    gloss can change. Takes two queries whatever the size of the corpus.
+
+    Args:
+        gloss_id: Gloss primary key
+        limit: Optional maximum number of situations to list
+
+    Returns:
+        (count, situations) tuple: the number of situations reaching the
+        gloss, and a dict of situation id -> list of (native_iso, target_iso,
+        phase) tuples for the first limit of them, both ordered
+    """
+    rows = SituationGlossClosure.objects.filter(gloss_id=gloss_id)
+    situation_ids = rows.order_by("situation_id").values_list("situation_id", flat=True).distinct()
+    count = situation_ids.count()
+    if limit is not None:
+        rows = rows.filter(situation_id__in=situation_ids[:limit])
+    situations = {}
+    for situation_id, native_iso, target_iso, phase in rows.order_by(
+        "situation_id", "native_iso", "target_iso"
+    ).values_list("situation_id", "native_iso", "target_iso", "phase"):
+        situations.setdefault(situation_id, []).append((native_iso, target_iso, phase))
+    return count, situations
+
+
+def refresh_situation_closure(situation_ids=None):
+    """
+    Recompute the SituationGlossClosure rows of some or all situations.
+
+    The rows of each chunk of situations are deleted and inserted again by
+    one INSERT ... SELECT running the closure query for every pair the
+    situations are exported in, so nothing is loaded into Python.
+
+    Args:
+        situation_ids: Iterable of situation ids; None rebuilds every situation
+    """
+    with transaction.atomic():
+        if situation_ids is None:
+            SituationGlossClosure.objects.all().delete()
+            _insert_closure(None)
+            return
+        situation_ids = sorted(set(situation_ids))
+        for start in range(0, len(situation_ids), REFRESH_CHUNK_SIZE):
+            chunk = situation_ids[start:start + REFRESH_CHUNK_SIZE]
+            SituationGlossClosure.objects.filter(situation_id__in=chunk).delete()
+            _insert_closure(chunk)
+
+
+def situations_reaching(gloss_ids):
+    """Return the ids of situations whose closure holds one of gloss_ids."""
+    gloss_ids = [gloss_id for gloss_id in gloss_ids if gloss_id is not None]
+    situation_ids = set()
+    for start in range(0, len(gloss_ids), REFRESH_CHUNK_SIZE):
+        situation_ids.update(
+            SituationGlossClosure.objects.filter(gloss_id__in=gloss_ids[start:start + REFRESH_CHUNK_SIZE])
+            .values_list("situation_id", flat=True).distinct()
+        )
+    return situation_ids
+
+
+def refresh_gloss_closure(gloss_ids):
+    """
+    Recompute the closure of every situation that can reach one of gloss_ids.
+
+    Call after edges of these glosses changed. Traversals only follow edges
+    out of glosses they collected, so an edge added or removed between two
+    glosses can only change situations whose closure holds one of them.
+    """
+    refresh_situation_closure(situations_reaching(gloss_ids))
+
+
+def _insert_closure(situation_ids):
+    descriptions = connection.ops.quote_name(Situation.descriptions.through._meta.db_table)
+    gloss_table = connection.ops.quote_name(Gloss._meta.db_table)
+    seeds = f"""
+        SELECT DISTINCT n.situation_id, ng.language_id, tg.language_id
+        FROM {descriptions} n
+        JOIN {gloss_table} ng ON ng.id = n.gloss_id
+        JOIN {descriptions} t ON t.situation_id = n.situation_id
+        JOIN {gloss_table} tg ON tg.id = t.gloss_id
+        WHERE ng.language_id <> tg.language_id
+    """
+    seed_params = []
+    if situation_ids is not None:
+        seeds += f" AND n.situation_id IN ({', '.join(['%s'] * len(situation_ids))})"
+        seed_params = list(situation_ids)
+    sql, params = _closure_sql(seeds, seed_params)
+    table = SituationGlossClosure._meta
+    columns = ", ".join(
+        connection.ops.quote_name(table.get_field(name).column)
+        for name in ("situation", "native_iso", "target_iso", "gloss", "phase")
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {connection.ops.quote_name(table.db_table)} ({columns}) "
+            f"{sql} SELECT situation_id, native_iso, target_iso, gloss_id, MIN(phase) FROM found "
+            "GROUP BY situation_id, native_iso, target_iso, gloss_id",
+            params,
+        )
+
+
+def _closure_sql(seeds, seed_params):
+    """
+    Build the WITH clause defining found (situation_id, native_iso,
+    target_iso, gloss_id, language_id, phase), with a row per gloss collected
+    in each phase for each (situation_id, native_iso, target_iso) row of the
+    seeds query; a gloss may appear in both phases.
+    """
+    quote = connection.ops.quote_name
+    gloss_table = quote(Gloss._meta.db_table)
+
+    def through(field_name):
+        return quote(getattr(Gloss, field_name).through._meta.db_table)
+
+    # PostgreSQL allows a single reference to the recursive CTE, so both
+    # relations are joined to it at once: each row of kinds looks up one
+    # through table by index. A UNION ALL of the through tables would be
+    # scanned whole by SQLite on every step.
+    phase1 = f"""
+        SELECT p.situation_id, p.native_iso, p.target_iso, g.id, g.language_id
+        FROM seeds p
+        JOIN {quote(Situation.glosses.through._meta.db_table)} s ON s.situation_id = p.situation_id
+        JOIN {gloss_table} g ON g.id = s.gloss_id
+        UNION
+        SELECT p.situation_id, p.native_iso, p.target_iso, g.id, g.language_id
+        FROM phase1 p
+        CROSS JOIN (SELECT 0 AS kind UNION ALL SELECT 1) k
+        LEFT JOIN {through("contains")} c ON k.kind = 0 AND c.from_gloss_id = p.gloss_id
+        LEFT JOIN {through("translations")} t ON k.kind = 1 AND t.from_gloss_id = p.gloss_id
+        JOIN {gloss_table} g ON g.id = COALESCE(c.to_gloss_id, t.to_gloss_id)
+        WHERE (k.kind = 0 AND g.language_id IN (p.native_iso, p.target_iso))
+           OR (k.kind = 1 AND p.language_id = p.native_iso AND g.language_id = p.target_iso)
+           OR (k.kind = 1 AND p.language_id = p.target_iso AND g.language_id = p.native_iso)
+    """
+
+    related = []
+    for field_name in PHASE2_FIELDS:
+        if field_name == "usage_of_clarified":
+            from_column, to_column, table = "to_gloss_id", "from_gloss_id", through("clarifies_usage")
+        else:
+            from_column, to_column, table = "from_gloss_id", "to_gloss_id", through(field_name)
+        related.append(
+            f"SELECT a.situation_id, a.native_iso, a.target_iso, a.other_language, e.{to_column} "
+            f"FROM anchors a JOIN {table} e ON e.{from_column} = a.gloss_id"
+        )
+
+    sql = f"""
+        WITH RECURSIVE seeds (situation_id, native_iso, target_iso) AS ({seeds}),
+        phase1 (situation_id, native_iso, target_iso, gloss_id, language_id) AS ({phase1}),
+        anchors (situation_id, native_iso, target_iso, gloss_id, other_language) AS (
+            SELECT situation_id, native_iso, target_iso, gloss_id,
+                   CASE WHEN language_id = native_iso THEN target_iso ELSE native_iso END
+            FROM phase1 WHERE language_id IN (native_iso, target_iso)
+        ),
+        related (situation_id, native_iso, target_iso, other_language, gloss_id) AS (
+            {" UNION ALL ".join(related)}
+        ),
+        found (situation_id, native_iso, target_iso, gloss_id, language_id, phase) AS (
+            SELECT situation_id, native_iso, target_iso, gloss_id, language_id, 1 FROM phase1
+            UNION ALL
+            SELECT r.situation_id, r.native_iso, r.target_iso, g.id, g.language_id, 2
+            FROM related r JOIN {gloss_table} g ON g.id = r.gloss_id
+            UNION ALL
+            SELECT r.situation_id, r.native_iso, r.target_iso, g.id, g.language_id, 2
+            FROM related r
+            JOIN {through("translations")} e ON e.from_gloss_id = r.gloss_id
+            JOIN {gloss_table} g ON g.id = e.to_gloss_id AND g.language_id = r.other_language
+        )
+    """
+    return sql, list(seed_params)
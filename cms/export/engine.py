@@ -0,0 +1,171 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.db import connections
+
+from cms.models import Gloss, Situation
+
+from .glosses import iter_gloss_archive_files
+from .situations import SituationDescriptions, compute_situation_entries
+
+
+# Situations per work unit sent to a worker process
+SITUATION_CHUNK_SIZE = 8
+# Glosses per work unit sent to a worker process
+GLOSS_CHUNK_SIZE = 500
+
+# State of each worker process, set once by _init_worker
+_worker_state = {}
+
+
+def iter_situation_exports(graph, all_languages, situations=None, workers=1, only_pairs=None):
+    """
+    Yield the exports of all valid situation pairs, in situation order.
+
+    See iter_situation_entries() for the arguments; only_pairs restricts the
+    export to a set of (target_iso, native_iso) pairs, see
+    SituationDescriptions.load().
+
+    Yields:
+        Export dicts as produced by export_situation()
+    """
+    descriptions = None
+    if only_pairs is not None:
+        descriptions = SituationDescriptions.load(all_languages, situations, only_pairs)
+    for _, entries in iter_situation_entries(
+        graph, all_languages, situations, workers, descriptions=descriptions
+    ):
+        for entry in entries:
+            if entry["export"] is not None:
+                yield entry["export"]
+
+
+def iter_situation_entries(
+    graph, all_languages, situations=None, workers=1, with_dependencies=False, descriptions=None
+):
+    """
+    Compute situation entries serially or across worker processes.
+
+    With more than one worker, situations are split into chunks that run in a
+    ProcessPoolExecutor. Workers are forked after the graph snapshot and the
+    description index are built, so they share them instead of reloading them,
+    and each opens its own database connection for the situation rows. Results are yielded in
+    situation order, so the output is identical to a serial run.
+
+    Args:
+        graph: GlossGraph snapshot
+        all_languages: List of Language objects, in pair loop order
+        situations: Optional Situation queryset (defaults to all situations)
+        workers: Number of worker processes (1 runs in-process)
+        with_dependencies: Passed on to compute_situation_entries()
+        descriptions: Optional SituationDescriptions covering the situations
+                      (loaded in one query when omitted)
+
+    Yields:
+        (situation_id, entries) tuples, entries as returned by
+        compute_situation_entries()
+    """
+    if situations is None:
+        situations = Situation.objects.all()
+    if not situations.ordered:
+        # Serial and parallel runs must walk situations in the same order
+        situations = situations.order_by("pk")
+    if descriptions is None:
+        descriptions = SituationDescriptions.load(all_languages, situations)
+
+    if workers <= 1:
+        for situation in situations:
+            yield situation.id, compute_situation_entries(
+                graph, descriptions, situation, with_dependencies
+            )
+        return
+
+    situation_ids = list(situations.values_list("id", flat=True))
+    yield from _iter_in_workers(
+        _export_chunk,
+        _chunked(situation_ids, SITUATION_CHUNK_SIZE),
+        workers,
+        {"graph": graph, "descriptions": descriptions, "with_dependencies": with_dependencies},
+    )
+
+
+def iter_gloss_files(glosses=None, workers=1):
+    """
+    Yield the gloss archive files, serially or across worker processes.
+
+    Glosses are walked in primary key order; with more than one worker they are
+    serialized in chunks by worker processes with their own database
+    connections, and yielded in the same order as a serial run.
+
+    Args:
+        glosses: Optional Gloss queryset (defaults to all glosses)
+        workers: Number of worker processes (1 runs in-process)
+
+    Yields:
+        (filepath, content) tuples as produced by iter_gloss_archive_files()
+    """
+    if glosses is None:
+        glosses = Gloss.objects.all()
+    glosses = glosses.order_by("pk")
+
+    if workers <= 1:
+        yield from iter_gloss_archive_files(glosses)
+        return
+
+    gloss_ids = list(glosses.values_list("pk", flat=True))
+    yield from _iter_in_workers(_gloss_chunk, _chunked(gloss_ids, GLOSS_CHUNK_SIZE), workers, {})
+
+
+def _iter_in_workers(function, chunks, workers, state):
+    """Run function over chunks in forked workers and yield results in order."""
+    # Forked workers must not reuse the parent's database connections
+    connections.close_all()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("fork"),
+        initializer=_init_worker,
+        initargs=(state,),
+    ) as executor:
+        # Keep a bounded window of chunks in flight so memory stays flat
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(function, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _chunked(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+    # Drop any inherited connection without closing it; Django reconnects on use
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
+
+
+def _export_chunk(situation_ids):
+    situations = Situation.objects.in_bulk(situation_ids)
+    return [
+        (
+            situation_id,
+            compute_situation_entries(
+                _worker_state["graph"],
+                _worker_state["descriptions"],
+                situations[situation_id],
+                _worker_state["with_dependencies"],
+            ),
+        )
+        for situation_id in situation_ids
+    ]
+
+
+def _gloss_chunk(gloss_ids):
+    return list(iter_gloss_archive_files(Gloss.objects.filter(pk__in=gloss_ids).order_by("pk")))
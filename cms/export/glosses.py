@@ -0,0 +1,47 @@
+import json
+import re
+
+from cms.models import Gloss
+
+from .serialize import serialize_gloss_to_json
+
+
+def iter_gloss_archive_files(glosses=None):
+    """
+    Yield (filepath, content) for every gloss of the gloss archive.
+
+    Each gloss becomes a JSON file at {language}/{first_two}/{iso_code}:{content}.json
+    with all its data and relationships.
+
+    Args:
+        glosses: Optional Gloss queryset (defaults to all glosses)
+    """
+    if glosses is None:
+        glosses = Gloss.objects.all()
+
+    # Prefetch relationships in chunks so memory stays flat
+    glosses = glosses.select_related('language').prefetch_related(
+        'contains__language',
+        'translations__language',
+        'near_synonyms__language',
+        'near_homophones__language',
+        'clarifies_usage__language',
+        'to_be_differentiated_from__language',
+        'collocations__language',
+        'usage_of_clarified__language',
+    )
+
+    for gloss in glosses.iterator(chunk_size=2000):
+        # Serialize gloss to dict
+        gloss_data = serialize_gloss_to_json(gloss)
+
+        # Remove only illegal filesystem characters: < > : " / \ | ? *
+        safe_content = re.sub(r'[<>:"/\\|?*]', '', gloss.content)
+
+        # Get first two letters for folder structure (or first letter if only one char)
+        first_two = safe_content[:2] if len(safe_content) >= 2 else safe_content[:1]
+
+        # Create path: {language}/{first_two}/{iso_code}:{content}.json
+        filepath = f"{gloss.language.iso}/{first_two}/{gloss.language.iso}:{safe_content}.json"
+
+        yield filepath, json.dumps(gloss_data, ensure_ascii=False, indent=2)
@@ -0,0 +1,88 @@
+from collections import defaultdict
+
+from cms.models import Gloss, Situation
+
+
+# Forward relation fields on Gloss, in serialization order
+RELATION_FIELDS = [
+    "contains",
+    "translations",
+    "near_synonyms",
+    "near_homophones",
+    "clarifies_usage",
+    "to_be_differentiated_from",
+    "collocations",
+]
+
+
+class GlossGraph:
+    """
+    Read-only in-memory snapshot of all glosses and their relationships.
+
+    Loads Gloss rows, situation glosses and every gloss M2M through table in a
+    handful of bulk queries. Adjacency is stored as tuples of gloss ids keyed by
+    gloss id, in the order the ORM related managers return them, so traversals
+    and serialization never hit the database and match the ORM code paths.
+
+    Symmetric relations already store both directions in their through tables.
+    The reverse of clarifies_usage is available as "usage_of_clarified".
+    """
+
+    def __init__(self, contents, languages, transcriptions, edges, situation_glosses):
+        self.contents = contents
+        self.languages = languages
+        self.transcriptions = transcriptions
+        self.edges = edges
+        self.situation_glosses = situation_glosses
+
+    @classmethod
+    def load(cls):
+        """Build a snapshot from the database."""
+        contents = {}
+        languages = {}
+        transcriptions = {}
+        rows = Gloss.objects.values_list("id", "content", "language_id", "transcriptions")
+        for gloss_id, content, language_iso, gloss_transcriptions in rows.iterator(chunk_size=5000):
+            contents[gloss_id] = content
+            languages[gloss_id] = language_iso
+            transcriptions[gloss_id] = gloss_transcriptions
+
+        edges = {}
+        for field_name in RELATION_FIELDS:
+            through = getattr(Gloss, field_name).through
+            pairs = through.objects.values_list("from_gloss_id", "to_gloss_id")
+            edges[field_name] = _group_pairs(pairs.order_by("from_gloss_id", "to_gloss_id"))
+
+        # Reverse clarifies_usage ("examples"), ordered like the ORM reverse
+        # accessor, which walks the to_gloss index in through-row order
+        through = Gloss.clarifies_usage.through
+        reverse_pairs = through.objects.values_list("to_gloss_id", "from_gloss_id")
+        edges["usage_of_clarified"] = _group_pairs(reverse_pairs.order_by("to_gloss_id", "id"))
+
+        situation_pairs = Situation.glosses.through.objects.values_list(
+            "situation_id", "gloss_id"
+        ).order_by("situation_id", "gloss_id")
+        situation_glosses = _group_pairs(situation_pairs)
+
+        return cls(contents, languages, transcriptions, edges, situation_glosses)
+
+    def neighbours(self, field_name, gloss_id):
+        """Return ids related to gloss_id through field_name."""
+        return self.edges[field_name].get(gloss_id, ())
+
+    def compound_key(self, gloss_id):
+        """Same format as Gloss.get_compound_key()."""
+        return f"{self.languages[gloss_id]}:{self.contents[gloss_id]}"
+
+    def is_paraphrased(self, gloss_id):
+        """Same check as Gloss.is_paraphrased()."""
+        content = self.contents[gloss_id]
+        return content.startswith("[") and content.endswith("]")
+
+
+def _group_pairs(pairs):
+    """Group (key, value) pairs into a dict of value tuples."""
+    grouped = defaultdict(list)
+    for key, value in pairs:
+        grouped[key].append(value)
+    return {key: tuple(values) for key, values in grouped.items()}
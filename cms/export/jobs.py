@@ -0,0 +1,147 @@
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from cms.models import ExportJob, Gloss, Language, Situation
+
+from .archive import write_zip
+from .cache import iter_cached_situation_exports
+from .engine import iter_gloss_files
+from .situations import iter_situation_archive_files
+
+
+def claim_next_job():
+    """Mark the oldest pending job as running and return it, or None."""
+    for job in ExportJob.objects.filter(status=ExportJob.STATUS_PENDING).order_by("created_at"):
+        claimed = ExportJob.objects.filter(
+            pk=job.pk, status=ExportJob.STATUS_PENDING
+        ).update(status=ExportJob.STATUS_RUNNING, started_at=timezone.now(), updated_at=timezone.now())
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def fail_stale_jobs(timeout):
+    """
+    Fail running jobs whose updated_at has not advanced for timeout.
+
+    A running job saves its progress at least every few seconds while it
+    works, so one that stopped doing so lost its worker process. Its partial
+    file is removed. Returns the number of jobs failed.
+    """
+    now = timezone.now()
+    stale = ExportJob.objects.filter(status=ExportJob.STATUS_RUNNING, updated_at__lt=now - timeout)
+    failed = 0
+    for job in stale:
+        failed += ExportJob.objects.filter(
+            pk=job.pk, status=ExportJob.STATUS_RUNNING, updated_at=job.updated_at
+        ).update(
+            status=ExportJob.STATUS_FAILED,
+            error="The export worker stopped responding.",
+            finished_at=now,
+            updated_at=now,
+        )
+        (settings.EXPORT_ROOT / f"{job.kind}_{job.pk}.zip.part").unlink(missing_ok=True)
+    return failed
+
+
+def run_export_job(job, workers=None):
+    """
+    Build the ZIP of a claimed job into settings.EXPORT_ROOT.
+
+    The archive is written to a temporary file and renamed when complete, so a
+    download never sees a partial file. The finished job stores the file size
+    and a content hash used as ETag, and replaces older finished jobs of its
+    kind, whose files are deleted.
+    """
+    if workers is None:
+        workers = settings.EXPORT_WORKERS
+
+    export_root = settings.EXPORT_ROOT
+    export_root.mkdir(parents=True, exist_ok=True)
+    file_name = f"{job.kind}_{job.pk}.zip"
+    path = export_root / file_name
+    partial_path = export_root / f"{file_name}.part"
+
+    try:
+        with open(partial_path, "wb") as fileobj:
+            write_zip(fileobj, _job_files(job, workers))
+        os.replace(partial_path, path)
+    except Exception as e:
+        partial_path.unlink(missing_ok=True)
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.STATUS_FAILED, error=str(e), finished_at=timezone.now(), updated_at=timezone.now()
+        )
+        raise
+
+    ExportJob.objects.filter(pk=job.pk).update(
+        status=ExportJob.STATUS_DONE,
+        progress=job.total,
+        file_name=file_name,
+        file_size=path.stat().st_size,
+        etag=_file_hash(path),
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    job.refresh_from_db()
+    _prune_finished_jobs(job)
+    return job
+
+
+def _prune_finished_jobs(job):
+    """Delete the older finished jobs of the job's kind and their files."""
+    older = ExportJob.objects.filter(kind=job.kind, status=ExportJob.STATUS_DONE, pk__lt=job.pk)
+    for file_name in older.values_list("file_name", flat=True):
+        if file_name:
+            (settings.EXPORT_ROOT / file_name).unlink(missing_ok=True)
+    older.delete()
+
+
+def _job_files(job, workers):
+    if job.kind == ExportJob.KIND_SITUATIONS:
+        _set_total(job, Situation.objects.count())
+        exports = iter_cached_situation_exports(
+            list(Language.objects.all()), workers=workers, progress=_ProgressReporter(job)
+        )
+        return iter_situation_archive_files(exports)
+
+    _set_total(job, Gloss.objects.count())
+    return _count_files(iter_gloss_files(workers=workers), _ProgressReporter(job))
+
+
+def _set_total(job, total):
+    job.total = total
+    ExportJob.objects.filter(pk=job.pk).update(total=total, updated_at=timezone.now())
+
+
+def _count_files(files, progress):
+    for done, item in enumerate(files, start=1):
+        progress(done)
+        yield item
+
+
+class _ProgressReporter:
+    """Save job progress at most once per interval."""
+
+    def __init__(self, job, interval=1.0):
+        self.job = job
+        self.interval = interval
+        self.last_saved = 0.0
+
+    def __call__(self, done):
+        now = time.monotonic()
+        if now - self.last_saved >= self.interval:
+            ExportJob.objects.filter(pk=self.job.pk).update(progress=done, updated_at=timezone.now())
+            self.last_saved = now
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fileobj:
+        for block in iter(lambda: fileobj.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,128 @@
+from .graph import RELATION_FIELDS
+
+
+def serialize_node_to_jsonl(graph, gloss_id, target_language_iso=None):
+    """
+    GlossGraph equivalent of serialize_gloss_to_jsonl().
+
+    Args:
+        graph: GlossGraph snapshot
+        gloss_id: Id of the gloss to serialize
+        target_language_iso: Optional ISO code of target language. If provided,
+                           paraphrased glosses in this language will be filtered
+                           from all relationship fields.
+
+    Returns:
+        Dictionary with the same keys and values as serialize_gloss_to_jsonl()
+    """
+    def get_filtered_keys(field_name):
+        related_ids = graph.neighbours(field_name, gloss_id)
+        if target_language_iso:
+            related_ids = [
+                related_id for related_id in related_ids
+                if not (
+                    graph.languages[related_id] == target_language_iso
+                    and graph.is_paraphrased(related_id)
+                )
+            ]
+        return [graph.compound_key(related_id) for related_id in related_ids]
+
+    data = {
+        "key": graph.compound_key(gloss_id),
+        "content": graph.contents[gloss_id],
+        "language": graph.languages[gloss_id],
+        "transcriptions": graph.transcriptions[gloss_id],
+    }
+    for field_name in RELATION_FIELDS:
+        data[field_name] = get_filtered_keys(field_name)
+    data["examples"] = get_filtered_keys("usage_of_clarified")
+    return data
+
+
+def serialize_gloss_to_json(gloss):
+    """
+    Serialize a gloss to a dictionary suitable for standalone JSON export.
+
+    Includes all data and relationships without filtering.
+
+    Args:
+        gloss: Gloss instance with prefetched relationships
+
+    Returns:
+        Dictionary with complete gloss data
+    """
+    # Helper function to extract all keys (no filtering)
+    def get_all_keys(relationship_queryset):
+        return [g.get_compound_key() for g in relationship_queryset.all()]
+
+    return {
+        "key": gloss.get_compound_key(),
+        "content": gloss.content,
+        "language": gloss.language.iso,
+        "transcriptions": gloss.transcriptions,
+        "contains": get_all_keys(gloss.contains),
+        "translations": get_all_keys(gloss.translations),
+        "near_synonyms": get_all_keys(gloss.near_synonyms),
+        "near_homophones": get_all_keys(gloss.near_homophones),
+        "clarifies_usage": get_all_keys(gloss.clarifies_usage),
+        "to_be_differentiated_from": get_all_keys(gloss.to_be_differentiated_from),
+        "collocations": get_all_keys(gloss.collocations),
+        "examples": get_all_keys(gloss.usage_of_clarified),
+    }
+
+
+def serialize_gloss_to_jsonl(gloss, target_language_iso=None):
+    """
+    Serialize a gloss to a dictionary suitable for JSONL export.
+
+    Uses compound keys for cross-referencing instead of internal IDs.
+
+    Args:
+        gloss: Gloss instance with prefetched relationships
+        target_language_iso: Optional ISO code of target language. If provided,
+                           paraphrased glosses in this language will be filtered
+                           from all relationship fields.
+
+    Returns:
+        Dictionary with gloss data including all relationship fields
+    """
+
+    # Helper function to extract and filter keys
+    def get_filtered_keys(relationship_queryset):
+        glosses = relationship_queryset.all()
+        if target_language_iso:
+            return [
+                g.get_compound_key() for g in glosses
+                if not (g.language.iso == target_language_iso and g.is_paraphrased())
+            ]
+        else:
+            return [g.get_compound_key() for g in glosses]
+
+    # Existing relationships
+    contains_keys = get_filtered_keys(gloss.contains)
+    translation_keys = get_filtered_keys(gloss.translations)
+
+    # New relationships
+    near_synonyms_keys = get_filtered_keys(gloss.near_synonyms)
+    near_homophones_keys = get_filtered_keys(gloss.near_homophones)
+    clarifies_usage_keys = get_filtered_keys(gloss.clarifies_usage)
+    to_be_differentiated_from_keys = get_filtered_keys(gloss.to_be_differentiated_from)
+    collocations_keys = get_filtered_keys(gloss.collocations)
+
+    # Examples (reverse clarifies_usage)
+    examples_keys = get_filtered_keys(gloss.usage_of_clarified)
+
+    return {
+        "key": gloss.get_compound_key(),
+        "content": gloss.content,
+        "language": gloss.language.iso,
+        "transcriptions": gloss.transcriptions,
+        "contains": contains_keys,
+        "translations": translation_keys,
+        "near_synonyms": near_synonyms_keys,
+        "near_homophones": near_homophones_keys,
+        "clarifies_usage": clarifies_usage_keys,
+        "to_be_differentiated_from": to_be_differentiated_from_keys,
+        "collocations": collocations_keys,
+        "examples": examples_keys,
+    }
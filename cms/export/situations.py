@@ -0,0 +1,247 @@
+import json
+from collections import defaultdict
+
+from cms.models import Language, Situation
+
+from .closure import collect_gloss_ids_for_pairs
+from .serialize import serialize_node_to_jsonl
+
+
+class SituationDescriptions:
+    """
+    Descriptions of many situations, keyed by situation id and language.
+
+    Loaded in a single query, so building exports never queries descriptions
+    per situation or per pair. For each language the description with the
+    lowest pk is kept, the one situation.descriptions.filter(language=...)
+    .first() returns.
+    """
+
+    def __init__(self, all_languages, descriptions, only_pairs=None):
+        # ISO code -> (loop position, Language), to order pairs like the
+        # all_languages x all_languages loop without iterating over it
+        self.positions = {lang.iso: (index, lang) for index, lang in enumerate(all_languages)}
+        self.descriptions = descriptions
+        # Optional set of (target_iso, native_iso) pairs to restrict exports to
+        self.only_pairs = only_pairs
+
+    @classmethod
+    def load(cls, all_languages, situations=None, only_pairs=None):
+        """
+        Load the descriptions of all situations, or of a Situation queryset.
+
+        With only_pairs, a set of (target_iso, native_iso) tuples, pairs()
+        leaves out every other pair, so they are never collected or serialized.
+        """
+        rows = Situation.descriptions.through.objects.values_list(
+            "situation_id", "gloss_id", "gloss__language_id", "gloss__content"
+        )
+        if situations is not None:
+            rows = rows.filter(situation__in=situations.values("pk"))
+
+        descriptions = defaultdict(dict)
+        for situation_id, gloss_id, language_iso, content in rows.order_by("gloss_id"):
+            descriptions[situation_id].setdefault(language_iso, (gloss_id, content))
+        return cls(all_languages, descriptions, only_pairs)
+
+    def pairs(self, situation_id):
+        """
+        Return the (target, native) Language pairs worth exporting for a situation.
+
+        Validation Check 1: both descriptions must exist. Only languages the
+        situation is described in are paired, in all_languages loop order, and
+        only pairs in only_pairs when it is set.
+        """
+        described = sorted(
+            self.positions[language_iso]
+            for language_iso in self.descriptions.get(situation_id, ())
+            if language_iso in self.positions
+        )
+        return [
+            (target_lang, native_lang)
+            for _, target_lang in described
+            for _, native_lang in described
+            if target_lang is not native_lang
+            and (self.only_pairs is None or (target_lang.iso, native_lang.iso) in self.only_pairs)
+        ]
+
+    def content(self, situation_id, language_iso):
+        """Return the description text of a situation in one language."""
+        return self.descriptions[situation_id][language_iso][1]
+
+    def gloss_ids(self, situation_id):
+        """Return the ids of the description glosses used for a situation."""
+        return [gloss_id for gloss_id, _ in self.descriptions.get(situation_id, {}).values()]
+
+
+def compute_situation_entries(graph, descriptions, situation, with_dependencies=False):
+    """
+    Compute the export of every candidate (target, native) pair of one situation.
+
+    Validation:
+    - Situation must have descriptions in both languages
+    - Collected glosses must contain at least one gloss in each language
+
+    Args:
+        graph: GlossGraph snapshot
+        descriptions: SituationDescriptions covering the situation
+        situation: Situation instance
+        with_dependencies: Also return the gloss ids each entry was built from
+
+    Returns:
+        List of dicts with target_iso, native_iso, export (None when the pair
+        fails validation) and dependencies (a set of gloss ids, or None)
+    """
+    pairs = descriptions.pairs(situation.id)
+    if not pairs:
+        return []
+
+    # Collect glosses recursively for all candidate pairs in one traversal
+    gloss_ids_by_pair = collect_gloss_ids_for_pairs(
+        graph,
+        situation.id,
+        [(native_lang.iso, target_lang.iso) for target_lang, native_lang in pairs],
+    )
+
+    entries = []
+    for target_lang, native_lang in pairs:
+        gloss_ids = gloss_ids_by_pair[(native_lang.iso, target_lang.iso)]
+        entry = {
+            "target_iso": target_lang.iso,
+            "native_iso": native_lang.iso,
+            "export": _export_pair(graph, descriptions, situation, target_lang, native_lang, gloss_ids),
+            "dependencies": None,
+        }
+        if with_dependencies:
+            entry["dependencies"] = _dependencies(
+                graph, gloss_ids, descriptions.gloss_ids(situation.id)
+            )
+        entries.append(entry)
+    return entries
+
+
+def export_situation(graph, descriptions, situation):
+    """
+    Yield the export of every valid (target, native) pair of one situation.
+
+    Yields:
+        Dict with situation_id, target_iso, native_iso, jsonl_content and the
+        index_row written to situations_{target_iso}_{native_iso}.jsonl
+    """
+    for entry in compute_situation_entries(graph, descriptions, situation):
+        if entry["export"] is not None:
+            yield entry["export"]
+
+
+def _export_pair(graph, descriptions, situation, target_lang, native_lang, gloss_ids):
+    # Filter out paraphrased glosses in target language
+    # (native language glosses are kept regardless)
+    filtered_ids = [
+        gloss_id for gloss_id in gloss_ids
+        if not (
+            graph.languages[gloss_id] == target_lang.iso
+            and graph.is_paraphrased(gloss_id)
+        )
+    ]
+
+    # Validation Check 2: Must have at least one gloss in each language
+    language_isos = {graph.languages[gloss_id] for gloss_id in filtered_ids}
+    if (
+        native_lang.iso not in language_isos
+        or target_lang.iso not in language_isos
+    ):
+        return None
+
+    jsonl_content = "\n".join(
+        json.dumps(
+            serialize_node_to_jsonl(graph, gloss_id, target_language_iso=target_lang.iso),
+            ensure_ascii=False,
+        )
+        for gloss_id in filtered_ids
+    )
+
+    # Get descriptions
+    target_description = descriptions.content(situation.id, target_lang.iso)
+    native_description = descriptions.content(situation.id, native_lang.iso)
+
+    return {
+        "situation_id": situation.id,
+        "target_iso": target_lang.iso,
+        "native_iso": native_lang.iso,
+        "jsonl_content": jsonl_content,
+        "index_row": {
+            "id": situation.id,
+            "target_description": target_description,
+            "native_description": native_description,
+            "image_link": situation.image_link or "",
+            # Root glosses, so importers can restore situation.glosses
+            "glosses": [
+                graph.compound_key(gloss_id)
+                for gloss_id in graph.situation_glosses.get(situation.id, ())
+            ],
+        },
+    }
+
+
+def _dependencies(graph, gloss_ids, description_ids):
+    """
+    Gloss ids whose data an entry was built from.
+
+    The traversal and serialization read the collected glosses and the language
+    and key of every direct neighbour, plus the situation's descriptions.
+    """
+    dependencies = set(gloss_ids)
+    for gloss_id in gloss_ids:
+        for adjacency in graph.edges.values():
+            dependencies.update(adjacency.get(gloss_id, ()))
+    dependencies.update(description_ids)
+    return dependencies
+
+
+class SituationArchiveIndex:
+    """Small metadata accumulated while situation files are written."""
+
+    def __init__(self):
+        self.rows_by_pair = defaultdict(list)
+        self.native_languages = set()
+        self.target_languages = set()
+
+    def add(self, export):
+        pair_key = f"{export['target_iso']}_{export['native_iso']}"
+        self.rows_by_pair[pair_key].append(export["index_row"])
+        self.native_languages.add(export["native_iso"])
+        self.target_languages.add(export["target_iso"])
+
+    def files(self):
+        """Yield (filename, content) for all index files."""
+        yield "native_languages.jsonl", _language_index(self.native_languages)
+        yield "target_languages.jsonl", _language_index(self.target_languages)
+        for pair_key, rows in self.rows_by_pair.items():
+            yield f"situations_{pair_key}.jsonl", _jsonl(rows)
+
+
+def iter_situation_archive_files(exports):
+    """
+    Yield (filename, content) for every file of the situation archive.
+
+    Situation files are yielded as soon as each export arrives; the index files
+    follow at the end, built from accumulated metadata only.
+    """
+    index = SituationArchiveIndex()
+    for export in exports:
+        pair_key = f"{export['target_iso']}_{export['native_iso']}"
+        yield f"{export['situation_id']}_{pair_key}.jsonl", export["jsonl_content"]
+        index.add(export)
+    yield from index.files()
+
+
+def _language_index(isos):
+    languages = Language.objects.filter(iso__in=isos).order_by("name")
+    return _jsonl(
+        {"iso": lang.iso, "name": lang.name, "short": lang.short or ""}
+        for lang in languages
+    )
+
+
+def _jsonl(rows):
+    return "\n".join(json.dumps(row, ensure_ascii=False) for row in rows)
@@ -0,0 +1,49 @@
+from django.db import transaction
+
+from .glosses import get_or_create_glosses
+from .relations import add_gloss_relations
+
+
+def save_example_sentences(examples):
+    """
+    Save example sentences, with optional translations, for any number of glosses.
+
+    All sentence and translation glosses are upserted in one pass, then the
+    translations and clarifies_usage edges are bulk-inserted, so the number
+    of queries does not depend on the number of sentences. Each sentence
+    clarifies the usage of its gloss, and so does its translation.
+
+    Args:
+        examples: Iterable of (gloss_id, language_iso, sentence,
+                  translation_language_iso, translation) tuples; translation
+                  may be None or empty for sentences without one
+
+    Returns:
+        (created, linked) tuple: the number of sentence glosses created and
+        of sentence glosses linked to their gloss
+    """
+    examples = list(examples)
+    pairs = []
+    for _, language_iso, sentence, translation_language_iso, translation in examples:
+        pairs.append((language_iso, sentence))
+        if translation:
+            pairs.append((translation_language_iso, translation))
+
+    with transaction.atomic():
+        resolved = iter(get_or_create_glosses(pairs))
+        created = 0
+        translation_pairs = []
+        usage_pairs = []
+        for gloss_id, _, _, _, translation in examples:
+            sentence_id, sentence_created = next(resolved)
+            created += sentence_created
+            usage_pairs.append((sentence_id, gloss_id))
+            if translation:
+                translation_id, translation_created = next(resolved)
+                created += translation_created
+                translation_pairs.append((sentence_id, translation_id))
+                usage_pairs.append((translation_id, gloss_id))
+
+        add_gloss_relations("translations", translation_pairs)
+        add_gloss_relations("clarifies_usage", usage_pairs)
+    return created, len(usage_pairs)
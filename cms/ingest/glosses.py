@@ -0,0 +1,125 @@
+from functools import partial
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from cms.models import Gloss, Language
+from cms.models.gloss import normalize_search_key
+from cms.search.fuzzy import fuzzy_index
+
+
+# Rows per INSERT and per lookup query; four parameters per row stays well
+# below the parameter limits of SQLite and PostgreSQL
+BATCH_SIZE = 2000
+
+
+def get_or_create_glosses(pairs):
+    """
+    Bulk equivalent of Gloss.objects.get_or_create(language=..., content=...).
+
+    Missing glosses are inserted in batches, skipping rows another writer
+    created meanwhile; the ids of all others are then resolved with one query
+    per batch. Where the backend can return rows from a conflict-ignoring
+    INSERT (SQLite 3.35+, PostgreSQL), "created" is exact even under
+    concurrent writes. Elsewhere, glosses missing before the insert are
+    reported as created.
+
+    New glosses have no relations yet, so no cached export depends on them;
+    the fuzzy search index is updated on commit since no signals fire.
+
+    Args:
+        pairs: List of (language_iso, content) tuples. Content is stored as
+               given; repeated pairs resolve to the same gloss and only the
+               first one can be reported as created.
+
+    Returns:
+        List of (gloss_id, created) tuples in input order
+
+    Raises:
+        ValueError: If a language does not exist
+    """
+    unique_pairs = list(dict.fromkeys(pairs))
+    isos = {iso for iso, _ in unique_pairs}
+    unknown = isos - set(Language.objects.filter(iso__in=isos).values_list("iso", flat=True))
+    if unknown:
+        raise ValueError(f"Unknown languages: {', '.join(sorted(unknown))}")
+
+    ids = {}
+    created = set()
+    with transaction.atomic():
+        for start in range(0, len(unique_pairs), BATCH_SIZE):
+            batch = unique_pairs[start:start + BATCH_SIZE]
+            if _can_insert_returning():
+                inserted = _insert_returning(batch)
+                existing = lookup_gloss_ids([pair for pair in batch if pair not in inserted])
+            else:
+                existing = lookup_gloss_ids(batch)
+                inserted = _insert_missing([pair for pair in batch if pair not in existing])
+            ids.update(existing)
+            ids.update(inserted)
+            created.update(inserted)
+
+    for iso, content in created:
+        transaction.on_commit(
+            partial(fuzzy_index.update, ids[iso, content], iso, normalize_search_key(content))
+        )
+
+    results = []
+    for pair in pairs:
+        results.append((ids[pair], pair in created))
+        created.discard(pair)
+    return results
+
+
+def _can_insert_returning():
+    features = connection.features
+    return features.can_return_rows_from_bulk_insert and features.supports_update_conflicts_with_target
+
+
+def _insert_returning(pairs):
+    """INSERT ... ON CONFLICT DO NOTHING RETURNING; maps inserted pairs to ids."""
+    meta = Gloss._meta
+    columns = [meta.get_field(name).column for name in ("language", "content", "search_key", "transcriptions")]
+    transcriptions = meta.get_field("transcriptions").get_db_prep_save([], connection)
+    params = []
+    for iso, content in pairs:
+        params.extend((iso, content, normalize_search_key(content), transcriptions))
+
+    quote = connection.ops.quote_name
+    placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(pairs))
+    sql = (
+        f"INSERT INTO {quote(meta.db_table)} ({', '.join(map(quote, columns))}) "
+        f"VALUES {placeholders} "
+        f"ON CONFLICT ({quote(columns[1])}, {quote(columns[0])}) DO NOTHING "
+        f"RETURNING {quote(meta.pk.column)}, {quote(columns[0])}, {quote(columns[1])}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {(iso, content): gloss_id for gloss_id, iso, content in cursor.fetchall()}
+
+
+def _insert_missing(pairs):
+    """bulk_create(ignore_conflicts=True) pairs without a gloss; maps them to ids."""
+    Gloss.objects.bulk_create(
+        [
+            Gloss(language_id=iso, content=content, search_key=normalize_search_key(content))
+            for iso, content in pairs
+        ],
+        ignore_conflicts=True,
+    )
+    return lookup_gloss_ids(pairs)
+
+
+def lookup_gloss_ids(pairs):
+    """Map (language_iso, content) pairs to gloss ids in one query."""
+    contents_by_language = {}
+    for iso, content in pairs:
+        contents_by_language.setdefault(iso, []).append(content)
+    if not contents_by_language:
+        return {}
+
+    condition = Q()
+    for iso, contents in contents_by_language.items():
+        condition |= Q(language_id=iso, content__in=contents)
+    rows = Gloss.objects.filter(condition).values_list("id", "language_id", "content")
+    return {(iso, content): gloss_id for gloss_id, iso, content in rows}
@@ -0,0 +1,186 @@
+import json
+from collections import defaultdict
+
+from django.db import transaction
+
+from cms.export import cache, closure_sql
+from cms.export.graph import RELATION_FIELDS
+from cms.models import Gloss, Language
+
+from .glosses import BATCH_SIZE, get_or_create_glosses, lookup_gloss_ids
+from .relations import add_gloss_relations
+
+
+def import_gloss_jsonl(file, batch_size=BATCH_SIZE):
+    """
+    Import glosses and their relationships from JSONL in the export format.
+
+    Every line is an object as produced by serialize_gloss_to_jsonl() or
+    serialize_gloss_to_json(): language, content, transcriptions, the relation
+    fields and examples, the related glosses given as compound keys
+    ("eng:hello"). The file is read twice, batch_size lines at a time, so
+    memory stays flat however large it is:
+    1. Nodes: glosses are created if missing, and transcriptions of existing
+       glosses are replaced when they differ.
+    2. Edges: referenced keys are resolved in one query per batch and the
+       relations are bulk-inserted with add_gloss_relations(), which also
+       writes the mirror rows of symmetric relations. Examples become
+       clarifies_usage rows of the example. Relations are only added, never
+       removed, and keys without a gloss in the database are skipped.
+
+    Everything runs in one transaction. Cached situation exports depending on
+    changed glosses are invalidated, and the closures of situations reaching
+    a gloss that gained an edge are refreshed once at the end.
+
+    Args:
+        file: Seekable text or binary file
+        batch_size: Lines per batch
+
+    Returns:
+        Dict with the number of glosses read, created and updated, edges
+        written (including ones that already existed) and unresolved keys
+
+    Raises:
+        ValueError: If a line is not a valid gloss object, or a language
+                    does not exist
+    """
+    def read_lines():
+        file.seek(0)
+        for line_number, line in enumerate(file, start=1):
+            yield f"Line {line_number}", line
+
+    return import_gloss_lines(read_lines, batch_size)
+
+
+def import_gloss_lines(read_lines, batch_size=BATCH_SIZE, create_missing=False):
+    """
+    Import gloss JSONL lines from several sources, see import_gloss_jsonl().
+
+    Args:
+        read_lines: Callable returning a fresh iterable of (location, line)
+                    tuples each time; location prefixes error messages
+        batch_size: Lines per batch
+        create_missing: Create glosses for related keys that have no line and
+                        no gloss yet (if their language exists), instead of
+                        skipping them. Exports reference glosses they filter
+                        out, and the key alone is enough to restore them.
+
+    Returns:
+        Dict of counts as returned by import_gloss_jsonl()
+    """
+    stats = {"glosses": 0, "created": 0, "updated": 0, "edges": 0, "unresolved": 0}
+    with transaction.atomic():
+        for batch in _iter_batches(read_lines(), batch_size, with_relations=False):
+            _import_nodes(batch, stats)
+        # Edges are only added, so a situation changes only if its current
+        # closure holds a gloss gaining an edge; collected per batch, refreshed once
+        situation_ids = set()
+        for batch in _iter_batches(read_lines(), batch_size, with_relations=True):
+            situation_ids |= _import_edges(batch, stats, create_missing)
+        closure_sql.refresh_situation_closure(situation_ids)
+    return stats
+
+
+def _iter_batches(lines, batch_size, with_relations):
+    batch = []
+    for location, line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        batch.append(_parse_record(location, line, with_relations))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _parse_record(location, line, with_relations):
+    """Validate one JSONL line; relations are returned as (language, content) keys."""
+    try:
+        data = json.loads(line)
+    except ValueError:
+        raise ValueError(f"{location}: invalid JSON") from None
+    if not isinstance(data, dict):
+        raise ValueError(f"{location}: expected a JSON object")
+
+    language_iso = data.get("language")
+    content = data.get("content")
+    if not isinstance(language_iso, str) or not isinstance(content, str) or not content:
+        raise ValueError(f"{location}: language and content are required")
+    transcriptions = data.get("transcriptions", [])
+    if not isinstance(transcriptions, list):
+        raise ValueError(f"{location}: transcriptions must be a list")
+
+    relations = {}
+    for field_name in [*RELATION_FIELDS, "examples"] if with_relations else ():
+        keys = data.get(field_name, [])
+        if not isinstance(keys, list) or not all(isinstance(key, str) and ":" in key for key in keys):
+            raise ValueError(f"{location}: {field_name} must be a list of compound keys")
+        relations[field_name] = [tuple(key.split(":", 1)) for key in keys]
+
+    return {
+        "key": (language_iso, content),
+        "transcriptions": transcriptions,
+        "relations": relations,
+    }
+
+
+def _import_nodes(batch, stats):
+    resolved = get_or_create_glosses([record["key"] for record in batch])
+    stats["glosses"] += len(batch)
+    stats["created"] += sum(created for _, created in resolved)
+
+    # Later lines win if a gloss appears twice
+    transcriptions = {
+        gloss_id: record["transcriptions"] for record, (gloss_id, _) in zip(batch, resolved)
+    }
+    current = Gloss.objects.filter(pk__in=transcriptions).values_list("id", "transcriptions")
+    changed = [
+        Gloss(pk=gloss_id, transcriptions=transcriptions[gloss_id])
+        for gloss_id, gloss_transcriptions in current
+        if gloss_transcriptions != transcriptions[gloss_id]
+    ]
+    Gloss.objects.bulk_update(changed, ["transcriptions"], batch_size=BATCH_SIZE)
+
+    created_ids = {gloss_id for gloss_id, created in resolved if created}
+    updated_ids = [gloss.pk for gloss in changed if gloss.pk not in created_ids]
+    stats["updated"] += len(updated_ids)
+    cache.invalidate_glosses(updated_ids)
+
+
+def _import_edges(batch, stats, create_missing):
+    """Add the edges of a batch; returns the ids of situations reaching them."""
+    pairs_by_field = defaultdict(set)
+    for record in batch:
+        for field_name, related_keys in record["relations"].items():
+            for related_key in related_keys:
+                if field_name == "examples":
+                    pairs_by_field["clarifies_usage"].add((related_key, record["key"]))
+                else:
+                    pairs_by_field[field_name].add((record["key"], related_key))
+
+    keys = list({key for pairs in pairs_by_field.values() for pair in pairs for key in pair})
+    ids = {}
+    for start in range(0, len(keys), BATCH_SIZE):
+        ids.update(lookup_gloss_ids(keys[start:start + BATCH_SIZE]))
+    missing = [key for key in keys if key not in ids]
+    if create_missing and missing:
+        isos = set(Language.objects.filter(iso__in={iso for iso, _ in missing}).values_list("iso", flat=True))
+        creatable = [key for key in missing if key[0] in isos]
+        for key, (gloss_id, created) in zip(creatable, get_or_create_glosses(creatable)):
+            ids[key] = gloss_id
+            stats["created"] += created
+    stats["unresolved"] += len(keys) - len(ids)
+
+    touched_ids = set()
+    for field_name, pairs in pairs_by_field.items():
+        id_pairs = [
+            (ids[from_key], ids[to_key])
+            for from_key, to_key in pairs
+            if from_key in ids and to_key in ids
+        ]
+        stats["edges"] += add_gloss_relations(field_name, id_pairs, refresh_closure=False)
+        touched_ids.update(gloss_id for pair in id_pairs for gloss_id in pair)
+    return closure_sql.situations_reaching(sorted(touched_ids))
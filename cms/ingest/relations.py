@@ -0,0 +1,147 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Q, Value
+from django.db.models.constants import OnConflict
+
+from cms.export import cache, closure_sql
+from cms.export.graph import RELATION_FIELDS
+from cms.models import Gloss
+
+# Rows per executemany call
+BATCH_SIZE = 2000
+
+
+def set_gloss_relations(gloss_id, relations):
+    """
+    Replace relations of one gloss, like calling .set() on each relation manager.
+
+    The current edges of all given relations are loaded in one query and
+    diffed in memory. Each through table that changes then gets at most one
+    DELETE and one bulk INSERT, so the number of queries does not grow with
+    the number of edges. Symmetric relations keep their mirror rows in sync,
+    as the related managers do.
+
+    No m2m_changed signals fire, so cached exports depending on the gloss or
+    on any gloss gaining or losing an edge are invalidated here, and the
+    situation closures reaching them are refreshed.
+
+    Args:
+        gloss_id: Id of the gloss whose relations are replaced
+        relations: Dict of relation field name -> iterable of related gloss
+                   ids; relations not in the dict are left unchanged
+
+    Returns:
+        Set of ids of the related glosses that gained or lost an edge
+
+    Raises:
+        ValueError: If relations has a key that is not a relation field
+    """
+    unknown = set(relations) - set(RELATION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown relation fields: {', '.join(sorted(unknown))}")
+    field_names = [field_name for field_name in RELATION_FIELDS if field_name in relations]
+    if not field_names:
+        return set()
+
+    changed_ids = set()
+    with transaction.atomic():
+        current = _current_edges(gloss_id, field_names)
+        for field_name in field_names:
+            wanted = set(relations[field_name])
+            added = wanted - current[field_name]
+            removed = current[field_name] - wanted
+            if added or removed:
+                _apply_diff(Gloss._meta.get_field(field_name), gloss_id, added, removed)
+                changed_ids |= added | removed
+        if changed_ids:
+            cache.invalidate_glosses([gloss_id, *changed_ids])
+            closure_sql.refresh_gloss_closure([gloss_id, *changed_ids])
+    return changed_ids
+
+
+def add_gloss_relations(field_name, pairs, refresh_closure=True):
+    """
+    Add edges of one relation in bulk, like .add() called on many glosses.
+
+    Rows are inserted with the backend's ignore-conflicts INSERT through
+    executemany, without building a model instance per edge; edges that
+    already exist are kept. Symmetric relations also get the mirror rows.
+    Cached exports of every gloss gaining an edge are invalidated.
+
+    Args:
+        field_name: Relation field name, one of RELATION_FIELDS
+        pairs: Iterable of (gloss_id, related_gloss_id) tuples
+        refresh_closure: Refresh the situation closures reaching a gloss that
+                         gained an edge; callers adding edges in many calls
+                         can refresh once at the end instead
+
+    Returns:
+        Number of through rows written, mirrors and existing rows included
+
+    Raises:
+        ValueError: If field_name is not a relation field
+    """
+    if field_name not in RELATION_FIELDS:
+        raise ValueError(f"Unknown relation field: {field_name}")
+    field = Gloss._meta.get_field(field_name)
+    rows = set(pairs)
+    if field.remote_field.symmetrical:
+        rows |= {(related_id, gloss_id) for gloss_id, related_id in rows}
+    rows = sorted(rows)
+    if not rows:
+        return 0
+
+    through = field.remote_field.through
+    fields = [through._meta.get_field(name) for name in ("from_gloss", "to_gloss")]
+    quote = connection.ops.quote_name
+    sql = " ".join(part for part in (
+        connection.ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        f"{quote(through._meta.db_table)} ({', '.join(quote(field.column) for field in fields)})",
+        "VALUES (%s, %s)",
+        connection.ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None),
+    ) if part)
+    touched_ids = sorted({gloss_id for row in rows for gloss_id in row})
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(rows), BATCH_SIZE):
+            cursor.executemany(sql, rows[start:start + BATCH_SIZE])
+        for start in range(0, len(touched_ids), BATCH_SIZE):
+            cache.invalidate_glosses(touched_ids[start:start + BATCH_SIZE])
+        if refresh_closure:
+            closure_sql.refresh_gloss_closure(touched_ids)
+    return len(rows)
+
+
+def _current_edges(gloss_id, field_names):
+    """Map field name -> set of related ids, read with one UNION ALL query."""
+    querysets = [
+        getattr(Gloss, field_name).through.objects.filter(from_gloss_id=gloss_id)
+        .annotate(field_index=Value(index))
+        .values_list("field_index", "to_gloss_id")
+        for index, field_name in enumerate(field_names)
+    ]
+    edges = defaultdict(set)
+    for field_index, related_id in querysets[0].union(*querysets[1:], all=True):
+        edges[field_names[field_index]].add(related_id)
+    return edges
+
+
+def _apply_diff(field, gloss_id, added, removed):
+    through = field.remote_field.through
+    symmetrical = field.remote_field.symmetrical
+
+    if removed:
+        condition = Q(from_gloss_id=gloss_id, to_gloss_id__in=removed)
+        if symmetrical:
+            condition |= Q(from_gloss_id__in=removed, to_gloss_id=gloss_id)
+        through.objects.filter(condition).delete()
+
+    if added:
+        rows = {(gloss_id, related_id) for related_id in added}
+        if symmetrical:
+            rows |= {(related_id, gloss_id) for related_id in added}
+        # Mirror rows may already exist if the relation was only stored one way
+        through.objects.bulk_create(
+            [through(from_gloss_id=from_id, to_gloss_id=to_id) for from_id, to_id in sorted(rows)],
+            ignore_conflicts=True,
+        )
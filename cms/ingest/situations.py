@@ -0,0 +1,216 @@
+import io
+import json
+import re
+import zipfile
+from collections import defaultdict
+
+from django.db import transaction
+
+from cms.export import cache, closure_sql
+from cms.models import Language, Situation
+
+from .glosses import BATCH_SIZE, get_or_create_glosses, lookup_gloss_ids
+from .jsonl import import_gloss_lines
+
+
+_INDEX_FILE = re.compile(r"situations_([^_]+)_([^_]+)\.jsonl")
+_LANGUAGE_FILES = ("native_languages.jsonl", "target_languages.jsonl")
+
+
+def import_situation_archive(file, batch_size=BATCH_SIZE):
+    """
+    Restore situations from the ZIP written by situation_download_all.
+
+    The archive is read entry by entry, never extracted:
+    1. Languages of the language index files are created if missing.
+    2. The glosses of all per-pair files are imported like gloss JSONL (see
+       import_gloss_lines()), so relations between files resolve. Related
+       glosses that the export filtered out are restored from their keys.
+    3. Situations of the situations_*.jsonl index files are created or get
+       their image_link updated. In every language the archive has a
+       description for, it replaces the situation's description; root glosses
+       replace situation.glosses when the index rows list them (archives
+       written before index rows had "glosses" leave them untouched).
+
+    Links are written with set-based inserts and deletes, and importing the
+    same archive again changes nothing. Everything runs in one transaction;
+    cached exports of changed situations are invalidated and their closures
+    refreshed.
+
+    Args:
+        file: Path or seekable binary file of the ZIP archive
+        batch_size: Gloss lines per batch
+
+    Returns:
+        Dict with the gloss counts of import_gloss_lines(), plus situations
+        created and updated, and root glosses not found
+
+    Raises:
+        ValueError: If the archive or one of its files is malformed
+    """
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        raise ValueError("Not a ZIP archive") from None
+
+    with archive, transaction.atomic():
+        names = [name for name in archive.namelist() if name.endswith(".jsonl")]
+        index_names = [name for name in names if _INDEX_FILE.fullmatch(name)]
+        gloss_names = [
+            name for name in names if name not in index_names and name not in _LANGUAGE_FILES
+        ]
+
+        _import_languages(archive, [name for name in names if name in _LANGUAGE_FILES])
+
+        def read_gloss_lines():
+            for name in gloss_names:
+                yield from _read_lines(archive, name)
+
+        stats = import_gloss_lines(read_gloss_lines, batch_size, create_missing=True)
+        stats.update(_import_situations(archive, index_names))
+    return stats
+
+
+def _read_lines(archive, name):
+    with archive.open(name) as member:
+        for line_number, line in enumerate(io.TextIOWrapper(member, encoding="utf-8"), start=1):
+            yield f"{name}, line {line_number}", line
+
+
+def _read_rows(archive, name):
+    for location, line in _read_lines(archive, name):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise ValueError(f"{location}: invalid JSON") from None
+        if not isinstance(row, dict):
+            raise ValueError(f"{location}: expected a JSON object")
+        yield location, row
+
+
+def _import_languages(archive, names):
+    languages = {}
+    for name in names:
+        for location, row in _read_rows(archive, name):
+            if not row.get("iso") or not row.get("name"):
+                raise ValueError(f"{location}: iso and name are required")
+            languages[row["iso"]] = Language(iso=row["iso"], name=row["name"], short=row.get("short") or None)
+    Language.objects.bulk_create(languages.values(), ignore_conflicts=True)
+
+
+def _import_situations(archive, index_names):
+    """Apply the index rows; returns counts of situations created and updated."""
+    image_links = {}
+    descriptions = defaultdict(dict)
+    root_keys = {}
+    for name in index_names:
+        target_iso, native_iso = _INDEX_FILE.fullmatch(name).groups()
+        for location, row in _read_rows(archive, name):
+            situation_id = row.get("id")
+            if not situation_id or not isinstance(situation_id, str):
+                raise ValueError(f"{location}: id is required")
+            for field in ("image_link", "target_description", "native_description"):
+                if not isinstance(row.get(field) or "", str):
+                    raise ValueError(f"{location}: {field} must be a string")
+            image_links[situation_id] = row.get("image_link") or None
+            descriptions[situation_id][target_iso] = row.get("target_description")
+            descriptions[situation_id][native_iso] = row.get("native_description")
+            if "glosses" in row:
+                if not isinstance(row["glosses"], list) or not all(isinstance(key, str) for key in row["glosses"]):
+                    raise ValueError(f"{location}: glosses must be a list of strings")
+                root_keys.setdefault(situation_id, set()).update(
+                    tuple(key.split(":", 1)) for key in row["glosses"] if ":" in key
+                )
+
+    existing = Situation.objects.in_bulk(list(image_links))
+    Situation.objects.bulk_create(
+        Situation(id=situation_id, image_link=image_link)
+        for situation_id, image_link in image_links.items()
+        if situation_id not in existing
+    )
+    updated = [
+        situation for situation in existing.values()
+        if situation.image_link != image_links[situation.id]
+    ]
+    for situation in updated:
+        situation.image_link = image_links[situation.id]
+    Situation.objects.bulk_update(updated, ["image_link"])
+
+    description_pairs = list({
+        (language_iso, content)
+        for by_language in descriptions.values()
+        for language_iso, content in by_language.items()
+        if content
+    })
+    description_ids = dict(zip(description_pairs, (
+        gloss_id for gloss_id, _ in get_or_create_glosses(description_pairs)
+    )))
+    wanted_descriptions = {
+        situation_id: {
+            description_ids[language_iso, content]
+            for language_iso, content in by_language.items()
+            if content
+        }
+        for situation_id, by_language in descriptions.items()
+    }
+    changed_ids = _sync_links(
+        Situation.descriptions.through,
+        wanted_descriptions,
+        # Descriptions in languages the archive does not cover are kept
+        keep=lambda situation_id, language_iso: language_iso not in descriptions[situation_id],
+    )
+
+    keys = list({key for situation_keys in root_keys.values() for key in situation_keys})
+    gloss_ids = {}
+    for start in range(0, len(keys), BATCH_SIZE):
+        gloss_ids.update(lookup_gloss_ids(keys[start:start + BATCH_SIZE]))
+    wanted_glosses = {
+        situation_id: {gloss_ids[key] for key in situation_keys if key in gloss_ids}
+        for situation_id, situation_keys in root_keys.items()
+    }
+    changed_ids |= _sync_links(Situation.glosses.through, wanted_glosses)
+
+    # Descriptions decide the closure pairs, root glosses the closure itself
+    closure_sql.refresh_situation_closure(changed_ids)
+    changed_ids.update(situation.id for situation in updated)
+    cache.invalidate_situations(changed_ids)
+    created_ids = set(image_links) - set(existing)
+    return {
+        "situations_created": len(created_ids),
+        "situations_updated": len(changed_ids - created_ids),
+        "unresolved_situation_glosses": len(keys) - len(gloss_ids),
+    }
+
+
+def _sync_links(through, wanted, keep=lambda situation_id, language_iso: False):
+    """
+    Make the situation-gloss links of through equal wanted ({situation_id: gloss ids}).
+
+    Existing links missing from wanted are deleted unless keep(situation_id,
+    gloss language) is true. Returns the ids of situations whose links changed.
+    """
+    existing = defaultdict(dict)
+    rows = through.objects.filter(situation_id__in=list(wanted)).values_list(
+        "id", "situation_id", "gloss_id", "gloss__language_id"
+    )
+    for row_id, situation_id, gloss_id, language_iso in rows:
+        existing[situation_id][gloss_id] = (row_id, language_iso)
+
+    stale_row_ids = []
+    new_rows = []
+    changed_ids = set()
+    for situation_id, gloss_ids in wanted.items():
+        for gloss_id, (row_id, language_iso) in existing[situation_id].items():
+            if gloss_id not in gloss_ids and not keep(situation_id, language_iso):
+                stale_row_ids.append(row_id)
+                changed_ids.add(situation_id)
+        for gloss_id in sorted(gloss_ids - set(existing[situation_id])):
+            new_rows.append(through(situation_id=situation_id, gloss_id=gloss_id))
+            changed_ids.add(situation_id)
+
+    for start in range(0, len(stale_row_ids), BATCH_SIZE):
+        through.objects.filter(pk__in=stale_row_ids[start:start + BATCH_SIZE]).delete()
+    through.objects.bulk_create(new_rows, batch_size=BATCH_SIZE)
+    return changed_ids
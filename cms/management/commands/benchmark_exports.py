@@ -0,0 +1,105 @@
+import json
+import platform
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from cms.benchmark.corpus import generate_corpus, parse_edge_density
+from cms.benchmark.runner import compare_runs, measure, run_export_stages
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the export stages on synthetic corpora of growing size. Each "
+        "size runs in a fresh test database; results are written as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", nargs="+", type=int, default=[1000, 10000, 100000],
+            help="Corpus sizes in glosses",
+        )
+        parser.add_argument("--languages", type=int, default=5, help="Number of languages")
+        parser.add_argument("--situations-per-1000", type=int, default=10, help="Situations per 1000 glosses")
+        parser.add_argument("--density", nargs="+", default=[], metavar="FIELD=NUMBER", help="See generate_corpus")
+        parser.add_argument("--paraphrase-ratio", type=float, default=0.1, help="Share of [paraphrased] glosses")
+        parser.add_argument("--workers", type=int, default=settings.EXPORT_WORKERS, help="Export worker processes")
+        parser.add_argument("--sample-situations", type=int, default=3, help="Situations traversed with the ORM and the CTE")
+        parser.add_argument("--sample-glosses", type=int, default=500, help="Glosses serialized with the ORM")
+        parser.add_argument("--output", default="export-benchmark.json", help="Where to write the results")
+        parser.add_argument("--compare", metavar="PATH", help="Earlier results file to compare against")
+
+    def handle(self, *args, **options):
+        try:
+            edge_density = parse_edge_density(options["density"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        previous = None
+        if options["compare"]:
+            previous = json.loads(Path(options["compare"]).read_text())
+
+        results = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "workers": options["workers"],
+            "runs": [],
+        }
+        for size in options["sizes"]:
+            self.stdout.write(f"Benchmarking {size} glosses...")
+            with _test_database():
+                corpus = measure("generate_corpus", lambda: generate_corpus(
+                    languages=options["languages"],
+                    glosses_per_language=max(1, size // options["languages"]),
+                    situations=max(1, size * options["situations_per_1000"] // 1000),
+                    edge_density=edge_density,
+                    paraphrase_ratio=options["paraphrase_ratio"],
+                ))
+                stages = [corpus, *run_export_stages(
+                    workers=options["workers"],
+                    sample_situations=options["sample_situations"],
+                    sample_glosses=options["sample_glosses"],
+                )]
+            results["runs"].append({"glosses": size, "corpus": corpus.pop("items"), "stages": stages})
+            for stage in stages:
+                self.stdout.write(
+                    f"  {stage['stage']:<32} {stage['seconds']:>9.3f}s {stage['queries']:>8} queries "
+                    f"{stage['peak_memory_bytes'] / 2**20:>9.1f} MiB"
+                )
+
+        Path(options["output"]).write_text(json.dumps(results, indent=2) + "\n")
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if previous is not None:
+            self.stdout.write(f"Compared to {options['compare']}:")
+            for size, stage, before, after in compare_runs(previous, results):
+                ratio = after["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+                self.stdout.write(
+                    f"  {size:>7} {stage:<32} {before['seconds']:>9.3f}s -> {after['seconds']:>9.3f}s "
+                    f"({ratio:.2f}x), queries {before['queries']} -> {after['queries']}"
+                )
+
+
+class _test_database:
+    """Create a fresh test database for the block, like the test runner does."""
+
+    def __enter__(self):
+        self.old_name = connection.settings_dict["NAME"]
+        self.old_test_name = connection.settings_dict["TEST"]["NAME"]
+        if connection.vendor == "sqlite":
+            # A file rather than :memory:, so forked export workers see the data
+            self.directory = tempfile.TemporaryDirectory()
+            connection.settings_dict["TEST"]["NAME"] = str(Path(self.directory.name) / "benchmark.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+    def __exit__(self, *exc_info):
+        connection.creation.destroy_test_db(self.old_name, verbosity=0)
+        connection.settings_dict["TEST"]["NAME"] = self.old_test_name
+        if connection.vendor == "sqlite":
+            self.directory.cleanup()
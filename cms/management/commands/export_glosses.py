@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from cms.export.archive import open_archive
+from cms.export.engine import iter_gloss_files
+from cms.models import Gloss
+
+
+class Command(BaseCommand):
+    help = "Write the gloss export (one JSON file per gloss) to a .zip file or a directory tree."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path ending in .zip, or a directory")
+        parser.add_argument("--jobs", type=int, default=settings.EXPORT_WORKERS, help="Worker processes")
+        parser.add_argument("--languages", nargs="+", metavar="ISO", help="Only export glosses in these languages")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        glosses = Gloss.objects.all()
+        if options["languages"]:
+            glosses = glosses.filter(language_id__in=options["languages"])
+
+        file_count = 0
+        with open_archive(options["output"]) as archive:
+            for filepath, content in iter_gloss_files(glosses, options["jobs"]):
+                archive.writestr(filepath, content)
+                file_count += 1
+        self.stdout.write(f"Gloss files: {time.monotonic() - started:.2f}s ({file_count} files)")
+        self.stdout.write(f"Total: {time.monotonic() - started:.2f}s (written to {options['output']})")
@@ -0,0 +1,79 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from cms.export.archive import open_archive
+from cms.export.cache import iter_cached_situation_exports
+from cms.export.engine import iter_situation_exports
+from cms.export.graph import GlossGraph
+from cms.export.situations import iter_situation_archive_files
+from cms.models import Language, Situation
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the situation export (as built by Download All) to a .zip file "
+        "or a directory tree."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path ending in .zip, or a directory")
+        parser.add_argument("--jobs", type=int, default=settings.EXPORT_WORKERS, help="Worker processes")
+        parser.add_argument("--situations", nargs="+", metavar="ID", help="Only export these situation ids")
+        parser.add_argument(
+            "--pairs", nargs="+", metavar="TARGET_NATIVE",
+            help="Only export these pairs, written like the file names, e.g. arb_eng",
+        )
+        parser.add_argument("--no-cache", action="store_true", help="Recompute everything from a fresh snapshot")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        all_languages = list(Language.objects.all())
+
+        situations = Situation.objects.all()
+        if options["situations"]:
+            situations = situations.filter(pk__in=options["situations"])
+            missing = set(options["situations"]) - set(situations.values_list("id", flat=True))
+            if missing:
+                raise CommandError(f"Unknown situations: {', '.join(sorted(missing))}")
+
+        pairs = None
+        if options["pairs"]:
+            pairs = set()
+            for pair_key in options["pairs"]:
+                target_iso, _, native_iso = pair_key.partition("_")
+                if not target_iso or not native_iso:
+                    raise CommandError(f"Invalid pair {pair_key!r}, expected TARGET_NATIVE")
+                pairs.add((target_iso, native_iso))
+
+        if options["no_cache"]:
+            phase_started = time.monotonic()
+            graph = GlossGraph.load()
+            self._report("Load snapshot", phase_started, f"{len(graph.contents)} glosses")
+            exports = iter_situation_exports(graph, all_languages, situations, options["jobs"], only_pairs=pairs)
+        else:
+            exports = iter_cached_situation_exports(all_languages, situations, options["jobs"], only_pairs=pairs)
+
+        file_count = 0
+        phase_started = time.monotonic()
+
+        def report_situation_files(exports):
+            # Situation files come first, one per export, then the index files
+            nonlocal file_count, phase_started
+            for export in exports:
+                yield export
+            self._report("Situation files", phase_started, f"{file_count} files")
+            file_count = 0
+            phase_started = time.monotonic()
+
+        with open_archive(options["output"]) as archive:
+            for filename, content in iter_situation_archive_files(report_situation_files(exports)):
+                archive.writestr(filename, content)
+                file_count += 1
+            self._report("Index files", phase_started, f"{file_count} files")
+
+        self._report("Total", started, f"written to {options['output']}")
+
+    def _report(self, phase, started, detail):
+        self.stdout.write(f"{phase}: {time.monotonic() - started:.2f}s ({detail})")
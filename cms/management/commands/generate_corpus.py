@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cms.benchmark.corpus import DEFAULT_EDGE_DENSITY, generate_corpus, parse_edge_density
+
+
+class Command(BaseCommand):
+    help = "Create a synthetic gloss corpus with situations, for benchmarks and load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--languages", type=int, default=5, help="Number of languages")
+        parser.add_argument("--glosses-per-language", type=int, default=200, help="Glosses per language")
+        parser.add_argument("--situations", type=int, default=50, help="Number of situations")
+        parser.add_argument("--glosses-per-situation", type=int, default=5, help="Root glosses per situation")
+        parser.add_argument(
+            "--density", nargs="+", default=[], metavar="FIELD=NUMBER",
+            help="Average edges per gloss for a relation type, e.g. translations=2 "
+                 f"(defaults: {', '.join(f'{k}={v}' for k, v in DEFAULT_EDGE_DENSITY.items())})",
+        )
+        parser.add_argument("--paraphrase-ratio", type=float, default=0.1, help="Share of [paraphrased] glosses")
+        parser.add_argument("--prefix", default="z", help="One-letter prefix of language codes and situation ids")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            counts = generate_corpus(
+                languages=options["languages"],
+                glosses_per_language=options["glosses_per_language"],
+                situations=options["situations"],
+                edge_density=parse_edge_density(options["density"]),
+                paraphrase_ratio=options["paraphrase_ratio"],
+                glosses_per_situation=options["glosses_per_situation"],
+                prefix=options["prefix"],
+                seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} in {time.monotonic() - started:.2f}s"))
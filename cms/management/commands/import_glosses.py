@@ -0,0 +1,35 @@
+import shutil
+import sys
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cms.ingest.glosses import BATCH_SIZE
+from cms.ingest.jsonl import import_gloss_jsonl
+
+
+class Command(BaseCommand):
+    help = "Import glosses and relationships from a JSONL file in the export format."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="JSONL file, or - for standard input")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Lines per batch")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            if options["input"] == "-":
+                # The import reads its input twice, so spool stdin to disk
+                with tempfile.TemporaryFile() as file:
+                    shutil.copyfileobj(sys.stdin.buffer, file)
+                    file.seek(0)
+                    stats = import_gloss_jsonl(file, options["batch_size"])
+            else:
+                with open(options["input"], "rb") as file:
+                    stats = import_gloss_jsonl(file, options["batch_size"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        summary = ", ".join(f"{count} {name}" for name, count in stats.items())
+        self.stdout.write(self.style.SUCCESS(f"Imported {summary} in {time.monotonic() - started:.2f}s"))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cms.ingest.glosses import BATCH_SIZE
+from cms.ingest.situations import import_situation_archive
+
+
+class Command(BaseCommand):
+    help = "Import situations and their glosses from a situation download-all ZIP archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("archive", help="Path of the .zip archive")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Gloss lines per batch")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            stats = import_situation_archive(options["archive"], options["batch_size"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        summary = ", ".join(f"{count} {name}" for name, count in stats.items())
+        self.stdout.write(self.style.SUCCESS(f"Imported {summary} in {time.monotonic() - started:.2f}s"))
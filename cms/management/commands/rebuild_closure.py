@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cms.export.closure_sql import refresh_situation_closure
+from cms.models import SituationGlossClosure
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the situation gloss closure table from scratch. Migrations fill it and "
+        "edits keep it up to date; run this after writing to the database directly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("situations", nargs="*", help="Situation ids to rebuild (default: all)")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        refresh_situation_closure(options["situations"] or None)
+        rows = SituationGlossClosure.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt the situation closure ({rows} rows) in {time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from cms.export.jobs import claim_next_job, fail_stale_jobs, run_export_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run pending export jobs. With --loop, keep polling for new jobs. "
+        "Running jobs without progress for --stale-after seconds are failed first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running and poll for new jobs")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --loop")
+        parser.add_argument("--jobs", type=int, default=None, help="Worker processes per export")
+        parser.add_argument(
+            "--stale-after", type=float, default=600.0,
+            help="Seconds without progress after which a running job counts as abandoned",
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options["stale_after"])
+        while True:
+            failed = fail_stale_jobs(stale_after)
+            if failed:
+                self.stderr.write(f"Failed {failed} abandoned export job(s)")
+            job = claim_next_job()
+            if job is None:
+                if not options["loop"]:
+                    return
+                time.sleep(options["interval"])
+                continue
+
+            self.stdout.write(f"Running {job}")
+            try:
+                job = run_export_job(job, workers=options["jobs"])
+            except Exception as e:
+                self.stderr.write(f"Export job {job.pk} failed: {e}")
+                continue
+            self.stdout.write(self.style.SUCCESS(f"Finished {job}: {job.file_size} bytes"))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0005_aiinteraction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SituationExportCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_iso', models.CharField(max_length=3)),
+                ('native_iso', models.CharField(max_length=3)),
+                ('jsonl_content', models.TextField(blank=True)),
+                ('index_row', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('situation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_cache_entries', to='cms.situation')),
+            ],
+            options={
+                'unique_together': {('situation', 'target_iso', 'native_iso')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SituationExportDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gloss_id', models.BigIntegerField(db_index=True)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependencies', to='cms.situationexportcache')),
+            ],
+        ),
+    ]
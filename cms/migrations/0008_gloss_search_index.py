@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from cms.search.schema import create_search_index, drop_search_index
+
+
+def create_index(apps, schema_editor):
+    create_search_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0007_exportjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
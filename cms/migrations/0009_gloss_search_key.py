@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+from cms.models.gloss import normalize_search_key
+from cms.search.schema import create_key_index, drop_key_index, restore_search_triggers
+
+
+def populate_search_keys(apps, schema_editor):
+    Gloss = apps.get_model("cms", "Gloss")
+    last_id = 0
+    while True:
+        rows = list(
+            Gloss.objects.filter(id__gt=last_id).order_by("id").values_list("id", "content")[:5000]
+        )
+        if not rows:
+            return
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                "UPDATE cms_gloss SET search_key = %s WHERE id = %s",
+                [(normalize_search_key(content), gloss_id) for gloss_id, content in rows],
+            )
+        last_id = rows[-1][0]
+
+
+def restore_triggers(apps, schema_editor):
+    # Adding or removing the column rebuilds cms_gloss on SQLite, dropping its triggers
+    restore_search_triggers(schema_editor)
+
+
+def create_index(apps, schema_editor):
+    create_key_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    drop_key_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0008_gloss_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_triggers),
+        migrations.AddField(
+            model_name='gloss',
+            name='search_key',
+            field=models.TextField(db_index=True, default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='gloss',
+            index=models.Index(fields=['language', 'search_key'], name='cms_gloss_languag_c39aa7_idx'),
+        ),
+        migrations.RunPython(populate_search_keys, migrations.RunPython.noop),
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def clear_cache(apps, schema_editor):
+    # Cached index rows predate their "glosses" field
+    apps.get_model("cms", "SituationExportCache").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cms", "0009_gloss_search_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_cache, migrations.RunPython.noop),
+    ]
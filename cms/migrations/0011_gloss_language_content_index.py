@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0010_clear_situation_export_cache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gloss',
+            index=models.Index(fields=['language', 'content'], name='cms_gloss_languag_68b332_idx'),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Relations phase 2 of the closure follows from its phase 1 glosses, as
+# (through field, from column, to column); the last is usage_of_clarified
+PHASE2_EDGES = [
+    ("near_synonyms", "from_gloss_id", "to_gloss_id"),
+    ("near_homophones", "from_gloss_id", "to_gloss_id"),
+    ("clarifies_usage", "from_gloss_id", "to_gloss_id"),
+    ("to_be_differentiated_from", "from_gloss_id", "to_gloss_id"),
+    ("collocations", "from_gloss_id", "to_gloss_id"),
+    ("clarifies_usage", "to_gloss_id", "from_gloss_id"),
+]
+
+
+def backfill_closure(apps, schema_editor):
+    # The receivers only refresh situations already in the table, so existing
+    # situations are added here. A frozen copy of the closure query in
+    # cms.export.closure_sql, run against the historical tables.
+    Gloss = apps.get_model("cms", "Gloss")
+    Situation = apps.get_model("cms", "Situation")
+    SituationGlossClosure = apps.get_model("cms", "SituationGlossClosure")
+    quote = schema_editor.connection.ops.quote_name
+
+    def table(model, field_name):
+        return quote(model._meta.get_field(field_name).remote_field.through._meta.db_table)
+
+    def column(model, field_name):
+        return quote(model._meta.get_field(field_name).column)
+
+    gloss_table = quote(Gloss._meta.db_table)
+    descriptions = table(Situation, "descriptions")
+    related = " UNION ALL ".join(
+        f"SELECT a.situation_id, a.native_iso, a.target_iso, a.other_language, e.{to_column} "
+        f"FROM anchors a JOIN {table(Gloss, field_name)} e ON e.{from_column} = a.gloss_id"
+        for field_name, from_column, to_column in PHASE2_EDGES
+    )
+    columns = ", ".join(
+        column(SituationGlossClosure, name) for name in ("situation", "native_iso", "target_iso", "gloss", "phase")
+    )
+    schema_editor.execute(f"""
+        INSERT INTO {quote(SituationGlossClosure._meta.db_table)} ({columns})
+        WITH RECURSIVE seeds (situation_id, native_iso, target_iso) AS (
+            SELECT DISTINCT n.situation_id, ng.language_id, tg.language_id
+            FROM {descriptions} n
+            JOIN {gloss_table} ng ON ng.id = n.gloss_id
+            JOIN {descriptions} t ON t.situation_id = n.situation_id
+            JOIN {gloss_table} tg ON tg.id = t.gloss_id
+            WHERE ng.language_id <> tg.language_id
+        ),
+        phase1 (situation_id, native_iso, target_iso, gloss_id, language_id) AS (
+            SELECT p.situation_id, p.native_iso, p.target_iso, g.id, g.language_id
+            FROM seeds p
+            JOIN {table(Situation, "glosses")} s ON s.situation_id = p.situation_id
+            JOIN {gloss_table} g ON g.id = s.gloss_id
+            UNION
+            SELECT p.situation_id, p.native_iso, p.target_iso, g.id, g.language_id
+            FROM phase1 p
+            CROSS JOIN (SELECT 0 AS kind UNION ALL SELECT 1) k
+            LEFT JOIN {table(Gloss, "contains")} c ON k.kind = 0 AND c.from_gloss_id = p.gloss_id
+            LEFT JOIN {table(Gloss, "translations")} t ON k.kind = 1 AND t.from_gloss_id = p.gloss_id
+            JOIN {gloss_table} g ON g.id = COALESCE(c.to_gloss_id, t.to_gloss_id)
+            WHERE (k.kind = 0 AND g.language_id IN (p.native_iso, p.target_iso))
+               OR (k.kind = 1 AND p.language_id = p.native_iso AND g.language_id = p.target_iso)
+               OR (k.kind = 1 AND p.language_id = p.target_iso AND g.language_id = p.native_iso)
+        ),
+        anchors (situation_id, native_iso, target_iso, gloss_id, other_language) AS (
+            SELECT situation_id, native_iso, target_iso, gloss_id,
+                   CASE WHEN language_id = native_iso THEN target_iso ELSE native_iso END
+            FROM phase1 WHERE language_id IN (native_iso, target_iso)
+        ),
+        related (situation_id, native_iso, target_iso, other_language, gloss_id) AS ({related}),
+        found (situation_id, native_iso, target_iso, gloss_id, phase) AS (
+            SELECT situation_id, native_iso, target_iso, gloss_id, 1 FROM phase1
+            UNION ALL
+            SELECT situation_id, native_iso, target_iso, gloss_id, 2 FROM related
+            UNION ALL
+            SELECT r.situation_id, r.native_iso, r.target_iso, g.id, 2
+            FROM related r
+            JOIN {table(Gloss, "translations")} e ON e.from_gloss_id = r.gloss_id
+            JOIN {gloss_table} g ON g.id = e.to_gloss_id AND g.language_id = r.other_language
+        )
+        SELECT situation_id, native_iso, target_iso, gloss_id, MIN(phase) FROM found
+        GROUP BY situation_id, native_iso, target_iso, gloss_id
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0011_gloss_language_content_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SituationGlossClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('native_iso', models.CharField(max_length=3)),
+                ('target_iso', models.CharField(max_length=3)),
+                ('phase', models.PositiveSmallIntegerField()),
+                ('gloss', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='situation_closure_rows', to='cms.gloss')),
+                ('situation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='closure_rows', to='cms.situation')),
+            ],
+            options={
+                'unique_together': {('situation', 'native_iso', 'target_iso', 'gloss')},
+            },
+        ),
+        migrations.RunPython(backfill_closure, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,18 @@
 from .gloss import Gloss
 from .language import Language
 from .situation import Situation
+from .situation_closure import SituationGlossClosure
+from .export_cache import SituationExportCache, SituationExportDependency
+from .export_job import ExportJob
 from cms.ai.logging import AIInteraction
 
 __all__ = [
     "Gloss",
     "Language",
     "Situation",
+    "SituationGlossClosure",
+    "SituationExportCache",
+    "SituationExportDependency",
+    "ExportJob",
     "AIInteraction",
 ]
@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class SituationExportCache(models.Model):
+    """Generated export of one situation for one (target, native) language pair."""
+
+    situation = models.ForeignKey("Situation", on_delete=models.CASCADE, related_name="export_cache_entries")
+    target_iso = models.CharField(max_length=3)
+    native_iso = models.CharField(max_length=3)
+    jsonl_content = models.TextField(blank=True)
+    # Row for situations_{target}_{native}.jsonl; null if the pair is not valid
+    index_row = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("situation", "target_iso", "native_iso")
+
+    def __str__(self):
+        return f"{self.situation_id}_{self.target_iso}_{self.native_iso}"
+
+
+class SituationExportDependency(models.Model):
+    """Maps a gloss id to a cache entry that has to be rebuilt when the gloss changes."""
+
+    entry = models.ForeignKey(SituationExportCache, on_delete=models.CASCADE, related_name="dependencies")
+    # Plain id instead of a foreign key so deleted glosses can still be looked up
+    gloss_id = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"{self.entry} <- {self.gloss_id}"
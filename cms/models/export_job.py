@@ -0,0 +1,45 @@
+from django.db import models
+
+
+class ExportJob(models.Model):
+    """A "Download All" export built outside the request by run_export_jobs."""
+
+    KIND_SITUATIONS = "situations"
+    KIND_GLOSSES = "glosses"
+    KIND_CHOICES = [
+        (KIND_SITUATIONS, "Situations"),
+        (KIND_GLOSSES, "Glosses"),
+    ]
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    # File name inside settings.EXPORT_ROOT
+    file_name = models.CharField(max_length=255, blank=True)
+    file_size = models.PositiveBigIntegerField(default=0)
+    etag = models.CharField(max_length=64, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Set on every status or progress write; running jobs that stop advancing
+    # it are failed by run_export_jobs
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind} export #{self.pk} ({self.status})"
+
+    def download_name(self):
+        return f"sbll_all_{self.kind}.zip"
@@ -1,10 +1,24 @@
+import unicodedata
+
 from django.db import models
 
 
+def normalize_search_key(text):
+    """
+    Normalize text for search: accents stripped, casefolded, whitespace collapsed.
+    Example: "  Crème   Brûlée" -> "creme brulee"
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
 class Gloss(models.Model):
     content = models.TextField()
     language = models.ForeignKey("Language", on_delete=models.CASCADE)
     transcriptions = models.JSONField(default=list)
+    # normalize_search_key(content), kept in sync by save()
+    search_key = models.TextField(default="", editable=False, db_index=True)
 
     contains = models.ManyToManyField("self", related_name="contained_by", symmetrical=False, blank=True)
     near_synonyms = models.ManyToManyField("self", symmetrical=True, blank=True)
@@ -17,10 +31,22 @@ class Gloss(models.Model):
     # content+language should be unique together
     class Meta:
         unique_together = ("content", "language")
+        indexes = [
+            models.Index(fields=["language", "search_key"]),
+            # Keyset pagination of gloss_list
+            models.Index(fields=["language", "content"]),
+        ]
 
     def __str__(self):
         return f"{self.language}: {self.content}"
 
+    def save(self, *args, **kwargs):
+        self.search_key = normalize_search_key(self.content)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "search_key"}
+        super().save(*args, **kwargs)
+
     def get_compound_key(self):
         """
         Returns a compound key for cross-referencing glosses without using internal IDs.
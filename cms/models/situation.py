@@ -1,4 +1,33 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+class SituationQuerySet(models.QuerySet):
+    def with_summary(self):
+        """
+        Annotate what situation lists show, as subqueries of the same query.
+
+        english_description is the label used by __str__ (None without an
+        English description); gloss_count and description_count count the
+        root glosses and descriptions.
+        """
+        descriptions = Situation.descriptions.through.objects.filter(situation_id=OuterRef("pk"))
+        glosses = Situation.glosses.through.objects.filter(situation_id=OuterRef("pk"))
+        return self.annotate(
+            english_description=Subquery(
+                descriptions.filter(gloss__language_id="eng")
+                .order_by("gloss_id")
+                .values("gloss__content")[:1]
+            ),
+            gloss_count=_count(glosses),
+            description_count=_count(descriptions),
+        )
+
+
+def _count(links):
+    counts = links.values("situation_id").annotate(count=Count("*")).values("count")
+    return Coalesce(Subquery(counts), 0)
 
 
 class Situation(models.Model):
@@ -8,7 +37,12 @@ class Situation(models.Model):
 
     image_link = models.URLField(blank=True, null=True)
 
+    objects = SituationQuerySet.as_manager()
+
     # use description gloss of language with iso "eng", if not exist, id
     def __str__(self):
+        if hasattr(self, "english_description"):
+            # Preloaded by SituationQuerySet.with_summary()
+            return self.english_description or self.id
         english_description = self.descriptions.filter(language__iso="eng").first()
         return english_description.content if english_description else self.id
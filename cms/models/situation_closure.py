@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class SituationGlossClosure(models.Model):
+    """
+    A gloss collected for one situation and (native, target) language pair.
+
+    Materializes collect_gloss_rows() for every pair the situation is exported
+    in (both orders of each two languages it is described in). Kept up to date
+    by the signal receivers and bulk writers through cms.export.closure_sql;
+    manage.py rebuild_closure recomputes it from scratch.
+    """
+
+    situation = models.ForeignKey("Situation", on_delete=models.CASCADE, related_name="closure_rows")
+    gloss = models.ForeignKey("Gloss", on_delete=models.CASCADE, related_name="situation_closure_rows")
+    native_iso = models.CharField(max_length=3)
+    target_iso = models.CharField(max_length=3)
+    # 1: reached through contains and translations, 2: related at 1.5 depth
+    phase = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ("situation", "native_iso", "target_iso", "gloss")
+
+    def __str__(self):
+        return f"{self.situation_id}_{self.target_iso}_{self.native_iso} -> {self.gloss_id}"
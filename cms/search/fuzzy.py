@@ -0,0 +1,179 @@
+import threading
+from collections import OrderedDict, defaultdict
+
+from cms.models import Gloss
+from cms.models.gloss import normalize_search_key
+
+
+# Grams per key; each edit changes at most this many grams of a key
+GRAM_SIZE = 3
+_PAD = "\x00" * (GRAM_SIZE - 1)
+
+# Languages whose index a process keeps; the least recently searched one is
+# dropped beyond that
+MAX_LOADED_LANGUAGES = 4
+
+
+def fuzzy_glosses(query, language_iso, max_distance=1, limit=10):
+    """
+    Return glosses whose search key is within max_distance edits of query.
+
+    Args:
+        query: Search text, normalized like Gloss.search_key
+        language_iso: ISO code of the language to search
+        max_distance: Maximum Levenshtein distance
+        limit: Maximum number of results
+
+    Returns:
+        List of (gloss, distance) tuples, closest first. Short queries allow
+        fewer edits, see FuzzyIndex.
+    """
+    key = normalize_search_key(query)
+    if not key:
+        return []
+    matches = fuzzy_index.search(key, language_iso, max_distance)[:limit]
+    # The index can still list glosses deleted by other processes
+    glosses = Gloss.objects.select_related("language").in_bulk(
+        [gloss_id for _, gloss_id in matches]
+    )
+    return [(glosses[gloss_id], distance) for distance, gloss_id in matches if gloss_id in glosses]
+
+
+class FuzzyIndex:
+    """
+    In-memory edit-distance index over Gloss.search_key, one per language.
+
+    Each language maps the padded trigrams of its keys to gloss ids. An edit
+    changes at most GRAM_SIZE grams, so a key within k edits shares at least
+    one of any GRAM_SIZE * k + 1 grams of the query: candidates come from the
+    rarest ones only, and are checked by length and shared grams before a
+    bounded Levenshtein distance is computed. Queries too short to have that
+    many grams are searched with a smaller distance, much like the usual
+    "fuzziness grows with length" rule of search engines.
+
+    Languages are loaded on first use, at most max_languages at a time with
+    the least recently searched one dropped first, and then kept current by the Gloss
+    post_save and post_delete signals, applied once their transaction
+    commits. Writes that skip signals (bulk_create, QuerySet.update, other
+    processes) are only picked up after clear().
+    """
+
+    def __init__(self, max_languages=MAX_LOADED_LANGUAGES):
+        self._lock = threading.Lock()
+        self._max_languages = max_languages
+        self._languages = OrderedDict()
+
+    def search(self, key, language_iso, max_distance):
+        """
+        Return (distance, gloss_id) pairs within max_distance of key, closest first.
+        """
+        with self._lock:
+            language = self._languages.get(language_iso)
+            if language is None:
+                language = self._languages[language_iso] = _LanguageIndex.load(language_iso)
+                while len(self._languages) > self._max_languages:
+                    self._languages.popitem(last=False)
+            else:
+                self._languages.move_to_end(language_iso)
+            return language.search(key, max_distance)
+
+    def update(self, gloss_id, language_iso, key):
+        """Index the current key of a saved gloss."""
+        with self._lock:
+            for iso, language in self._languages.items():
+                if iso != language_iso:
+                    language.discard(gloss_id)
+            if language_iso in self._languages:
+                self._languages[language_iso].add(gloss_id, key)
+
+    def remove(self, gloss_id):
+        """Forget a deleted gloss."""
+        with self._lock:
+            for language in self._languages.values():
+                language.discard(gloss_id)
+
+    def clear(self):
+        """Drop all loaded languages; they are reloaded on next use."""
+        with self._lock:
+            self._languages.clear()
+
+
+class _LanguageIndex:
+    def __init__(self):
+        self.keys = {}
+        # Append-only posting lists: entries left behind by edits are skipped
+        # when candidates are checked against their current key
+        self.grams = defaultdict(list)
+
+    @classmethod
+    def load(cls, language_iso):
+        index = cls()
+        rows = Gloss.objects.filter(language_id=language_iso).values_list("id", "search_key")
+        for gloss_id, key in rows.iterator(chunk_size=5000):
+            index.add(gloss_id, key)
+        return index
+
+    def add(self, gloss_id, key):
+        if self.keys.get(gloss_id) == key:
+            return
+        self.keys[gloss_id] = key
+        for gram in _grams(key):
+            self.grams[gram].append(gloss_id)
+
+    def discard(self, gloss_id):
+        self.keys.pop(gloss_id, None)
+
+    def search(self, key, max_distance):
+        grams = _grams(key)
+        max_distance = min(max_distance, (len(grams) - 1) // GRAM_SIZE)
+        min_shared = len(grams) - GRAM_SIZE * max_distance
+
+        rarest = sorted(grams, key=lambda gram: len(self.grams.get(gram, ())))
+        candidate_ids = set()
+        for gram in rarest[:GRAM_SIZE * max_distance + 1]:
+            candidate_ids.update(self.grams.get(gram, ()))
+
+        matches = []
+        for gloss_id in candidate_ids:
+            candidate = self.keys.get(gloss_id)
+            if (
+                candidate is None
+                or abs(len(candidate) - len(key)) > max_distance
+                or len(grams & _grams(candidate)) < min_shared
+            ):
+                continue
+            distance = bounded_levenshtein(key, candidate, max_distance)
+            if distance is not None:
+                matches.append((distance, gloss_id))
+        matches.sort()
+        return matches
+
+
+def bounded_levenshtein(first, second, max_distance):
+    """
+    Return the Levenshtein distance of two strings, or None if it exceeds
+    max_distance. Stops as soon as every alignment is over the bound.
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return None
+    previous = list(range(len(second) + 1))
+    for row, first_char in enumerate(first, start=1):
+        current = [row]
+        for column, second_char in enumerate(second, start=1):
+            current.append(min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (first_char != second_char),
+            ))
+        if min(current) > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def _grams(key):
+    padded = _PAD + key + _PAD
+    return {padded[start:start + GRAM_SIZE] for start in range(len(padded) - GRAM_SIZE + 1)}
+
+
+fuzzy_index = FuzzyIndex()
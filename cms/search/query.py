@@ -0,0 +1,238 @@
+import re
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from cms.models import Gloss
+from cms.models.gloss import normalize_search_key
+
+from .schema import FTS_TABLE, KEY_TABLE
+
+
+# Above this many full-text matches, walking glosses in content order and
+# checking each one is cheaper than sorting every match
+DENSE_MATCHES = 2000
+
+_TOKEN = re.compile(r"\w+")
+
+# Trigram indexes cannot look up shorter substrings
+_TRIGRAM = 3
+
+
+def rank_glosses(query, language_iso=None, limit=10):
+    """
+    Return the best matches for query: exact, then prefix, word and substring.
+
+    Matching compares normalized search keys (see normalize_search_key()).
+    Each tier is one indexed query that fetches only as many glosses as are
+    still missing, so nothing is scanned or sorted in Python:
+    - exact: the search key equals the normalized query
+    - prefix: the search key starts with it
+    - word: every query word starts a word of the content or a transcription
+    - substring: the search key contains it
+    Within a tier, glosses are ordered by search key (word tier: by content).
+
+    Args:
+        query: Search text; an empty query returns glosses by search key
+        language_iso: Optional ISO code to restrict results to one language
+        limit: Maximum number of results
+
+    Returns:
+        List of (gloss, tier) tuples, tier being one of the names above, or
+        None for an empty query
+    """
+    glosses = Gloss.objects.select_related("language")
+    if language_iso:
+        glosses = glosses.filter(language_id=language_iso)
+    key = normalize_search_key(query)
+    if not key:
+        return [(gloss, None) for gloss in glosses.order_by("search_key", "id")[:limit]]
+
+    tiers = [
+        ("exact", lambda: glosses.filter(search_key=key).order_by("id")),
+        ("prefix", lambda: _key_prefix(glosses, key).order_by("search_key", "id")),
+        ("word", lambda: search_glosses(query, language_iso).select_related("language")),
+        ("substring", lambda: _key_substring(glosses, key).order_by("search_key", "id")),
+    ]
+    results = []
+    seen = set()
+    for tier, build_queryset in tiers:
+        if len(results) >= limit:
+            break
+        for gloss in build_queryset().exclude(pk__in=seen)[:limit - len(results)]:
+            seen.add(gloss.pk)
+            results.append((gloss, tier))
+    return results
+
+
+def exact_glosses(lookups):
+    """
+    Return the glosses whose content equals each (content, language_iso) lookup.
+
+    All lookups are answered by one query: contents are grouped by language
+    into content IN (...) conditions, which the (content, language) unique
+    index serves. A lookup without a language matches the content in every
+    language.
+
+    Args:
+        lookups: List of (content, language_iso) tuples, language_iso optional
+
+    Returns:
+        List of gloss lists in lookup order, each ordered by language
+    """
+    contents_by_language = defaultdict(set)
+    for content, language_iso in lookups:
+        contents_by_language[language_iso or None].add(content)
+    if not contents_by_language:
+        return []
+
+    condition = Q()
+    for language_iso, contents in contents_by_language.items():
+        lookup = Q(content__in=sorted(contents))
+        if language_iso:
+            lookup &= Q(language_id=language_iso)
+        condition |= lookup
+    matches = defaultdict(list)
+    for gloss in Gloss.objects.select_related("language").filter(condition).order_by("language_id"):
+        matches[gloss.content].append(gloss)
+    return [
+        [gloss for gloss in matches[content] if not language_iso or gloss.language_id == language_iso]
+        for content, language_iso in lookups
+    ]
+
+
+def list_glosses(query="", language_iso=None, after=None):
+    """
+    Return glosses ordered by (language, content) for keyset pagination.
+
+    The (language, content) index serves both the order and the start of a
+    page: after is compared as a row value, so a page deep into the list is
+    as cheap as the first one, and a language filter narrows the index range.
+    A query filters like search_glosses(), in every language at once, so
+    dense matches are checked row by row along the same index walk.
+
+    Args:
+        query: Optional search text
+        language_iso: Optional ISO code to restrict results to one language
+        after: Optional (language_iso, content) tuple; only glosses sorting
+               after it are returned
+
+    Returns:
+        Gloss queryset ordered by language and content
+    """
+    glosses = search_glosses(query) if query else Gloss.objects.all()
+    # Prefetched rather than joined: with the join, SQLite drives the query
+    # from the language table and sorts instead of walking the index
+    glosses = glosses.prefetch_related("language").order_by("language_id", "content")
+    if language_iso:
+        glosses = glosses.filter(language_id=language_iso)
+        if after:
+            # Within one language a plain content range uses the index fully
+            after_language, after_content = after
+            if after_language > language_iso:
+                return glosses.none()
+            if after_language == language_iso:
+                glosses = glosses.filter(content__gt=after_content)
+    elif after:
+        table = Gloss._meta.db_table
+        glosses = glosses.filter(RawSQL(
+            f"({table}.language_id, {table}.content) > (%s, %s)", list(after), output_field=BooleanField()
+        ))
+    return glosses
+
+
+def search_glosses(query, language_iso=None):
+    """
+    Return glosses matching query in content or transcriptions, ordered by content.
+
+    On SQLite the FTS5 index is used: every word of query must match the start
+    of a word in the content or a transcription. A cheap probe counts the
+    matches up to DENSE_MATCHES to choose between sorting all matches and
+    walking glosses in content order. Other backends fall back to icontains,
+    which PostgreSQL answers from its trigram indexes.
+
+    Args:
+        query: Search text; an empty query matches every gloss
+        language_iso: Optional ISO code to restrict results to one language
+
+    Returns:
+        Gloss queryset ordered by content
+    """
+    glosses = Gloss.objects.order_by("content", "language_id")
+    terms = _fts_terms(query) if connection.vendor == "sqlite" else None
+    if terms:
+        match = terms
+        if language_iso:
+            match += ' AND language_id : "' + language_iso.replace('"', '""') + '"'
+        if _count_matches(FTS_TABLE, match, DENSE_MATCHES) < DENSE_MATCHES:
+            return glosses.filter(pk__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+            ))
+        return glosses.filter(_dense_filter(terms, language_iso))
+
+    if language_iso:
+        glosses = glosses.filter(language_id=language_iso)
+    if not query:
+        return glosses
+    lookup = Q(content__icontains=query)
+    if _TOKEN.search(query):
+        # Without words, query would match the JSON syntax of transcriptions
+        lookup |= Q(transcriptions__icontains=query)
+    return glosses.filter(lookup)
+
+
+def _key_prefix(glosses, key):
+    if connection.vendor == "sqlite":
+        # LIKE only uses an index on NOCASE columns in SQLite; a range works on
+        # the binary-collated search_key index
+        return glosses.filter(search_key__gte=key, search_key__lt=key + "\U0010ffff")
+    return glosses.filter(search_key__startswith=key)
+
+
+def _key_substring(glosses, key):
+    if connection.vendor == "sqlite" and len(key) >= _TRIGRAM:
+        phrase = '"' + key.replace('"', '""') + '"'
+        if _count_matches(KEY_TABLE, phrase, DENSE_MATCHES) < DENSE_MATCHES:
+            return glosses.filter(pk__in=RawSQL(
+                f"SELECT rowid FROM {KEY_TABLE} WHERE {KEY_TABLE} MATCH %s", [phrase]
+            ))
+    # Common substrings are found quickly by walking the search_key index
+    return glosses.filter(search_key__contains=key)
+
+
+def _fts_terms(query):
+    """Build an FTS5 query of quoted prefix terms; None if query has no words."""
+    terms = [f'"{token}"*' for token in _TOKEN.findall(query)]
+    if not terms:
+        return None
+    return "{content transcriptions} : (" + " ".join(terms) + ")"
+
+
+def _dense_filter(terms, language_iso):
+    """
+    Per-row full-text check, so SQLite walks the (content, language_id) index
+    in order and stops after the first hits. The language is compared on that
+    index rather than in the full-text query; the unary + keeps SQLite from
+    switching to the language index, which would need a sort.
+    """
+    table = Gloss._meta.db_table
+    sql = (
+        f"EXISTS (SELECT 1 FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+        f"AND rowid = {table}.id)"
+    )
+    params = [terms]
+    if language_iso:
+        sql = f"+{table}.language_id = %s AND {sql}"
+        params.insert(0, language_iso)
+    return RawSQL(sql, params, output_field=BooleanField())
+
+
+def _count_matches(table, match, limit):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT count(*) FROM (SELECT rowid FROM {table} WHERE {table} MATCH %s LIMIT %s)",
+            [match, limit],
+        )
+        return cursor.fetchone()[0]
@@ -0,0 +1,149 @@
+"""Backend-specific full-text indexes over Gloss, created by migrations."""
+
+FTS_TABLE = "cms_gloss_fts"
+KEY_TABLE = "cms_gloss_key_trigram"
+
+# FTS5 table holding the searchable text of every gloss, keyed by gloss id.
+# Transcriptions are stored JSON-encoded with non-ASCII characters escaped,
+# so the triggers index the decoded strings instead. The prefix indexes keep
+# short prefix queries from scanning the whole term list.
+_TRANSCRIPTIONS = "(SELECT group_concat(value, ' ') FROM json_each({row}.transcriptions))"
+
+_SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON cms_gloss BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, content, transcriptions, language_id)
+        VALUES (new.id, new.content, {_TRANSCRIPTIONS.format(row="new")}, new.language_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON cms_gloss BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF content, transcriptions, language_id ON cms_gloss BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, content, transcriptions, language_id)
+        VALUES (new.id, new.content, {_TRANSCRIPTIONS.format(row="new")}, new.language_id);
+    END
+    """,
+]
+
+_SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        content, transcriptions, language_id,
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )
+    """,
+    *_SQLITE_TRIGGERS,
+    # Index the rows that already exist
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, content, transcriptions, language_id)
+    SELECT id, content, {_TRANSCRIPTIONS.format(row="cms_gloss")}, language_id FROM cms_gloss
+    """,
+]
+
+_SQLITE_DROP = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+# Trigram indexes matching the UPPER(...) LIKE expressions of icontains
+_POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS cms_gloss_content_trgm "
+    "ON cms_gloss USING gin (UPPER(content) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS cms_gloss_transcriptions_trgm "
+    "ON cms_gloss USING gin (UPPER(transcriptions::text) gin_trgm_ops)",
+]
+
+_POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS cms_gloss_content_trgm",
+    "DROP INDEX IF EXISTS cms_gloss_transcriptions_trgm",
+]
+
+# Trigram index over Gloss.search_key for substring matches. It is an
+# external-content table, so it stores no copy of the keys.
+_SQLITE_KEY_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {KEY_TABLE} USING fts5(
+        search_key, content='cms_gloss', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {KEY_TABLE}_insert AFTER INSERT ON cms_gloss BEGIN
+        INSERT INTO {KEY_TABLE}(rowid, search_key) VALUES (new.id, new.search_key);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {KEY_TABLE}_delete AFTER DELETE ON cms_gloss BEGIN
+        INSERT INTO {KEY_TABLE}({KEY_TABLE}, rowid, search_key)
+        VALUES ('delete', old.id, old.search_key);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {KEY_TABLE}_update AFTER UPDATE OF search_key ON cms_gloss BEGIN
+        INSERT INTO {KEY_TABLE}({KEY_TABLE}, rowid, search_key)
+        VALUES ('delete', old.id, old.search_key);
+        INSERT INTO {KEY_TABLE}(rowid, search_key) VALUES (new.id, new.search_key);
+    END
+    """,
+    f"INSERT INTO {KEY_TABLE}({KEY_TABLE}) VALUES ('rebuild')",
+]
+
+_SQLITE_KEY_DROP = [
+    f"DROP TRIGGER IF EXISTS {KEY_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {KEY_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {KEY_TABLE}_update",
+    f"DROP TABLE IF EXISTS {KEY_TABLE}",
+]
+
+_POSTGRES_KEY_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS cms_gloss_search_key_trgm "
+    "ON cms_gloss USING gin (search_key gin_trgm_ops)",
+]
+
+_POSTGRES_KEY_DROP = [
+    "DROP INDEX IF EXISTS cms_gloss_search_key_trgm",
+]
+
+
+def create_search_index(schema_editor):
+    """Create the search index for the database backend, if it has one."""
+    _execute(schema_editor, {"sqlite": _SQLITE_CREATE, "postgresql": _POSTGRES_CREATE})
+
+
+def drop_search_index(schema_editor):
+    """Drop the search index created by create_search_index()."""
+    _execute(schema_editor, {"sqlite": _SQLITE_DROP, "postgresql": _POSTGRES_DROP})
+
+
+def restore_search_triggers(schema_editor):
+    """
+    Recreate the SQLite triggers of the search index.
+
+    SQLite migrations that rebuild cms_gloss drop its triggers, so they must
+    call this afterwards.
+    """
+    _execute(schema_editor, {"sqlite": _SQLITE_TRIGGERS})
+
+
+def create_key_index(schema_editor):
+    """Create the substring index over Gloss.search_key, if the backend has one."""
+    _execute(schema_editor, {"sqlite": _SQLITE_KEY_CREATE, "postgresql": _POSTGRES_KEY_CREATE})
+
+
+def drop_key_index(schema_editor):
+    """Drop the index created by create_key_index()."""
+    _execute(schema_editor, {"sqlite": _SQLITE_KEY_DROP, "postgresql": _POSTGRES_KEY_DROP})
+
+
+def _execute(schema_editor, statements_by_vendor):
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
@@ -0,0 +1,163 @@
+"""Signal receivers that keep derived export data in sync with edits."""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from cms.export import cache, closure_sql
+from cms.export.graph import RELATION_FIELDS
+from cms.models import Gloss, Situation
+from cms.search.fuzzy import fuzzy_index
+
+
+@receiver(post_save, sender=Gloss)
+def gloss_saved(sender, instance, created, **kwargs):
+    # A new gloss has no edges yet, so no cache entry can depend on it
+    if not created:
+        cache.invalidate_glosses([instance.pk])
+
+
+@receiver(post_delete, sender=Gloss)
+def gloss_deleted(sender, instance, **kwargs):
+    cache.invalidate_glosses([instance.pk])
+
+
+# The in-process index is not rolled back with the database, so it only
+# follows writes once they are committed
+@receiver(post_save, sender=Gloss)
+def gloss_saved_fuzzy_index(sender, instance, **kwargs):
+    transaction.on_commit(partial(fuzzy_index.update, instance.pk, instance.language_id, instance.search_key))
+
+
+@receiver(post_delete, sender=Gloss)
+def gloss_deleted_fuzzy_index(sender, instance, **kwargs):
+    transaction.on_commit(partial(fuzzy_index.remove, instance.pk))
+
+
+def gloss_relation_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        cache.invalidate_glosses([instance.pk, *pk_set])
+    elif action == "pre_clear":
+        # pk_set is not provided for clear, so look up the glosses losing an edge
+        related_ids = list(sender.objects.filter(
+            **{"to_gloss_id" if reverse else "from_gloss_id": instance.pk}
+        ).values_list("from_gloss_id" if reverse else "to_gloss_id", flat=True))
+        cache.invalidate_glosses([instance.pk, *related_ids])
+
+
+for field_name in RELATION_FIELDS:
+    m2m_changed.connect(
+        gloss_relation_changed,
+        sender=getattr(Gloss, field_name).through,
+        dispatch_uid=f"cms_gloss_{field_name}_changed",
+    )
+
+
+@receiver(post_save, sender=Situation)
+def situation_saved(sender, instance, created, **kwargs):
+    if not created:
+        cache.invalidate_situations([instance.pk])
+
+
+@receiver(m2m_changed, sender=Situation.glosses.through)
+@receiver(m2m_changed, sender=Situation.descriptions.through)
+def situation_glosses_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_") and action != "pre_clear":
+        return
+    if not reverse:
+        cache.invalidate_situations([instance.pk])
+    elif action == "pre_clear":
+        # Clearing from the gloss side: every situation linked to it changes
+        cache.invalidate_situations(
+            sender.objects.filter(gloss_id=instance.pk).values_list("situation_id", flat=True)
+        )
+    elif pk_set:
+        # post_clear has no pk_set; pre_clear already invalidated those situations
+        cache.invalidate_situations(pk_set)
+
+
+# Situation closure: refresh the situations an edit can reach. Receivers of
+# clears and deletes note them before the rows are gone.
+
+def _closure_situations(gloss):
+    """Situations reaching gloss, plus those it describes (their pairs depend on its language)."""
+    described = Situation.descriptions.through.objects.filter(gloss_id=gloss.pk)
+    return closure_sql.situations_reaching([gloss.pk]) | set(described.values_list("situation_id", flat=True))
+
+
+@receiver(pre_save, sender=Gloss)
+def gloss_saving_closure(sender, instance, **kwargs):
+    instance._closure_language_changed = instance.pk is not None and (
+        Gloss.objects.filter(pk=instance.pk).exclude(language_id=instance.language_id).exists()
+    )
+
+
+def _neighbour_ids(gloss):
+    """Glosses with an edge to or from gloss, in either direction of every relation."""
+    neighbour_ids = set()
+    for field_name in RELATION_FIELDS:
+        through = getattr(Gloss, field_name).through
+        for from_id, to_id in through.objects.filter(
+            Q(from_gloss_id=gloss.pk) | Q(to_gloss_id=gloss.pk)
+        ).values_list("from_gloss_id", "to_gloss_id"):
+            neighbour_ids.add(to_id if from_id == gloss.pk else from_id)
+    return neighbour_ids
+
+
+@receiver(post_save, sender=Gloss)
+def gloss_saved_closure(sender, instance, created, **kwargs):
+    if not created and instance.__dict__.pop("_closure_language_changed", False):
+        # Traversals filter edges by language, so the gloss can now be reached,
+        # or no longer, from any situation holding one of its neighbours
+        closure_sql.refresh_situation_closure(
+            _closure_situations(instance) | closure_sql.situations_reaching(_neighbour_ids(instance))
+        )
+
+
+@receiver(pre_delete, sender=Gloss)
+def gloss_deleting_closure(sender, instance, **kwargs):
+    instance._closure_situation_ids = _closure_situations(instance)
+
+
+@receiver(post_delete, sender=Gloss)
+def gloss_deleted_closure(sender, instance, **kwargs):
+    closure_sql.refresh_situation_closure(instance.__dict__.pop("_closure_situation_ids", ()))
+
+
+def gloss_relation_changed_closure(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        closure_sql.refresh_gloss_closure([instance.pk, *pk_set])
+    elif action == "pre_clear":
+        related_ids = sender.objects.filter(
+            **{"to_gloss_id" if reverse else "from_gloss_id": instance.pk}
+        ).values_list("from_gloss_id" if reverse else "to_gloss_id", flat=True)
+        instance._closure_situation_ids = closure_sql.situations_reaching([instance.pk, *related_ids])
+    elif action == "post_clear":
+        closure_sql.refresh_situation_closure(instance.__dict__.pop("_closure_situation_ids", ()))
+
+
+for field_name in RELATION_FIELDS:
+    m2m_changed.connect(
+        gloss_relation_changed_closure,
+        sender=getattr(Gloss, field_name).through,
+        dispatch_uid=f"cms_gloss_{field_name}_changed_closure",
+    )
+
+
+@receiver(m2m_changed, sender=Situation.glosses.through)
+@receiver(m2m_changed, sender=Situation.descriptions.through)
+def situation_glosses_changed_closure(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            closure_sql.refresh_situation_closure([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        closure_sql.refresh_situation_closure(pk_set)
+    elif action == "pre_clear":
+        instance._closure_situation_ids = set(
+            sender.objects.filter(gloss_id=instance.pk).values_list("situation_id", flat=True)
+        )
+    elif action == "post_clear":
+        closure_sql.refresh_situation_closure(instance.__dict__.pop("_closure_situation_ids", ()))
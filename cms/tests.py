@@ -1,3 +1,1129 @@
-from django.test import TestCase
+import importlib
+import io
+import json
+import random
+import tempfile
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import patch
+from itertools import permutations
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from cms.benchmark.corpus import generate_corpus
+from cms.export.archive import write_zip
+from cms.export.cache import iter_cached_situation_exports
+from cms.export.closure import collect_gloss_ids, collect_gloss_ids_for_pairs
+from cms.export.closure_sql import closure_gloss_ids, collect_gloss_rows, refresh_situation_closure
+from cms.export.engine import iter_gloss_files, iter_situation_exports
+from cms.export.graph import RELATION_FIELDS, GlossGraph
+from cms.export.serialize import serialize_gloss_to_jsonl
+from cms.export.situations import iter_situation_archive_files
+from cms.ingest.examples import save_example_sentences
+from cms.ingest.glosses import get_or_create_glosses
+from cms.ingest.jsonl import import_gloss_jsonl
+from cms.ingest.relations import add_gloss_relations, set_gloss_relations
+from cms.ingest.situations import import_situation_archive
+from cms.models import ExportJob, Gloss, Language, Situation, SituationExportCache, SituationGlossClosure
+from cms.search import query as search_query
+from cms.search.fuzzy import FuzzyIndex, bounded_levenshtein, fuzzy_glosses, fuzzy_index
+from cms.search.query import rank_glosses, search_glosses
+from cms.views.gloss.utils import collect_glosses_recursively
+
+
+def build_random_corpus(seed, languages=4, glosses_per_language=15, situations=4, edges_per_relation=25):
+    """Create a small random gloss graph with situations for equivalence tests."""
+    rng = random.Random(seed)
+    language_objects = [
+        Language.objects.create(iso=f"l{index}", name=f"Language {index}")
+        for index in range(languages)
+    ]
+    glosses = []
+    for language in language_objects:
+        for index in range(glosses_per_language):
+            content = f"[phrase {index}]" if index % 5 == 0 else f"word {index}"
+            glosses.append(Gloss.objects.create(content=content, language=language))
+
+    for field_name in RELATION_FIELDS:
+        for _ in range(edges_per_relation):
+            source, related = rng.sample(glosses, 2)
+            getattr(source, field_name).add(related)
+
+    for index in range(situations):
+        situation = Situation.objects.create(id=f"situation-{index}")
+        situation.glosses.set(rng.sample(glosses, 3))
+        situation.descriptions.set(rng.sample(glosses, 2))
+    return language_objects
+
+
+def build_described_corpus(seed):
+    """Random corpus whose situations are described in every language."""
+    language_objects = build_random_corpus(seed)
+    for situation in Situation.objects.all():
+        situation.descriptions.set([
+            Gloss.objects.create(content=f"{situation.id} in {language.iso}", language=language)
+            for language in language_objects
+        ])
+    return language_objects
+
+
+def read_export(path):
+    """Map the file names of a .zip or directory export to their bytes."""
+    path = Path(path)
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as zip_file:
+            return {name: zip_file.read(name) for name in zip_file.namelist()}
+    return {
+        file.relative_to(path).as_posix(): file.read_bytes()
+        for file in path.rglob("*") if file.is_file()
+    }
+
+
+class CollectGlossIdsForPairsTests(TestCase):
+    def test_matches_per_pair_collection(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                Situation.objects.all().delete()
+                Gloss.objects.all().delete()
+                Language.objects.all().delete()
+                language_objects = build_random_corpus(seed)
+                graph = GlossGraph.load()
+                pairs = [
+                    (native.iso, target.iso)
+                    for native, target in permutations(language_objects, 2)
+                ]
+
+                for situation in Situation.objects.all():
+                    by_pair = collect_gloss_ids_for_pairs(graph, situation.id, pairs)
+                    for native_iso, target_iso in pairs:
+                        expected = [
+                            gloss.pk
+                            for gloss in collect_glosses_recursively(situation, native_iso, target_iso)
+                        ]
+                        self.assertEqual(by_pair[(native_iso, target_iso)], expected)
+                        self.assertEqual(
+                            collect_gloss_ids(graph, situation.id, native_iso, target_iso),
+                            expected,
+                        )
+
+    def test_recursive_cte_collects_the_same_glosses(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                Situation.objects.all().delete()
+                Gloss.objects.all().delete()
+                Language.objects.all().delete()
+                language_objects = build_random_corpus(seed)
+                for situation in Situation.objects.all():
+                    for native, target in permutations(language_objects, 2):
+                        expected = {
+                            (gloss.pk, gloss.language_id)
+                            for gloss in collect_glosses_recursively(situation, native.iso, target.iso)
+                        }
+                        rows = collect_gloss_rows(situation.id, native.iso, target.iso)
+                        self.assertEqual(len(rows), len(expected))
+                        self.assertEqual(set(rows), expected)
+
+    def test_rejects_same_language_pair(self):
+        build_random_corpus(0, situations=1)
+        graph = GlossGraph.load()
+        with self.assertRaises(ValueError):
+            collect_gloss_ids_for_pairs(graph, "situation-0", [("l0", "l0")])
+
+
+class SituationGlossClosureTests(TestCase):
+    def assertClosureInSync(self):
+        incremental = set(SituationGlossClosure.objects.values_list(
+            "situation_id", "native_iso", "target_iso", "gloss_id", "phase"
+        ))
+        refresh_situation_closure()
+        rebuilt = set(SituationGlossClosure.objects.values_list(
+            "situation_id", "native_iso", "target_iso", "gloss_id", "phase"
+        ))
+        self.assertEqual(incremental, rebuilt)
+
+    def test_edits_keep_closure_in_sync(self):
+        language_objects = build_described_corpus(0)
+        self.assertClosureInSync()
+        situation = Situation.objects.get(pk="situation-0")
+        for native, target in permutations(language_objects, 2):
+            self.assertEqual(
+                closure_gloss_ids(situation.id, native.iso, target.iso),
+                [gloss_id for gloss_id, _ in collect_gloss_rows(situation.id, native.iso, target.iso)],
+            )
+
+        rng = random.Random(1)
+        glosses = list(Gloss.objects.order_by("pk"))
+        reached = list(SituationGlossClosure.objects.order_by("pk").values_list("gloss_id", flat=True))
+        edits = [
+            lambda: Gloss.objects.get(pk=rng.choice(reached)).contains.add(rng.choice(glosses)),
+            lambda: Gloss.objects.get(pk=rng.choice(reached)).translations.add(rng.choice(glosses)),
+            lambda: rng.choice(glosses).usage_of_clarified.add(Gloss.objects.get(pk=rng.choice(reached))),
+            lambda: Gloss.objects.get(pk=rng.choice(reached)).translations.clear(),
+            lambda: Gloss.objects.get(pk=rng.choice(reached)).relevant_in_situations.clear(),
+            lambda: situation.glosses.remove(*situation.glosses.all()[:1]),
+            lambda: situation.descriptions.remove(*situation.descriptions.all()[:1]),
+            lambda: set_gloss_relations(rng.choice(reached), {"near_synonyms": [rng.choice(glosses).pk]}),
+            lambda: add_gloss_relations("contains", [(rng.choice(reached), rng.choice(glosses).pk)]),
+            lambda: Gloss.objects.filter(pk=rng.choice(reached)).first().delete(),
+        ]
+        for index, edit in enumerate(edits):
+            with self.subTest(edit=index):
+                edit()
+                self.assertClosureInSync()
+                reached = list(SituationGlossClosure.objects.order_by("pk").values_list("gloss_id", flat=True))
+
+        gloss = Gloss.objects.get(pk=rng.choice(reached))
+        gloss.language = next(language for language in language_objects if language.iso != gloss.language_id)
+        gloss.content = "moved"
+        gloss.save()
+        self.assertClosureInSync()
+
+        # Glosses outside every pair language are reached once moved into one
+        other = Language.objects.create(iso="l9", name="Language 9")
+        root = situation.glosses.first()
+        anchor = SituationGlossClosure.objects.filter(
+            situation=situation, phase=1, gloss__language_id=F("native_iso")
+        ).first().gloss
+        contained = Gloss.objects.create(content="contained", language=other)
+        related = Gloss.objects.create(content="related", language=other)
+        root.contains.add(contained)
+        # Phase 2 takes related glosses in any language, translations only in the pair
+        related.clarifies_usage.add(anchor)
+        self.assertTrue(SituationGlossClosure.objects.filter(gloss=related).exists())
+        related.clarifies_usage.clear()
+        anchor.translations.add(related)
+        self.assertFalse(SituationGlossClosure.objects.filter(gloss__language=other).exists())
+        described = set(situation.descriptions.values_list("language_id", flat=True))
+        for moved, language_id in [
+            (contained, min(described)),
+            (related, min(described - {anchor.language_id})),
+        ]:
+            with self.subTest(moved=moved.content):
+                moved.language_id = language_id
+                moved.save()
+                self.assertTrue(SituationGlossClosure.objects.filter(gloss=moved).exists())
+                self.assertClosureInSync()
+
+    def test_migration_backfills_existing_situations(self):
+        build_described_corpus(0)
+        refresh_situation_closure()
+        expected = set(SituationGlossClosure.objects.values_list(
+            "situation_id", "native_iso", "target_iso", "gloss_id", "phase"
+        ))
+        SituationGlossClosure.objects.all().delete()
+
+        migration = importlib.import_module("cms.migrations.0012_situationglossclosure")
+        state = MigrationLoader(connection).project_state(("cms", "0012_situationglossclosure"))
+        migration.backfill_closure(state.apps, connection.schema_editor())
+        self.assertTrue(expected)
+        self.assertEqual(set(SituationGlossClosure.objects.values_list(
+            "situation_id", "native_iso", "target_iso", "gloss_id", "phase"
+        )), expected)
+
+    def test_rebuild_closure_command(self):
+        build_described_corpus(1)
+        expected = SituationGlossClosure.objects.count()
+        SituationGlossClosure.objects.all().delete()
+        out = io.StringIO()
+        call_command("rebuild_closure", stdout=out)
+        self.assertIn(f"({expected} rows)", out.getvalue())
+
+
+class GlossSituationsTests(TestCase):
+    def test_lists_situations_and_pairs_reaching_a_gloss(self):
+        language_objects = build_described_corpus(2)
+        expected = {}
+        for situation in Situation.objects.order_by("pk"):
+            for native, target in permutations(language_objects, 2):
+                for gloss in collect_glosses_recursively(situation, native.iso, target.iso):
+                    expected.setdefault(gloss.pk, {}).setdefault(situation.id, []).append((native.iso, target.iso))
+        gloss_id = max(expected, key=lambda gloss_id: len(expected[gloss_id]))
+        url = reverse("api_gloss_situations", args=[gloss_id])
+
+        with self.assertNumQueries(3):
+            data = self.client.get(url).json()
+        self.assertEqual(data["count"], len(expected[gloss_id]))
+        self.assertEqual(
+            {
+                situation["id"]: sorted((pair["native_iso"], pair["target_iso"]) for pair in situation["pairs"])
+                for situation in data["situations"]
+            },
+            {situation_id: sorted(pairs) for situation_id, pairs in expected[gloss_id].items()},
+        )
+
+        data = self.client.get(url, {"limit": 1}).json()
+        self.assertEqual((data["count"], len(data["situations"])), (len(expected[gloss_id]), 1))
+        self.assertEqual(self.client.get(url, {"limit": 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("api_gloss_situations", args=[0])).status_code, 404)
+
+        response = self.client.get(reverse("gloss_update", args=[gloss_id]))
+        self.assertEqual(response.context["situation_count"], len(expected[gloss_id]))
+        self.assertContains(response, reverse("situation_update", args=[data["situations"][0]["id"]]))
+
+
+class SituationExportCacheTests(TestCase):
+    def setUp(self):
+        build_described_corpus(1)
+        self.languages = list(Language.objects.all())
+
+    def assert_matches_fresh_export(self):
+        cached = list(iter_cached_situation_exports(self.languages))
+        fresh = list(iter_situation_exports(GlossGraph.load(), self.languages))
+        self.assertEqual(cached, fresh)
+
+    def test_reuses_entries_until_a_dependency_changes(self):
+        self.assert_matches_fresh_export()
+        entry_count = SituationExportCache.objects.count()
+        self.assertGreater(entry_count, 0)
+
+        with self.assertNumQueries(3 + Situation.objects.count()):
+            list(iter_cached_situation_exports(self.languages))
+
+        gloss = Gloss.objects.get(pk=Situation.objects.get(pk="situation-0").glosses.first().pk)
+        gloss.content = "edited"
+        gloss.save()
+        self.assertLess(SituationExportCache.objects.count(), entry_count)
+        self.assert_matches_fresh_export()
+
+    def test_entries_invalidated_while_streaming_are_recomputed(self):
+        self.assert_matches_fresh_export()
+        exports = iter_cached_situation_exports(self.languages)
+        next(exports)
+
+        gloss = Situation.objects.get(pk="situation-3").glosses.first()
+        gloss.content = "edited while streaming"
+        gloss.save()
+        rest = [export for export in exports if export["situation_id"] == "situation-3"]
+
+        fresh = list(iter_situation_exports(GlossGraph.load(), self.languages))
+        self.assertTrue(rest)
+        self.assertEqual(rest, [export for export in fresh if export["situation_id"] == "situation-3"])
+        self.assert_matches_fresh_export()
+
+    def test_fresh_export_loads_descriptions_once(self):
+        graph = GlossGraph.load()
+        # One query for the situations and one for all their descriptions
+        with self.assertNumQueries(2):
+            exports = list(iter_situation_exports(graph, self.languages))
+        self.assertGreater(len(exports), 0)
+
+    def test_edge_and_situation_edits_invalidate(self):
+        self.assert_matches_fresh_export()
+        situation = Situation.objects.get(pk="situation-1")
+        root = situation.glosses.first()
+        root.translations.add(*Gloss.objects.exclude(language=root.language)[:3])
+        self.assert_matches_fresh_export()
+
+        root.translations.clear()
+        self.assert_matches_fresh_export()
+
+        situation.image_link = "https://example.com/image.png"
+        situation.save()
+        situation.descriptions.remove(situation.descriptions.first())
+        self.assert_matches_fresh_export()
+
+
+class ParallelExportTests(TransactionTestCase):
+    # Forked workers open their own connections, so the corpus must be committed
+
+    def test_parallel_archives_match_serial_ones(self):
+        languages = build_described_corpus(3)
+        graph = GlossGraph.load()
+
+        def situation_files(workers):
+            return list(iter_situation_archive_files(iter_situation_exports(graph, languages, workers=workers)))
+
+        def gloss_files(workers):
+            return list(iter_gloss_files(workers=workers))
+
+        with patch("cms.export.engine.SITUATION_CHUNK_SIZE", 1), patch("cms.export.engine.GLOSS_CHUNK_SIZE", 7):
+            serial_situations, parallel_situations = situation_files(1), situation_files(2)
+            serial_glosses, parallel_glosses = gloss_files(1), gloss_files(2)
+
+        self.assertGreater(len(serial_situations), 3)
+        self.assertEqual(parallel_situations, serial_situations)
+        self.assertEqual(len(serial_glosses), Gloss.objects.count())
+        self.assertEqual(parallel_glosses, serial_glosses)
+
+    def test_commands_with_jobs(self):
+        build_described_corpus(3)
+        with tempfile.TemporaryDirectory() as output:
+            output = Path(output)
+            for command in ("export_situations", "export_glosses"):
+                with self.subTest(command=command):
+                    for jobs in ("1", "2"):
+                        call_command(command, str(output / f"{command}_{jobs}"), "--jobs", jobs, stdout=io.StringIO())
+                    serial = read_export(output / f"{command}_1")
+                    self.assertTrue(serial)
+                    self.assertEqual(read_export(output / f"{command}_2"), serial)
+
+
+class ExportCommandTests(TestCase):
+    def setUp(self):
+        self.languages = build_described_corpus(1)
+        output = tempfile.TemporaryDirectory()
+        self.addCleanup(output.cleanup)
+        self.output = Path(output.name)
+
+    def export(self, command, name, *args):
+        call_command(command, str(self.output / name), *args, stdout=io.StringIO())
+        return read_export(self.output / name)
+
+    def test_situations_and_pairs_limit_what_is_computed(self):
+        write_zip(self.output / "expected.zip", iter_situation_archive_files(
+            iter_situation_exports(GlossGraph.load(), self.languages)
+        ))
+        expected = read_export(self.output / "expected.zip")
+
+        files = self.export(
+            "export_situations", "slice.zip", "--situations", "situation-0", "situation-2",
+            "--pairs", "l1_l0", "l0_l2", "--jobs", "1",
+        )
+        selected = {
+            name: content for name, content in expected.items()
+            if name.startswith(("situation-0_", "situation-2_")) and name.endswith(("_l1_l0.jsonl", "_l0_l2.jsonl"))
+        }
+        self.assertTrue(selected)
+        self.assertEqual({name: files[name] for name in files if name.startswith("situation-")}, selected)
+        self.assertEqual(
+            {name for name in files if name.startswith("situations_")},
+            {"situations_l1_l0.jsonl", "situations_l0_l2.jsonl"},
+        )
+        # Other pairs are never expanded, so only the requested ones are cached
+        self.assertEqual(
+            set(SituationExportCache.objects.values_list("situation_id", "target_iso", "native_iso")),
+            {(situation_id, "l1", "l0") for situation_id in ("situation-0", "situation-2")}
+            | {(situation_id, "l0", "l2") for situation_id in ("situation-0", "situation-2")},
+        )
+
+        self.assertEqual(self.export("export_situations", "all"), expected)
+        self.assertEqual(self.export("export_situations", "fresh.zip", "--no-cache"), expected)
+
+    def test_rejects_unknown_situations_and_invalid_pairs(self):
+        with self.assertRaises(CommandError):
+            self.export("export_situations", "out.zip", "--situations", "missing")
+        with self.assertRaises(CommandError):
+            self.export("export_situations", "out.zip", "--pairs", "l0")
+
+    def test_export_glosses_languages(self):
+        files = self.export("export_glosses", "glosses", "--languages", "l1", "l3", "--jobs", "1")
+        self.assertEqual(len(files), Gloss.objects.filter(language__in=["l1", "l3"]).count())
+        self.assertEqual({name.split("/")[0] for name in files}, {"l1", "l3"})
+        self.assertEqual(self.export("export_glosses", "glosses.zip", "--languages", "l1", "l3"), files)
+
+
+class SituationDownloadAllTests(TestCase):
+    def test_streams_the_archive_write_zip_produces(self):
+        languages = build_described_corpus(1)
+        expected = io.BytesIO()
+        write_zip(expected, iter_situation_archive_files(iter_situation_exports(GlossGraph.load(), languages)))
+
+        response = self.client.post(reverse("situation_download_all"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        streamed = io.BytesIO(b"".join(response.streaming_content))
+
+        with zipfile.ZipFile(streamed) as streamed_zip, zipfile.ZipFile(expected) as expected_zip:
+            self.assertIsNone(streamed_zip.testzip())
+            self.assertEqual(streamed_zip.namelist(), expected_zip.namelist())
+            for name in expected_zip.namelist():
+                self.assertEqual(streamed_zip.read(name), expected_zip.read(name), name)
+
+    def test_no_valid_pairs(self):
+        self.assertEqual(self.client.get(reverse("situation_download_all")).status_code, 405)
+        self.assertEqual(self.client.post(reverse("situation_download_all")).status_code, 404)
+
+
+class ExportJobTests(TestCase):
+    def setUp(self):
+        export_root = tempfile.TemporaryDirectory()
+        self.addCleanup(export_root.cleanup)
+        settings_override = override_settings(EXPORT_ROOT=Path(export_root.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def run_job(self, kind):
+        response = self.client.post(reverse("export_job_start", args=[kind]))
+        job = ExportJob.objects.latest("pk")
+        self.assertRedirects(response, reverse("export_job_detail", args=[job.pk]))
+        self.assertEqual(job.status, ExportJob.STATUS_PENDING)
+        call_command("run_export_jobs", stdout=io.StringIO())
+        job.refresh_from_db()
+        return job
+
+    def test_job_lifecycle(self):
+        build_described_corpus(1)
+        job = self.run_job(ExportJob.KIND_SITUATIONS)
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+        self.assertEqual((job.progress, job.total), (4, 4))
+
+        status = self.client.get(reverse("api_export_job_status", args=[job.pk])).json()
+        self.assertEqual(status["status"], ExportJob.STATUS_DONE)
+        self.assertEqual(status["download_url"], reverse("export_job_download", args=[job.pk]))
+
+        response = self.client.get(status["download_url"])
+        content = b"".join(response.streaming_content)
+        self.assertEqual(len(content), job.file_size)
+        with zipfile.ZipFile(io.BytesIO(content)) as zip_file:
+            self.assertIn("native_languages.jsonl", zip_file.namelist())
+
+    def test_finished_jobs_replace_older_ones_of_their_kind(self):
+        first = self.run_job(ExportJob.KIND_GLOSSES)
+        situations = self.run_job(ExportJob.KIND_SITUATIONS)
+        second = self.run_job(ExportJob.KIND_GLOSSES)
+
+        self.assertEqual(
+            set(ExportJob.objects.values_list("pk", flat=True)), {situations.pk, second.pk}
+        )
+        self.assertEqual(
+            sorted(path.name for path in settings.EXPORT_ROOT.iterdir()),
+            sorted([situations.file_name, second.file_name]),
+        )
+        self.assertEqual(self.client.get(reverse("export_job_download", args=[first.pk])).status_code, 404)
+
+    def test_ranges_and_conditional_requests(self):
+        build_random_corpus(0)
+        job = self.run_job(ExportJob.KIND_GLOSSES)
+        url = reverse("export_job_download", args=[job.pk])
+        content = (settings.EXPORT_ROOT / job.file_name).read_bytes()
+        etag = f'"{job.etag}"'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response["ETag"], response["Accept-Ranges"]), (etag, "bytes"))
+        self.assertEqual(b"".join(response.streaming_content), content)
+
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 304)
+
+        size = len(content)
+        for header, start, end in [
+            ("bytes=0-9", 0, 9), ("bytes=10-", 10, size - 1), ("bytes=-5", size - 5, size - 1),
+            (f"bytes=5-{size + 100}", 5, size - 1),
+        ]:
+            with self.subTest(range=header):
+                response = self.client.get(url, headers={"Range": header})
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{size}")
+                self.assertEqual(b"".join(response.streaming_content), content[start:end + 1])
+
+        response = self.client.get(url, headers={"Range": f"bytes={size}-"})
+        self.assertEqual((response.status_code, response["Content-Range"]), (416, f"bytes */{size}"))
+
+        for headers in [{"Range": "bytes=0-9", "If-Range": '"other"'}, {"Range": "bytes=0-1,4-5"}]:
+            with self.subTest(headers=headers):
+                response = self.client.get(url, headers=headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(b"".join(response.streaming_content), content)
+
+    def test_abandoned_running_jobs_fail(self):
+        abandoned, running = ExportJob.objects.bulk_create(
+            [ExportJob(kind=ExportJob.KIND_GLOSSES), ExportJob(kind=ExportJob.KIND_GLOSSES)]
+        )
+        ExportJob.objects.update(status=ExportJob.STATUS_RUNNING, updated_at=timezone.now())
+        ExportJob.objects.filter(pk=abandoned.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        stderr = io.StringIO()
+        call_command("run_export_jobs", stale_after=600, stdout=io.StringIO(), stderr=stderr)
+        self.assertIn("Failed 1 abandoned", stderr.getvalue())
+        abandoned.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(abandoned.status, ExportJob.STATUS_FAILED)
+        self.assertTrue(abandoned.error)
+        self.assertEqual(running.status, ExportJob.STATUS_RUNNING)
+
+
+class GenerateCorpusTests(TestCase):
+    def test_creates_requested_corpus(self):
+        counts = generate_corpus(
+            languages=3, glosses_per_language=40, situations=4,
+            edge_density={"translations": 2}, paraphrase_ratio=0.5,
+        )
+        self.assertEqual(counts["glosses"], 3 * 40 + 4 * 3)
+        self.assertEqual(Situation.objects.count(), 4)
+
+        graph = GlossGraph.load()
+        for gloss_id, related_ids in graph.edges["translations"].items():
+            for related_id in related_ids:
+                self.assertIn(gloss_id, graph.neighbours("translations", related_id))
+                self.assertNotEqual(graph.languages[gloss_id], graph.languages[related_id])
+        self.assertTrue(any(graph.is_paraphrased(gloss_id) for gloss_id in graph.contents))
+        self.assertTrue(list(iter_situation_exports(graph, list(Language.objects.all()))))
+
+        closure = set(SituationGlossClosure.objects.values_list("situation_id", "native_iso", "target_iso", "gloss_id"))
+        self.assertEqual({situation_id for situation_id, *_ in closure}, set(Situation.objects.values_list("id", flat=True)))
+        refresh_situation_closure()
+        self.assertEqual(
+            set(SituationGlossClosure.objects.values_list("situation_id", "native_iso", "target_iso", "gloss_id")),
+            closure,
+        )
+
+    def test_rejects_existing_languages(self):
+        generate_corpus(languages=2, glosses_per_language=5, situations=1)
+        with self.assertRaises(ValueError):
+            generate_corpus(languages=2, glosses_per_language=5, situations=1)
+
+
+class GlossSearchTests(TestCase):
+    def setUp(self):
+        self.english = Language.objects.create(iso="eng", name="English")
+        self.german = Language.objects.create(iso="deu", name="German")
+
+    def search(self, query, language_iso=None):
+        return [gloss.content for gloss in search_glosses(query, language_iso)]
+
+    def test_prefix_matching_per_language(self):
+        Gloss.objects.create(content="good morning", language=self.english)
+        Gloss.objects.create(content="Guten Morgen", language=self.german)
+        Gloss.objects.create(content="mourning", language=self.english)
+
+        self.assertEqual(self.search("mor"), ["Guten Morgen", "good morning"])
+        self.assertEqual(self.search("mor", "eng"), ["good morning"])
+        self.assertEqual(self.search("go mo"), ["good morning"])
+        self.assertEqual(self.search("orning"), [])
+
+    def test_index_follows_writes(self):
+        gloss = Gloss.objects.create(content="hello", language=self.english, transcriptions=["həˈloʊ"])
+        Gloss.objects.bulk_create([Gloss(content="help", language=self.english)])
+        self.assertEqual(self.search("hel"), ["hello", "help"])
+        self.assertEqual(self.search("həˈ"), ["hello"])
+
+        gloss.content = "goodbye"
+        gloss.save()
+        Gloss.objects.filter(content="help").update(language=self.german)
+        self.assertEqual(self.search("hel", "eng"), [])
+        self.assertEqual(self.search("good"), ["goodbye"])
+
+        gloss.delete()
+        self.assertEqual(self.search("good"), [])
+
+    def test_ranks_exact_prefix_word_then_substring(self):
+        for content in ["algorithm", "ago", "let go", "good", "Gö", "go"]:
+            Gloss.objects.create(content=content, language=self.english)
+        Gloss.objects.create(content="go", language=self.german)
+
+        ranked = [(gloss.content, tier) for gloss, tier in rank_glosses("GO", "eng")]
+        self.assertEqual(ranked, [
+            ("Gö", "exact"),
+            ("go", "exact"),
+            ("good", "prefix"),
+            ("let go", "word"),
+            ("ago", "substring"),
+            ("algorithm", "substring"),
+        ])
+        self.assertEqual(len(rank_glosses("go", limit=3)), 3)
+        self.assertEqual(rank_glosses("gorit")[0][1], "substring")
+
+    def test_search_key_follows_content(self):
+        gloss = Gloss.objects.create(content="Crème  Brûlée", language=self.english)
+        self.assertEqual(gloss.search_key, "creme brulee")
+        gloss.content = "Tarte"
+        gloss.save(update_fields=["content"])
+        gloss.refresh_from_db()
+        self.assertEqual(gloss.search_key, "tarte")
+        self.assertEqual([g.content for g, _ in rank_glosses("tar")], ["Tarte"])
+
+    def test_dense_and_sparse_plans_agree(self):
+        Gloss.objects.bulk_create(
+            Gloss(content=f"word {index}", language=language)
+            for index in range(30)
+            for language in (self.english, self.german)
+        )
+        sparse = self.search("word", "eng")
+        with patch.object(search_query, "DENSE_MATCHES", 5):
+            self.assertEqual(self.search("word", "eng"), sparse)
+        self.assertEqual(len(sparse), 30)
+
+
+class BatchGlossSearchTests(TestCase):
+    def setUp(self):
+        english = Language.objects.create(iso="eng", name="English")
+        german = Language.objects.create(iso="deu", name="German")
+        for content in ["house", "home", "hello"]:
+            Gloss.objects.create(content=content, language=english)
+        Gloss.objects.create(content="home", language=german)
+
+    def post(self, items):
+        return self.client.post(reverse("api_gloss_search_batch"), json.dumps(items), content_type="application/json")
+
+    def test_answers_items_in_order(self):
+        items = [
+            {"q": "home"},
+            {"q": "hello", "language": "deu"},
+            {"q": "house", "language": "eng"},
+            {"q": "ho", "language": "eng", "mode": "ranked", "limit": 2},
+        ]
+        with self.assertNumQueries(3):
+            response = self.post(items)
+        results = [
+            [(result["language_iso"], result["content"]) for result in item["results"]]
+            for item in response.json()["results"]
+        ]
+        self.assertEqual(results, [
+            [("deu", "home"), ("eng", "home")],
+            [],
+            [("eng", "house")],
+            [("eng", "home"), ("eng", "house")],
+        ])
+
+    def test_rejects_invalid_items(self):
+        self.assertEqual(self.post({"q": "home"}).status_code, 400)
+        response = self.post([{"q": "home"}, {"q": "home", "mode": "nearest"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()["error"].startswith("Item 1:"))
+
+
+class BulkCreateOrGetTests(TestCase):
+    def setUp(self):
+        Language.objects.create(iso="eng", name="English")
+        Language.objects.create(iso="deu", name="German")
+        self.house = Gloss.objects.create(content="house", language_id="eng")
+
+    def test_creates_missing_glosses_in_input_order(self):
+        pairs = [("deu", "Haus"), ("eng", "house"), ("eng", "garden"), ("deu", "Haus")]
+        # Language check, savepoint, INSERT ... RETURNING, lookup, release
+        with self.assertNumQueries(5):
+            resolved = get_or_create_glosses(pairs)
+
+        haus = Gloss.objects.get(content="Haus")
+        garden = Gloss.objects.get(content="garden")
+        self.assertEqual(resolved, [(haus.pk, True), (self.house.pk, False), (garden.pk, True), (haus.pk, False)])
+        self.assertEqual(garden.search_key, "garden")
+        self.assertEqual([gloss.content for gloss in search_glosses("gard")], ["garden"])
+
+    def test_without_insert_returning(self):
+        with patch("cms.ingest.glosses._can_insert_returning", return_value=False):
+            resolved = get_or_create_glosses([("eng", "house"), ("eng", "garden")])
+        self.assertEqual(resolved, [(self.house.pk, False), (Gloss.objects.get(content="garden").pk, True)])
+
+    def test_endpoint(self):
+        url = reverse("api_gloss_bulk_create_or_get")
+        items = [{"language": "eng", "content": " house "}, {"language": "eng", "content": "tree"}]
+        response = self.client.post(url, json.dumps(items), content_type="application/json")
+        self.assertEqual(
+            [(result["gloss"]["content"], result["status"]) for result in response.json()["results"]],
+            [("house", "existing"), ("tree", "created")],
+        )
+
+        response = self.client.post(url, json.dumps([{"language": "xyz", "content": "a"}]), content_type="application/json")
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Gloss.objects.filter(content="a").exists())
+
+
+class ImportGlossJsonlTests(TestCase):
+    def snapshot(self):
+        records = []
+        for gloss in Gloss.objects.order_by("language_id", "content"):
+            record = serialize_gloss_to_jsonl(gloss)
+            records.append({field: sorted(value) if isinstance(value, list) else value for field, value in record.items()})
+        return records
+
+    def jsonl(self, records):
+        return io.BytesIO("\n".join(json.dumps(record, ensure_ascii=False) for record in records).encode())
+
+    def test_round_trip(self):
+        build_random_corpus(seed=3)
+        Gloss.objects.filter(pk__in=Gloss.objects.order_by("pk")[:5].values("pk")).update(transcriptions=["tʁ"])
+        exported = self.snapshot()
+        Gloss.objects.all().delete()
+
+        stats = import_gloss_jsonl(self.jsonl(exported), batch_size=7)
+        self.assertEqual(self.snapshot(), exported)
+        self.assertEqual((stats["glosses"], stats["created"], stats["unresolved"]), (60, 60, 0))
+
+        stats = import_gloss_jsonl(self.jsonl(exported), batch_size=7)
+        self.assertEqual((stats["created"], stats["updated"]), (0, 0))
+
+    def test_invalid_line_imports_nothing(self):
+        Language.objects.create(iso="eng", name="English")
+        file = io.BytesIO(b'{"language": "eng", "content": "hello"}\n{"language": "eng"}\n')
+        with self.assertRaisesMessage(ValueError, "Line 2"):
+            import_gloss_jsonl(file)
+        self.assertFalse(Gloss.objects.exists())
+
+    def test_upload_endpoint(self):
+        Language.objects.create(iso="eng", name="English")
+        records = [
+            {"language": "eng", "content": "hello", "examples": ["eng:hello there"], "translations": ["deu:hallo"]},
+            {"language": "eng", "content": "hello there", "transcriptions": ["həˈloʊ ðɛr"]},
+        ]
+        upload = SimpleUploadedFile("glosses.jsonl", self.jsonl(records).getvalue())
+        response = self.client.post(reverse("api_gloss_import"), {"file": upload})
+        self.assertEqual(response.json(), {"glosses": 2, "created": 2, "updated": 0, "edges": 1, "unresolved": 1})
+        example = Gloss.objects.get(content="hello there")
+        self.assertEqual(list(example.clarifies_usage.values_list("content", flat=True)), ["hello"])
+        self.assertEqual(example.transcriptions, ["həˈloʊ ðɛr"])
+
+
+class ImportSituationArchiveTests(TestCase):
+    def export_archive(self):
+        exports = iter_situation_exports(GlossGraph.load(), list(Language.objects.all()))
+        archive = io.BytesIO()
+        write_zip(archive, iter_situation_archive_files(exports))
+        archive.seek(0)
+        return archive
+
+    def archive_contents(self, archive):
+        """Archive files with rows and key lists sorted, as gloss ids change on import."""
+        def normalize(row):
+            return {key: sorted(value) if isinstance(value, list) else value for key, value in row.items()}
+
+        with zipfile.ZipFile(archive) as zip_file:
+            return {
+                name: sorted(
+                    json.dumps(normalize(json.loads(line)), sort_keys=True)
+                    for line in zip_file.read(name).decode().splitlines()
+                )
+                for name in zip_file.namelist()
+            }
+
+    def test_round_trip_is_idempotent(self):
+        build_described_corpus(2)
+        archive = self.export_archive()
+        Situation.objects.all().delete()
+        Gloss.objects.all().delete()
+        Language.objects.all().delete()
+
+        stats = import_situation_archive(archive)
+        self.assertEqual(stats["situations_created"], 4)
+        self.assertEqual(stats["unresolved_situation_glosses"], 0)
+        self.assertEqual(self.archive_contents(self.export_archive()), self.archive_contents(archive))
+
+        archive.seek(0)
+        stats = import_situation_archive(archive)
+        self.assertEqual(
+            (stats["created"], stats["updated"], stats["situations_created"], stats["situations_updated"]),
+            (0, 0, 0, 0),
+        )
+
+    def test_resyncs_changed_situations(self):
+        build_described_corpus(2)
+        archive = self.export_archive()
+        situation = Situation.objects.get(pk="situation-0")
+        roots = set(situation.glosses.all())
+        situation.glosses.clear()
+        situation.descriptions.add(Gloss.objects.create(content="extra", language_id="l0"))
+        Situation.objects.filter(pk="situation-1").update(image_link="https://example.com/a.png")
+
+        stats = import_situation_archive(archive)
+        self.assertEqual(stats["situations_updated"], 2)
+        self.assertEqual(set(situation.glosses.all()), roots)
+        self.assertFalse(situation.descriptions.filter(content="extra").exists())
+        self.assertIsNone(Situation.objects.get(pk="situation-1").image_link)
+
+
+    def test_malformed_index_rows_are_rejected(self):
+        Language.objects.create(iso="eng", name="English")
+        for row, error in [
+            ({"id": "s1", "glosses": ["eng:hello", 3]}, "glosses must be a list of strings"),
+            ({"id": "s1", "glosses": "eng:hello"}, "glosses must be a list of strings"),
+            ({"id": "s1", "target_description": {"text": "hi"}}, "target_description must be a string"),
+            ({"id": ["s1"]}, "id is required"),
+        ]:
+            with self.subTest(row=row):
+                archive = io.BytesIO()
+                write_zip(archive, [("situations_eng_deu.jsonl", json.dumps({"id": "s0"}) + "\n" + json.dumps(row))])
+                upload = SimpleUploadedFile("situations.zip", archive.getvalue())
+                response = self.client.post(reverse("api_situation_import"), {"file": upload})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": f"situations_eng_deu.jsonl, line 2: {error}"})
+                self.assertFalse(Situation.objects.exists())
+
+
+class SetGlossRelationsTests(TestCase):
+    def through_rows(self):
+        return {
+            field_name: set(getattr(Gloss, field_name).through.objects.values_list("from_gloss_id", "to_gloss_id"))
+            for field_name in RELATION_FIELDS
+        }
+
+    def test_matches_related_manager_set(self):
+        build_random_corpus(seed=4)
+        rng = random.Random(4)
+        gloss_ids = list(Gloss.objects.values_list("pk", flat=True))
+        for gloss_id in rng.sample(gloss_ids, 5):
+            relations = {
+                field_name: rng.sample(gloss_ids, rng.randrange(4)) for field_name in RELATION_FIELDS
+            }
+            with transaction.atomic():
+                gloss = Gloss.objects.get(pk=gloss_id)
+                for field_name, related_ids in relations.items():
+                    getattr(gloss, field_name).set(related_ids)
+                expected = self.through_rows()
+                transaction.set_rollback(True)
+
+            set_gloss_relations(gloss_id, relations)
+            self.assertEqual(self.through_rows(), expected)
+
+    def test_update_view_queries_do_not_grow_with_edges(self):
+        english = Language.objects.create(iso="eng", name="English")
+        glosses = [Gloss.objects.create(content=f"word {index}", language=english) for index in range(60)]
+        gloss = glosses[0]
+
+        def save(related):
+            data = {"content": gloss.content, "language": "eng"}
+            data.update({field_name: [related_gloss.pk for related_gloss in related] for field_name in RELATION_FIELDS})
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(reverse("gloss_update", args=[gloss.pk]), data)
+            self.assertEqual(response.status_code, 302)
+            return len(queries)
+
+        save(glosses[1:6])
+        self.assertEqual(save(glosses[6:11]), save(glosses[11:60]))
+        self.assertEqual(set(gloss.translations.all()), set(glosses[11:60]))
+        self.assertIn(gloss, glosses[30].translations.all())
+        self.assertNotIn(gloss, glosses[6].translations.all())
+
+
+class AcceptTranslationsTests(TestCase):
+    def setUp(self):
+        Language.objects.create(iso="eng", name="English")
+        Language.objects.create(iso="deu", name="German")
+        self.sources = [Gloss.objects.create(content=f"word {index}", language_id="eng") for index in range(40)]
+        Gloss.objects.create(content="Wort 0", language_id="deu")
+        Gloss.objects.create(content="Wort 3", language_id="deu")
+
+    def accept(self, sources):
+        session = self.client.session
+        session["translation_data"] = {"translations": [], "native_iso": "eng", "target_iso": "deu", "interaction_id": None}
+        session.save()
+        selected = [f"{gloss.pk}:Wort {gloss.content.split()[1]}" for gloss in sources]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("tools_translate_glosses"), {"selected_translations": selected})
+        self.assertEqual(response.status_code, 302)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_selection(self):
+        self.assertEqual(self.accept(self.sources[:3]), self.accept(self.sources[3:40]))
+        self.assertEqual(Gloss.objects.filter(language_id="deu").count(), 40)
+        wort = Gloss.objects.get(content="Wort 0")
+        self.assertEqual(list(wort.translations.all()), [self.sources[0]])
+        self.assertEqual(list(self.sources[0].translations.all()), [wort])
+
+    def test_unknown_source_saves_nothing(self):
+        session = self.client.session
+        session["translation_data"] = {"translations": [], "native_iso": "eng", "target_iso": "deu", "interaction_id": None}
+        session.save()
+        response = self.client.post(
+            reverse("tools_translate_glosses"),
+            {"selected_translations": [f"{self.sources[0].pk}:Wort", "999999:Unbekannt"]},
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Gloss.objects.filter(content="Wort").exists())
+
+
+class SaveExampleSentencesTests(TestCase):
+    def setUp(self):
+        Language.objects.create(iso="eng", name="English")
+        Language.objects.create(iso="deu", name="German")
+        self.glosses = [Gloss.objects.create(content=f"word {index}", language_id="eng") for index in range(30)]
+
+    def examples(self, glosses):
+        return [
+            (gloss.pk, "eng", f"I use {gloss.content}.", "deu", f"Ich benutze {gloss.content}." if index % 2 else None)
+            for index, gloss in enumerate(glosses)
+        ]
+
+    def test_links_sentences_and_translations(self):
+        created, linked = save_example_sentences(self.examples(self.glosses[:2]))
+        self.assertEqual((created, linked), (3, 3))
+        sentence = Gloss.objects.get(content="I use word 1.")
+        translation = Gloss.objects.get(content="Ich benutze word 1.")
+        self.assertEqual(list(sentence.translations.all()), [translation])
+        self.assertEqual(list(translation.translations.all()), [sentence])
+        self.assertEqual(set(self.glosses[1].usage_of_clarified.all()), {sentence, translation})
+        self.assertEqual(save_example_sentences(self.examples(self.glosses[:2])), (0, 3))
+
+    def test_queries_do_not_grow_with_sentences(self):
+        with CaptureQueriesContext(connection) as few:
+            save_example_sentences(self.examples(self.glosses[:2]))
+        with CaptureQueriesContext(connection) as many:
+            save_example_sentences(self.examples(self.glosses[2:30]))
+        self.assertEqual(len(few), len(many))
+
+
+class GlossListTests(TestCase):
+    def setUp(self):
+        english = Language.objects.create(iso="eng", name="English")
+        german = Language.objects.create(iso="deu", name="German")
+        for content in ["house", "home", "hello", "horse"]:
+            Gloss.objects.create(content=content, language=english)
+        for content in ["Haus", "Heim"]:
+            Gloss.objects.create(content=content, language=german)
+
+    def pages(self, **params):
+        """Follow the api_gloss_list cursors; returns the keys of each page."""
+        pages = []
+        while True:
+            response = self.client.get(reverse("api_gloss_list"), params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            pages.append([(gloss["language_iso"], gloss["content"]) for gloss in data["results"]])
+            if not data["next"]:
+                return pages
+            params["cursor"] = data["next"]
+
+    def test_pages_follow_language_and_content(self):
+        self.assertEqual(self.pages(limit=4), [
+            [("deu", "Haus"), ("deu", "Heim"), ("eng", "hello"), ("eng", "home")],
+            [("eng", "horse"), ("eng", "house")],
+        ])
+        self.assertEqual(self.pages(limit=1, language="eng")[1:3], [[("eng", "home")], [("eng", "horse")]])
+        self.assertEqual(self.pages(limit=1, q="ho"), [[("eng", "home")], [("eng", "horse")], [("eng", "house")]])
+
+    def test_page_queries_do_not_grow(self):
+        url = reverse("gloss_list")
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url, {"limit": 2})
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url, {"limit": 6})
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.context["glosses"]), 6)
+        self.assertIsNone(response.context["next_query"])
+
+    def test_rejects_invalid_cursor(self):
+        self.assertEqual(self.client.get(reverse("gloss_list"), {"cursor": "nope"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("api_gloss_list"), {"limit": 0}).status_code, 400)
+
+
+class SituationListTests(TestCase):
+    def setUp(self):
+        english = Language.objects.create(iso="eng", name="English")
+        german = Language.objects.create(iso="deu", name="German")
+        for index in range(3):
+            situation = Situation.objects.create(id=f"s{index}")
+            situation.glosses.set([Gloss.objects.create(content=f"word {index} {n}", language=english) for n in range(index)])
+            situation.descriptions.add(Gloss.objects.create(content=f"Beschreibung {index}", language=german))
+            if index:
+                situation.descriptions.add(Gloss.objects.create(content=f"Description {index}", language=english))
+
+    def test_summary_is_loaded_with_the_situations(self):
+        with self.assertNumQueries(1):
+            situations = list(Situation.objects.with_summary().order_by("id"))
+            labels = [(str(s), s.gloss_count, s.description_count) for s in situations]
+        self.assertEqual(labels, [("s0", 0, 1), ("Description 1", 1, 2), ("Description 2", 2, 2)])
+        self.assertEqual([str(s) for s in Situation.objects.order_by("id")], ["s0", "Description 1", "Description 2"])
+
+    def test_pages_by_id(self):
+        with patch("cms.views.situation.list.SITUATION_PAGE_SIZE", 2):
+            response = self.client.get(reverse("situation_list"))
+            self.assertEqual([s.id for s in response.context["situations"]], ["s0", "s1"])
+            response = self.client.get(reverse("situation_list"), {"after": response.context["next_after"]})
+        self.assertEqual([s.id for s in response.context["situations"]], ["s2"])
+        self.assertIsNone(response.context["next_after"])
+
+
+class FormContextTests(TestCase):
+    def setUp(self):
+        self.english = Language.objects.create(iso="eng", name="English")
+        self.gloss = Gloss.objects.create(content="house", language=self.english)
+        self.gloss.translations.add(Gloss.objects.create(content="Haus", language=Language.objects.create(iso="deu", name="German")))
+        self.situation = Situation.objects.create(id="home")
+        self.situation.glosses.add(self.gloss)
+
+    def test_forms_serialize_only_selected_glosses(self):
+        urls = [
+            reverse("gloss_create"),
+            reverse("gloss_update", args=[self.gloss.pk]),
+            reverse("situation_create"),
+            reverse("situation_update", args=[self.situation.pk]),
+        ]
+        counts = []
+        for batch in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                responses = [self.client.get(url) for url in urls]
+            counts.append(len(queries))
+            Gloss.objects.bulk_create(Gloss(content=f"word {batch} {n}", language=self.english) for n in range(50))
+        self.assertEqual(counts[0], counts[1])
+        self.assertNotIn("glosses", responses[2].context)
+        self.assertEqual(
+            [gloss["label"] for gloss in responses[1].context["relations_serialized"]["translations"]],
+            ["deu: Haus"],
+        )
+        self.assertEqual([gloss["id"] for gloss in responses[3].context["glosses_serialized"]], [self.gloss.pk])
+
+
+class FuzzyGlossSearchTests(TestCase):
+    def setUp(self):
+        fuzzy_index.clear()
+        self.english = Language.objects.create(iso="eng", name="English")
+        self.german = Language.objects.create(iso="deu", name="German")
+        for content in ["house", "mouse", "horse", "houses", "a house"]:
+            Gloss.objects.create(content=content, language=self.english)
+        Gloss.objects.create(content="Haus", language=self.german)
+
+    def fuzzy(self, query, language_iso="eng", max_distance=1):
+        return [(gloss.content, distance) for gloss, distance in fuzzy_glosses(query, language_iso, max_distance)]
+
+    def test_finds_typos_within_distance(self):
+        self.assertEqual(self.fuzzy("hous"), [("house", 1)])
+        self.assertEqual(
+            sorted(self.fuzzy("Hoses", max_distance=2)),
+            [("horse", 2), ("house", 2), ("houses", 1)],
+        )
+        # Too short for two edits, searched with one
+        self.assertEqual(sorted(self.fuzzy("Hose", max_distance=2)), [("horse", 1), ("house", 1)])
+        self.assertEqual(self.fuzzy("haus", "deu"), [("Haus", 0)])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.fuzzy("hous"), [("house", 1)])
+        gloss = Gloss.objects.get(content="house")
+        gloss.content = "garden"
+        with self.captureOnCommitCallbacks(execute=True):
+            gloss.save()
+        self.assertEqual(self.fuzzy("hous"), [])
+        self.assertEqual(self.fuzzy("gardn"), [("garden", 1)])
+
+        gloss.language = self.german
+        with self.captureOnCommitCallbacks(execute=True):
+            gloss.save()
+        self.assertEqual(self.fuzzy("gardn"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            gloss.delete()
+        self.assertEqual(self.fuzzy("gardn", "deu"), [])
+
+    def test_index_ignores_rolled_back_writes(self):
+        self.assertEqual(self.fuzzy("hous"), [("house", 1)])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                gloss = Gloss.objects.get(content="house")
+                gloss.content = "garden"
+                gloss.save()
+                Gloss.objects.get(content="mouse").delete()
+                get_or_create_glosses([("eng", "hose")])
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.fuzzy("gardn"), [])
+        self.assertEqual(self.fuzzy("hous"), [("house", 1)])
+        self.assertEqual(self.fuzzy("mous"), [("mouse", 1)])
+        self.assertEqual(self.fuzzy("hosee"), [])
+
+    def test_keeps_the_most_recently_searched_languages(self):
+        index = FuzzyIndex(max_languages=2)
+        for iso in ["eng", "deu", "eng", "fra"]:
+            index.search("haus", iso, 1)
+        self.assertEqual(list(index._languages), ["eng", "fra"])
+
+    def test_endpoint_needs_a_language_for_fuzzy_search(self):
+        url = reverse("api_gloss_search")
+        results = self.client.get(url, {"q": "hous", "fuzzy": "1", "language": "eng"}).json()["results"]
+        self.assertEqual([(result["content"], result["distance"]) for result in results], [("house", 1)])
+
+        results = self.client.get(url, {"q": "hous", "fuzzy": "1"}).json()["results"]
+        self.assertTrue(results)
+        self.assertTrue(all("match" in result and "distance" not in result for result in results))
+        self.assertEqual(fuzzy_index._languages.keys(), {"eng"})
+
+    def test_bounded_levenshtein(self):
+        self.assertEqual(bounded_levenshtein("kitten", "sitting", 3), 3)
+        self.assertIsNone(bounded_levenshtein("kitten", "sitting", 2))
+        self.assertEqual(bounded_levenshtein("", "ab", 2), 2)
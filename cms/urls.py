@@ -18,9 +18,19 @@ urlpatterns = [
     path("situations/<str:pk>/edit/", views.situation_update, name="situation_update"),
     path("situations/<str:pk>/delete/", views.situation_delete, name="situation_delete"),
     path("situations/download-all/", views.situation_download_all, name="situation_download_all"),
+    path("exports/<str:kind>/start/", views.export_job_start, name="export_job_start"),
+    path("exports/<int:pk>/", views.export_job_detail, name="export_job_detail"),
+    path("exports/<int:pk>/download/", views.export_job_download, name="export_job_download"),
+    path("api/exports/<int:pk>/", views.api_export_job_status, name="api_export_job_status"),
+    path("api/glosses/", views.api_gloss_list, name="api_gloss_list"),
+    path("api/glosses/<int:pk>/situations/", views.api_gloss_situations, name="api_gloss_situations"),
     path("api/glosses/search/", views.api_gloss_search, name="api_gloss_search"),
+    path("api/glosses/search-batch/", views.api_gloss_search_batch, name="api_gloss_search_batch"),
     path("api/glosses/create/", views.api_gloss_create, name="api_gloss_create"),
     path("api/glosses/create-or-get/", views.api_gloss_create_or_get, name="api_gloss_create_or_get"),
+    path("api/glosses/bulk-create-or-get/", views.api_gloss_bulk_create_or_get, name="api_gloss_bulk_create_or_get"),
+    path("api/glosses/import/", views.api_gloss_import, name="api_gloss_import"),
+    path("api/situations/import/", views.api_situation_import, name="api_situation_import"),
     path("glosses/<int:pk>/tools/", views.gloss_tools, name="gloss_tools"),
     path("glosses/<int:pk>/variations/<int:num_variations>/", views.gloss_variations, name="gloss_variations"),
     path("glosses/<int:pk>/example-sentences/<int:num_sentences>/select-language/", views.gloss_example_sentences_select_language, name="gloss_example_sentences_select_language"),
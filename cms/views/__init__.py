@@ -6,6 +6,7 @@ This package organizes views by model/feature:
 - language: Language CRUD operations
 - gloss: Gloss CRUD operations
 - situation: Situation CRUD operations
+- export: Background export jobs
 - api: API endpoints for AJAX operations
 - shared: Shared utility functions
 """
@@ -38,11 +39,25 @@ from .situation import (
     situation_download_all,
 )
 
+# Export job views
+from .export import (
+    export_job_start,
+    export_job_detail,
+    export_job_download,
+)
+
 # API views
 from .api import (
+    api_gloss_list,
+    api_gloss_situations,
     api_gloss_search,
+    api_gloss_search_batch,
     api_gloss_create,
     api_gloss_create_or_get,
+    api_gloss_bulk_create_or_get,
+    api_gloss_import,
+    api_situation_import,
+    api_export_job_status,
 )
 
 # AI views
@@ -75,10 +90,21 @@ __all__ = [
     "situation_update",
     "situation_delete",
     "situation_download_all",
+    # Export jobs
+    "export_job_start",
+    "export_job_detail",
+    "export_job_download",
     # API
+    "api_gloss_list",
+    "api_gloss_situations",
     "api_gloss_search",
+    "api_gloss_search_batch",
     "api_gloss_create",
     "api_gloss_create_or_get",
+    "api_gloss_bulk_create_or_get",
+    "api_gloss_import",
+    "api_situation_import",
+    "api_export_job_status",
     # AI
     "gloss_tools",
     "gloss_variations",
@@ -1,8 +1,8 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
-from django.db import transaction
 from urllib.parse import quote
 import json
+from cms.ingest.examples import save_example_sentences
 from cms.models import Gloss, Language
 from cms.ai.features.gloss_example_sentences import generate_example_sentences
 
@@ -63,54 +63,13 @@ def gloss_example_sentences(request, pk, num_sentences):
             save_language = get_object_or_404(Language, iso=save_language_iso)
             source_language = get_object_or_404(Language, iso=source_language_iso)
 
-            created_count = 0
-            linked_count = 0
+            examples = []
+            for idx_str in selected_indices:
+                sentence = sentences[int(idx_str)]
+                translation = sentence.get("translation") if has_translation else None
+                examples.append((gloss.pk, source_language.iso, sentence["original"], save_language.iso, translation))
 
-            with transaction.atomic():
-                for idx_str in selected_indices:
-                    idx = int(idx_str)
-                    sentence = sentences[idx]
-
-                    if has_translation and sentence.get("translation"):
-                        # Create both original and translation glosses
-                        original_gloss, original_created = Gloss.objects.get_or_create(
-                            content=sentence["original"],
-                            language=source_language,
-                            defaults={'transcriptions': []}
-                        )
-
-                        translated_gloss, translated_created = Gloss.objects.get_or_create(
-                            content=sentence["translation"],
-                            language=save_language,
-                            defaults={'transcriptions': []}
-                        )
-
-                        if original_created:
-                            created_count += 1
-                        if translated_created:
-                            created_count += 1
-
-                        # Link original and translation as translations
-                        original_gloss.translations.add(translated_gloss)
-
-                        # Link both to original gloss via clarifies_usage
-                        original_gloss.clarifies_usage.add(gloss)
-                        translated_gloss.clarifies_usage.add(gloss)
-                        linked_count += 2
-                    else:
-                        # No translation, just create the original sentence
-                        sentence_gloss, created = Gloss.objects.get_or_create(
-                            content=sentence["original"],
-                            language=source_language,
-                            defaults={'transcriptions': []}
-                        )
-
-                        if created:
-                            created_count += 1
-
-                        # Link to original gloss via clarifies_usage
-                        sentence_gloss.clarifies_usage.add(gloss)
-                        linked_count += 1
+            created_count, linked_count = save_example_sentences(examples)
 
             # Success message
             if created_count > 0 and linked_count > created_count:
@@ -1,7 +1,25 @@
-from .gloss import api_gloss_search, api_gloss_create, api_gloss_create_or_get
+from .gloss import (
+    api_gloss_list,
+    api_gloss_situations,
+    api_gloss_search,
+    api_gloss_search_batch,
+    api_gloss_create,
+    api_gloss_create_or_get,
+    api_gloss_bulk_create_or_get,
+    api_gloss_import,
+)
+from .situation import api_situation_import
+from .export import api_export_job_status
 
 __all__ = [
+    "api_gloss_list",
+    "api_gloss_situations",
     "api_gloss_search",
+    "api_gloss_search_batch",
     "api_gloss_create",
     "api_gloss_create_or_get",
+    "api_gloss_bulk_create_or_get",
+    "api_gloss_import",
+    "api_situation_import",
+    "api_export_job_status",
 ]
@@ -0,0 +1,22 @@
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from cms.models import ExportJob
+
+
+@require_GET
+def api_export_job_status(request, pk):
+    """Report the status and progress of an export job."""
+    job = get_object_or_404(ExportJob, pk=pk)
+    return JsonResponse({
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "error": job.error,
+        "download_url": reverse("export_job_download", args=[job.pk])
+        if job.status == ExportJob.STATUS_DONE else None,
+    })
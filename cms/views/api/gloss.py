@@ -1,38 +1,247 @@
+import json
+
 from django.db import IntegrityError
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET, require_POST
 
+from cms.export.closure_sql import gloss_situations
+from cms.ingest.glosses import get_or_create_glosses
+from cms.ingest.jsonl import import_gloss_jsonl
 from cms.models import Gloss, Language
+from cms.search.fuzzy import fuzzy_glosses
+from cms.search.query import exact_glosses, rank_glosses, search_glosses
+from cms.views.gloss.utils import gloss_list_page
+
+# Upper bounds for the limit and distance parameters of api_gloss_search
+MAX_SEARCH_LIMIT = 50
+MAX_FUZZY_DISTANCE = 2
+# Upper bound for the number of searches in api_gloss_search_batch
+MAX_BATCH_ITEMS = 200
+# Upper bound for the number of glosses in api_gloss_bulk_create_or_get
+MAX_BULK_ITEMS = 50000
+# Default and upper bound for the limit parameter of api_gloss_situations
+SITUATION_LIMIT = 100
+MAX_SITUATION_LIMIT = 1000
 
 
 def _serialize_gloss(gloss):
     """Serialize a gloss object for API responses."""
     return {
         "id": gloss.pk,
-        "label": f"{gloss.language.iso}: {gloss.content}",
+        "label": f"{gloss.language_id}: {gloss.content}",
         "content": gloss.content,
-        "language_iso": gloss.language.iso,
+        "language_iso": gloss.language_id,
     }
 
 
+@require_GET
+def api_gloss_list(request):
+    """
+    Page through glosses ordered by language and content, for infinite scroll.
+
+    Query parameters:
+        q: Optional search text (word prefixes of content or transcriptions)
+        language: Optional language ISO code
+        limit: Page size (default GLOSS_PAGE_SIZE, at most MAX_GLOSS_PAGE_SIZE)
+        cursor: The "next" value of the previous page
+
+    Returns:
+        {"results": [...], "next": cursor of the next page or null}
+    """
+    try:
+        glosses, next_cursor = gloss_list_page(request.GET)
+    except ValueError as error:
+        return JsonResponse({"error": str(error)}, status=400)
+    results = [
+        {**_serialize_gloss(gloss), "transcriptions": gloss.transcriptions}
+        for gloss in glosses
+    ]
+    return JsonResponse({"results": results, "next": next_cursor})
+
+
+@require_GET
+def api_gloss_situations(request, pk):
+    """
+    List the situations whose export includes a gloss, and in which pairs.
+
+    Read from the situation closure table (see gloss_situations()), so the
+    answer costs two indexed queries however many situations exist.
+
+    Query parameters:
+        limit: Situations listed (default SITUATION_LIMIT, at most
+               MAX_SITUATION_LIMIT); "count" always covers all of them
+
+    Returns:
+        {"gloss": {...}, "count": N, "situations": [{"id": ..., "pairs":
+        [{"native_iso", "target_iso", "phase"}, ...]}, ...]}
+    """
+    gloss = Gloss.objects.filter(pk=pk).first()
+    if gloss is None:
+        return JsonResponse({"error": "Gloss not found."}, status=404)
+    try:
+        limit = int(request.GET.get("limit", SITUATION_LIMIT))
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer."}, status=400)
+    if not 1 <= limit <= MAX_SITUATION_LIMIT:
+        return JsonResponse({"error": f"limit must be between 1 and {MAX_SITUATION_LIMIT}."}, status=400)
+
+    count, situations = gloss_situations(gloss.pk, limit)
+    return JsonResponse({
+        "gloss": _serialize_gloss(gloss),
+        "count": count,
+        "situations": [
+            {
+                "id": situation_id,
+                "pairs": [
+                    {"native_iso": native_iso, "target_iso": target_iso, "phase": phase}
+                    for native_iso, target_iso, phase in pairs
+                ],
+            }
+            for situation_id, pairs in situations.items()
+        ],
+    })
+
+
 @require_GET
 def api_gloss_search(request):
-    """Search for glosses by content, optionally filtered by language."""
-    query = request.GET.get("q", "").strip()
-    language_iso = request.GET.get("language", "").strip()
+    """
+    Search for glosses, optionally filtered by language.
+
+    Query parameters:
+        q: Search text
+        language: Optional language ISO code
+        limit: Number of results (default 10, at most MAX_SEARCH_LIMIT)
+        mode: "ranked" (default) orders exact, prefix, word and substring
+              matches in that order and reports the tier of each result as
+              "match"; "alphabetical" returns word-prefix matches by content;
+              "exact" returns glosses whose content equals q
+        fuzzy: "1" returns glosses within edit distance of q instead, closest
+               first, and reports each result's "distance"; needs language,
+               without it the search stays in mode
+        distance: Maximum edit distance for fuzzy (default 1, at most
+                  MAX_FUZZY_DISTANCE)
+    """
+    try:
+        search = _parse_search(request.GET)
+    except ValueError as error:
+        return JsonResponse({"error": str(error)}, status=400)
+    if search["mode"] == "exact":
+        results = _exact_results([search])[0]
+    else:
+        results = _search_results(search)
+    return JsonResponse({"results": results})
 
-    qs = Gloss.objects.select_related("language")
 
-    if query:
-        qs = qs.filter(content__icontains=query)
+@require_POST
+def api_gloss_search_batch(request):
+    """
+    Answer many searches in one request.
 
-    if language_iso:
-        qs = qs.filter(language__iso=language_iso)
+    The body is a JSON list of at most MAX_BATCH_ITEMS searches, each an
+    object with the query parameters of api_gloss_search (mode defaults to
+    "exact" here). All exact searches are answered by a single query; the
+    other modes run one search per item.
 
-    results = [_serialize_gloss(gloss) for gloss in qs.order_by("content")[:10]]
+    Returns:
+        {"results": [{"q": ..., "results": [...]}, ...]} in input order
+    """
+    try:
+        items = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "Body must be JSON."}, status=400)
+    if not isinstance(items, list):
+        return JsonResponse({"error": "Body must be a list of searches."}, status=400)
+    if len(items) > MAX_BATCH_ITEMS:
+        return JsonResponse({"error": f"At most {MAX_BATCH_ITEMS} searches per batch."}, status=400)
+
+    searches = []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("Search must be an object.")
+            searches.append(_parse_search(item, default_mode="exact"))
+        except ValueError as error:
+            return JsonResponse({"error": f"Item {index}: {error}"}, status=400)
+
+    exact_searches = [search for search in searches if search["mode"] == "exact"]
+    exact_results = iter(_exact_results(exact_searches))
+    results = [
+        {
+            "q": search["query"],
+            "results": next(exact_results) if search["mode"] == "exact" else _search_results(search),
+        }
+        for search in searches
+    ]
     return JsonResponse({"results": results})
 
 
+def _parse_search(params, default_mode="ranked"):
+    """
+    Validate search parameters from a query string or a batch item.
+
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid
+    """
+    query = params.get("q", "")
+    language_iso = params.get("language") or ""
+    if not isinstance(query, str) or not isinstance(language_iso, str):
+        raise ValueError("Query and language must be strings.")
+    mode = params.get("mode") or default_mode
+    if mode not in ("ranked", "alphabetical", "exact"):
+        raise ValueError("Mode must be ranked, alphabetical or exact.")
+    try:
+        limit = int(params.get("limit", 10))
+    except (TypeError, ValueError):
+        raise ValueError("Limit must be a number.") from None
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        raise ValueError(f"Limit must be between 1 and {MAX_SEARCH_LIMIT}.")
+
+    distance = None
+    # The fuzzy index is held per language, so it only serves single-language searches
+    if params.get("fuzzy") in ("1", 1, True) and language_iso.strip():
+        try:
+            distance = int(params.get("distance", 1))
+        except (TypeError, ValueError):
+            raise ValueError("Distance must be a number.") from None
+        if not 0 <= distance <= MAX_FUZZY_DISTANCE:
+            raise ValueError(f"Distance must be between 0 and {MAX_FUZZY_DISTANCE}.")
+        mode = "fuzzy"
+
+    return {
+        "query": query.strip(),
+        "language_iso": language_iso.strip(),
+        "mode": mode,
+        "limit": limit,
+        "distance": distance,
+    }
+
+
+def _search_results(search):
+    """Run one parsed non-exact search and serialize its results."""
+    query, language_iso, limit = search["query"], search["language_iso"], search["limit"]
+    if search["mode"] == "fuzzy":
+        return [
+            {**_serialize_gloss(gloss), "distance": distance}
+            for gloss, distance in fuzzy_glosses(query, language_iso, search["distance"], limit)
+        ]
+    if search["mode"] == "alphabetical":
+        qs = search_glosses(query, language_iso).select_related("language")
+        return [_serialize_gloss(gloss) for gloss in qs[:limit]]
+    return [
+        {**_serialize_gloss(gloss), "match": tier}
+        for gloss, tier in rank_glosses(query, language_iso, limit)
+    ]
+
+
+def _exact_results(searches):
+    """Run parsed exact searches in one query; serialized results in search order."""
+    matches = exact_glosses([(search["query"], search["language_iso"]) for search in searches])
+    return [
+        [_serialize_gloss(gloss) for gloss in glosses[:search["limit"]]]
+        for search, glosses in zip(searches, matches)
+    ]
+
+
 @require_POST
 def api_gloss_create(request):
     """Create a new gloss via API."""
@@ -102,3 +311,68 @@ def api_gloss_create_or_get(request):
         return JsonResponse({
             "error": "An unexpected error occurred"
         }, status=500)
+
+
+@require_POST
+def api_gloss_bulk_create_or_get(request):
+    """
+    Get or create many glosses at once.
+
+    The body is a JSON list of at most MAX_BULK_ITEMS {"language", "content"}
+    objects. Either all glosses are resolved or, if an item is invalid, none
+    is created.
+
+    Returns:
+        {"results": [{"gloss": ..., "created": ..., "status": ...}, ...]} in
+        input order, like api_gloss_create_or_get
+    """
+    try:
+        items = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "Body must be JSON."}, status=400)
+    if not isinstance(items, list):
+        return JsonResponse({"error": "Body must be a list of glosses."}, status=400)
+    if len(items) > MAX_BULK_ITEMS:
+        return JsonResponse({"error": f"At most {MAX_BULK_ITEMS} glosses per request."}, status=400)
+
+    pairs = []
+    for index, item in enumerate(items):
+        content = item.get("content") if isinstance(item, dict) else None
+        language_iso = item.get("language") if isinstance(item, dict) else None
+        if not isinstance(content, str) or not content.strip():
+            return JsonResponse({"error": f"Item {index}: Content is required."}, status=400)
+        if not isinstance(language_iso, str) or not language_iso.strip():
+            return JsonResponse({"error": f"Item {index}: Language is required."}, status=400)
+        pairs.append((language_iso.strip(), content.strip()))
+
+    try:
+        resolved = get_or_create_glosses(pairs)
+    except ValueError as error:
+        return JsonResponse({"error": str(error)}, status=404)
+
+    results = []
+    for (language_iso, content), (gloss_id, created) in zip(pairs, resolved):
+        gloss = Gloss(pk=gloss_id, language_id=language_iso, content=content)
+        results.append({
+            "gloss": _serialize_gloss(gloss),
+            "created": created,
+            "status": "created" if created else "existing",
+        })
+    return JsonResponse({"results": results})
+
+
+@require_POST
+def api_gloss_import(request):
+    """
+    Import an uploaded JSONL file ("file") in the gloss export format.
+
+    See import_gloss_jsonl(); nothing is imported if a line is invalid.
+    """
+    upload = request.FILES.get("file")
+    if upload is None:
+        return JsonResponse({"error": "File is required."}, status=400)
+    try:
+        stats = import_gloss_jsonl(upload)
+    except (UnicodeDecodeError, ValueError) as error:
+        return JsonResponse({"error": str(error)}, status=400)
+    return JsonResponse(stats)
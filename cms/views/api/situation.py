@@ -0,0 +1,21 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+
+from cms.ingest.situations import import_situation_archive
+
+
+@require_POST
+def api_situation_import(request):
+    """
+    Import an uploaded situation download-all ZIP ("file").
+
+    See import_situation_archive(); nothing is imported if the archive is invalid.
+    """
+    upload = request.FILES.get("file")
+    if upload is None:
+        return JsonResponse({"error": "File is required."}, status=400)
+    try:
+        stats = import_situation_archive(upload)
+    except (UnicodeDecodeError, ValueError) as error:
+        return JsonResponse({"error": str(error)}, status=400)
+    return JsonResponse(stats)
@@ -0,0 +1,9 @@
+from .start import export_job_start
+from .detail import export_job_detail
+from .download import export_job_download
+
+__all__ = [
+    "export_job_start",
+    "export_job_detail",
+    "export_job_download",
+]
@@ -0,0 +1,17 @@
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+
+from cms.models import ExportJob
+
+
+def export_job_detail(request, pk):
+    """Progress page of an export job; polls the status API until it is done."""
+    job = get_object_or_404(ExportJob, pk=pk)
+    return render(
+        request,
+        "cms/export_job_detail.html",
+        {
+            "job": job,
+            "status_url": reverse("api_export_job_status", args=[job.pk]),
+        },
+    )
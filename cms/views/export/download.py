@@ -0,0 +1,108 @@
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition, require_GET
+
+from cms.models import ExportJob
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _job_etag(request, pk):
+    return ExportJob.objects.filter(pk=pk, status=ExportJob.STATUS_DONE).values_list(
+        "etag", flat=True
+    ).first()
+
+
+@require_GET
+@condition(etag_func=_job_etag)
+def export_job_download(request, pk):
+    """
+    Serve the ZIP file of a finished export job.
+
+    Supports conditional requests through the job's ETag and single byte
+    ranges, so repeated or resumed downloads only read the stored file.
+    """
+    job = get_object_or_404(ExportJob, pk=pk, status=ExportJob.STATUS_DONE)
+    path = settings.EXPORT_ROOT / job.file_name
+    if not path.exists():
+        raise Http404("Export file no longer exists.")
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header and (not if_range or if_range == quote_etag(job.etag)):
+        byte_range = _parse_range(range_header, job.file_size)
+        if byte_range == "unsatisfiable":
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{job.file_size}"
+            return response
+
+    fileobj = open(path, "rb")
+    if byte_range is None:
+        response = FileResponse(
+            fileobj, as_attachment=True, filename=job.download_name(), content_type="application/zip"
+        )
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            _FileRange(fileobj, start, end - start + 1),
+            status=206,
+            as_attachment=True,
+            filename=job.download_name(),
+            content_type="application/zip",
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{job.file_size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def _parse_range(header, size):
+    """
+    Parse a single "bytes=start-end" range.
+
+    Returns (start, end) inclusive, "unsatisfiable", or None to ignore the
+    header (unsupported or malformed ranges get the full file).
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if start == "":
+        if end == "":
+            return None
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+
+class _FileRange:
+    """Read-only view of length bytes of fileobj starting at start."""
+
+    def __init__(self, fileobj, start, length):
+        fileobj.seek(start)
+        self.fileobj = fileobj
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fileobj.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fileobj.close()
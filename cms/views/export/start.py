@@ -0,0 +1,14 @@
+from django.http import Http404
+from django.shortcuts import redirect
+from django.views.decorators.http import require_POST
+
+from cms.models import ExportJob
+
+
+@require_POST
+def export_job_start(request, kind):
+    """Queue a background export job and show its progress page."""
+    if kind not in dict(ExportJob.KIND_CHOICES):
+        raise Http404("Unknown export kind.")
+    job = ExportJob.objects.create(kind=kind)
+    return redirect("export_job_detail", pk=job.pk)
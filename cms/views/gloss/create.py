@@ -1,16 +1,12 @@
 from django.shortcuts import redirect, render
-from django.urls import reverse
 
-from cms.models import Gloss, Language
-from cms.views.shared.utils import serialize_languages
-from .utils import parse_gloss_form_payload, serialize_relations
+from cms.ingest.relations import set_gloss_relations
+from cms.models import Gloss
+from cms.views.shared.utils import form_context
+from .utils import parse_gloss_form_payload
 
 
 def gloss_create(request):
-    languages = Language.objects.order_by("name")
-    languages_serialized = serialize_languages(languages)
-    gloss_search_url = reverse("api_gloss_search")
-    gloss_create_url = reverse("api_gloss_create_or_get")
     empty = {
         "content": "",
         "language": None,
@@ -33,8 +29,10 @@ def gloss_create(request):
                 language=payload["language"],
                 transcriptions=payload["transcriptions"],
             )
-            for relation_name, values in payload["relations"].items():
-                getattr(gloss, relation_name).set(values)
+            set_gloss_relations(gloss.pk, {
+                relation_name: [related.pk for related in values]
+                for relation_name, values in payload["relations"].items()
+            })
             return redirect("gloss_list")
         return render(
             request,
@@ -42,12 +40,8 @@ def gloss_create(request):
             {
                 "data": payload,
                 "errors": errors,
-                "languages": languages,
-                "languages_serialized": languages_serialized,
-                "relations_serialized": serialize_relations(payload["relations"]),
-                "gloss_search_url": gloss_search_url,
-                "gloss_create_url": gloss_create_url,
                 "mode": "create",
+                **form_context(relations=payload["relations"]),
             },
         )
 
@@ -57,11 +51,7 @@ def gloss_create(request):
         {
             "data": empty,
             "errors": [],
-            "languages": languages,
-            "languages_serialized": languages_serialized,
-            "relations_serialized": serialize_relations(empty["relations"]),
-            "gloss_search_url": gloss_search_url,
-            "gloss_create_url": gloss_create_url,
             "mode": "create",
+            **form_context(relations=empty["relations"]),
         },
     )
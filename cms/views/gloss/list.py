@@ -1,12 +1,26 @@
+from django.http import HttpResponseBadRequest
 from django.shortcuts import render
 
-from cms.models import Gloss
+from cms.models import Language
+
+from .utils import gloss_list_page
 
 
 def gloss_list(request):
-    glosses = (
-        Gloss.objects.select_related("language")
-        .prefetch_related("translations", "near_synonyms")
-        .order_by("language__iso", "content")
-    )
-    return render(request, "cms/gloss_list.html", {"glosses": glosses})
+    """List glosses one keyset page at a time, filtered by language and text."""
+    try:
+        glosses, next_cursor = gloss_list_page(request.GET)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    next_params = request.GET.copy()
+    next_params.pop("toast", None)
+    next_params.pop("toast_type", None)
+    if next_cursor:
+        next_params["cursor"] = next_cursor
+    return render(request, "cms/gloss_list.html", {
+        "glosses": glosses,
+        "languages": Language.objects.order_by("iso"),
+        "q": request.GET.get("q", ""),
+        "language": request.GET.get("language", ""),
+        "next_query": next_params.urlencode() if next_cursor else None,
+    })
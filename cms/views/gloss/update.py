@@ -1,17 +1,19 @@
 from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse
 
-from cms.models import Gloss, Language
-from cms.views.shared.utils import serialize_languages
-from .utils import parse_gloss_form_payload, serialize_relations
+from cms.export.closure_sql import gloss_situations
+from cms.ingest.relations import set_gloss_relations
+from cms.models import Gloss
+from cms.views.shared.utils import form_context
+from .utils import parse_gloss_form_payload
+
+# Situations listed in the panel of the edit page
+PANEL_SITUATIONS = 20
+# Editors are warned when this many situations or more include the gloss
+WIDE_IMPACT_SITUATIONS = 10
 
 
 def gloss_update(request, pk):
     gloss = get_object_or_404(Gloss, pk=pk)
-    languages = Language.objects.order_by("name")
-    languages_serialized = serialize_languages(languages)
-    gloss_search_url = reverse("api_gloss_search")
-    gloss_create_url = reverse("api_gloss_create_or_get")
     if request.method == "POST":
         payload, errors = parse_gloss_form_payload(request, instance=gloss)
         if not errors:
@@ -19,8 +21,10 @@ def gloss_update(request, pk):
             gloss.language = payload["language"]
             gloss.transcriptions = payload["transcriptions"]
             gloss.save()
-            for relation_name, values in payload["relations"].items():
-                getattr(gloss, relation_name).set(values)
+            set_gloss_relations(gloss.pk, {
+                relation_name: [related.pk for related in values]
+                for relation_name, values in payload["relations"].items()
+            })
             return redirect("gloss_list")
         return render(
             request,
@@ -28,13 +32,10 @@ def gloss_update(request, pk):
             {
                 "data": payload,
                 "errors": errors,
-                "languages": languages,
-                "languages_serialized": languages_serialized,
-                "relations_serialized": serialize_relations(payload["relations"]),
-                "gloss_search_url": gloss_search_url,
-                "gloss_create_url": gloss_create_url,
                 "mode": "edit",
                 "gloss": gloss,
+                **_situation_impact(gloss),
+                **form_context(relations=payload["relations"]),
             },
         )
 
@@ -58,12 +59,20 @@ def gloss_update(request, pk):
         {
             "data": data,
             "errors": [],
-            "languages": languages,
-            "languages_serialized": languages_serialized,
-            "relations_serialized": serialize_relations(data["relations"]),
-            "gloss_search_url": gloss_search_url,
-            "gloss_create_url": gloss_create_url,
             "mode": "edit",
             "gloss": gloss,
+            **_situation_impact(gloss),
+            **form_context(relations=data["relations"]),
         },
     )
+
+
+def _situation_impact(gloss):
+    """Context of the panel listing the situations that export the gloss."""
+    situation_count, situations = gloss_situations(gloss.pk, PANEL_SITUATIONS)
+    return {
+        "situation_count": situation_count,
+        "situations_reached": list(situations.items()),
+        "more_situations": situation_count - len(situations),
+        "wide_impact": situation_count >= WIDE_IMPACT_SITUATIONS,
+    }
@@ -1,5 +1,12 @@
+import base64
+import json
 from collections import deque
 from cms.models import Gloss, Language
+from cms.search.query import list_glosses
+
+# Glosses per gloss_list page, by default and at most
+GLOSS_PAGE_SIZE = 50
+MAX_GLOSS_PAGE_SIZE = 200
 
 
 def parse_gloss_form_payload(request, instance=None):
@@ -33,15 +40,19 @@ def parse_gloss_form_payload(request, instance=None):
         "to_be_differentiated_from",
         "collocations",
     ]
-    relations = {}
-    for key in relation_keys:
-        selected_ids = request.POST.getlist(key)
-        if not selected_ids:
-            relations[key] = []
-            continue
-        relations[key] = list(
-            Gloss.objects.filter(pk__in=selected_ids).exclude(pk=getattr(instance, "pk", None))
-        )
+    selected_ids = {
+        key: [int(value) for value in request.POST.getlist(key) if value.isdigit()]
+        for key in relation_keys
+    }
+    # Resolve the glosses of all relations in one query
+    glosses = Gloss.objects.select_related("language").in_bulk(
+        {gloss_id for ids in selected_ids.values() for gloss_id in ids}
+        - {getattr(instance, "pk", None)}
+    )
+    relations = {
+        key: [glosses[gloss_id] for gloss_id in sorted(set(ids)) if gloss_id in glosses]
+        for key, ids in selected_ids.items()
+    }
 
     payload = {
         "content": content,
@@ -53,24 +64,50 @@ def parse_gloss_form_payload(request, instance=None):
     return payload, errors
 
 
-def serialize_gloss(gloss):
-    """Serialize a gloss object to a dictionary."""
-    return {
-        "id": gloss.pk,
-        "label": f"{gloss.language.iso}: {gloss.content}",
-        "content": gloss.content,
-        "language_iso": gloss.language.iso,
-    }
-
+def gloss_list_page(params):
+    """
+    Return one page of the gloss list for the query parameters in params.
 
-def serialize_glosses(glosses):
-    """Serialize a list of gloss objects."""
-    return [serialize_gloss(g) for g in glosses]
+    Parameters: q (search text), language (ISO code), limit (page size) and
+    cursor (opaque, from the previous page). See list_glosses().
 
+    Returns:
+        Tuple of (list of glosses, cursor of the next page or None)
 
-def serialize_relations(relations):
-    """Serialize relations dictionary."""
-    return {key: serialize_glosses(items) for key, items in relations.items()}
+    Raises:
+        ValueError: If limit or cursor is invalid
+    """
+    try:
+        limit = int(params.get("limit", GLOSS_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer.") from None
+    if not 1 <= limit <= MAX_GLOSS_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_GLOSS_PAGE_SIZE}.")
+    after = _decode_cursor(params["cursor"]) if params.get("cursor") else None
+
+    glosses = list(list_glosses(
+        params.get("q", "").strip(), params.get("language", "").strip() or None, after
+    )[:limit + 1])
+    if len(glosses) <= limit:
+        return glosses, None
+    last = glosses[limit - 1]
+    return glosses[:limit], _encode_cursor(last.language_id, last.content)
+
+
+def _encode_cursor(language_iso, content):
+    data = json.dumps([language_iso, content]).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        language_iso, content = json.loads(data)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor.") from None
+    if not isinstance(language_iso, str) or not isinstance(content, str):
+        raise ValueError("Invalid cursor.")
+    return language_iso, content
 
 
 def collect_glosses_recursively(situation, native_language_iso, target_language_iso):
@@ -234,92 +271,3 @@ def collect_glosses_recursively(situation, native_language_iso, target_language_
     result_glosses.extend(additional_glosses.values())
 
     return result_glosses
-
-
-def serialize_gloss_to_json(gloss):
-    """
-    Serialize a gloss to a dictionary suitable for standalone JSON export.
-
-    Includes all data and relationships without filtering.
-
-    Args:
-        gloss: Gloss instance with prefetched relationships
-
-    Returns:
-        Dictionary with complete gloss data
-    """
-    # Helper function to extract all keys (no filtering)
-    def get_all_keys(relationship_queryset):
-        return [g.get_compound_key() for g in relationship_queryset.all()]
-
-    return {
-        "key": gloss.get_compound_key(),
-        "content": gloss.content,
-        "language": gloss.language.iso,
-        "transcriptions": gloss.transcriptions,
-        "contains": get_all_keys(gloss.contains),
-        "translations": get_all_keys(gloss.translations),
-        "near_synonyms": get_all_keys(gloss.near_synonyms),
-        "near_homophones": get_all_keys(gloss.near_homophones),
-        "clarifies_usage": get_all_keys(gloss.clarifies_usage),
-        "to_be_differentiated_from": get_all_keys(gloss.to_be_differentiated_from),
-        "collocations": get_all_keys(gloss.collocations),
-        "examples": get_all_keys(gloss.usage_of_clarified),
-    }
-
-
-def serialize_gloss_to_jsonl(gloss, target_language_iso=None):
-    """
-    Serialize a gloss to a dictionary suitable for JSONL export.
-
-    Uses compound keys for cross-referencing instead of internal IDs.
-
-    Args:
-        gloss: Gloss instance with prefetched relationships
-        target_language_iso: Optional ISO code of target language. If provided,
-                           paraphrased glosses in this language will be filtered
-                           from all relationship fields.
-
-    Returns:
-        Dictionary with gloss data including all relationship fields
-    """
-
-    # Helper function to extract and filter keys
-    def get_filtered_keys(relationship_queryset):
-        glosses = relationship_queryset.all()
-        if target_language_iso:
-            return [
-                g.get_compound_key() for g in glosses
-                if not (g.language.iso == target_language_iso and g.is_paraphrased())
-            ]
-        else:
-            return [g.get_compound_key() for g in glosses]
-
-    # Existing relationships
-    contains_keys = get_filtered_keys(gloss.contains)
-    translation_keys = get_filtered_keys(gloss.translations)
-
-    # New relationships
-    near_synonyms_keys = get_filtered_keys(gloss.near_synonyms)
-    near_homophones_keys = get_filtered_keys(gloss.near_homophones)
-    clarifies_usage_keys = get_filtered_keys(gloss.clarifies_usage)
-    to_be_differentiated_from_keys = get_filtered_keys(gloss.to_be_differentiated_from)
-    collocations_keys = get_filtered_keys(gloss.collocations)
-
-    # Examples (reverse clarifies_usage)
-    examples_keys = get_filtered_keys(gloss.usage_of_clarified)
-
-    return {
-        "key": gloss.get_compound_key(),
-        "content": gloss.content,
-        "language": gloss.language.iso,
-        "transcriptions": gloss.transcriptions,
-        "contains": contains_keys,
-        "translations": translation_keys,
-        "near_synonyms": near_synonyms_keys,
-        "near_homophones": near_homophones_keys,
-        "clarifies_usage": clarifies_usage_keys,
-        "to_be_differentiated_from": to_be_differentiated_from_keys,
-        "collocations": collocations_keys,
-        "examples": examples_keys,
-    }
@@ -1,3 +1,3 @@
-from .utils import serialize_languages
+from .utils import form_context, serialize_glosses, serialize_languages
 
-__all__ = ["serialize_languages"]
+__all__ = ["form_context", "serialize_glosses", "serialize_languages"]
@@ -1,4 +1,7 @@
 """Shared utility functions used across multiple view modules."""
+from django.urls import reverse
+
+from cms.models import Language
 
 
 def serialize_languages(languages):
@@ -11,3 +14,47 @@ def serialize_languages(languages):
         }
         for lang in languages
     ]
+
+
+def serialize_glosses(glosses):
+    """Serialize a list of Gloss objects for relation selectors."""
+    return [
+        {
+            "id": gloss.pk,
+            "label": f"{gloss.language_id}: {gloss.content}",
+            "content": gloss.content,
+            "language_iso": gloss.language_id,
+        }
+        for gloss in glosses
+    ]
+
+
+def form_context(**selected):
+    """
+    Build the context shared by the gloss and situation forms.
+
+    Relation selectors load their choices from the gloss search API, so only
+    the glosses already selected are serialized and rendering a form does not
+    depend on the size of the corpus.
+
+    Args:
+        selected: Context name -> list of selected glosses, or dict of such
+                  lists; each is serialized as "<name>_serialized"
+
+    Returns:
+        Dict with languages, their serialization, the gloss API URLs and the
+        serialized selections
+    """
+    languages = Language.objects.order_by("name")
+    context = {
+        "languages": languages,
+        "languages_serialized": serialize_languages(languages),
+        "gloss_search_url": reverse("api_gloss_search"),
+        "gloss_create_url": reverse("api_gloss_create_or_get"),
+    }
+    for name, glosses in selected.items():
+        if isinstance(glosses, dict):
+            context[f"{name}_serialized"] = {key: serialize_glosses(items) for key, items in glosses.items()}
+        else:
+            context[f"{name}_serialized"] = serialize_glosses(glosses)
+    return context
@@ -1,17 +1,11 @@
 from django.shortcuts import redirect, render
-from django.urls import reverse
 
-from cms.models import Gloss, Language, Situation
-from cms.views.shared.utils import serialize_languages
-from .utils import parse_situation_payload, serialize_glosses
+from cms.models import Situation
+from cms.views.shared.utils import form_context
+from .utils import parse_situation_payload
 
 
 def situation_create(request):
-    glosses = Gloss.objects.order_by("content")
-    languages = Language.objects.order_by("name")
-    languages_serialized = serialize_languages(languages)
-    gloss_search_url = reverse("api_gloss_search")
-    gloss_create_url = reverse("api_gloss_create_or_get")
     empty = {"id": "", "glosses": [], "descriptions": [], "image_link": ""}
     if request.method == "POST":
         payload, errors = parse_situation_payload(request)
@@ -30,13 +24,7 @@ def situation_create(request):
                 "data": payload,
                 "errors": errors,
                 "mode": "create",
-                "glosses": glosses,
-                "languages": languages,
-                "languages_serialized": languages_serialized,
-                "glosses_serialized": serialize_glosses(payload["glosses"]),
-                "descriptions_serialized": serialize_glosses(payload["descriptions"]),
-                "gloss_search_url": gloss_search_url,
-                "gloss_create_url": gloss_create_url,
+                **form_context(glosses=payload["glosses"], descriptions=payload["descriptions"]),
             },
         )
 
@@ -47,12 +35,6 @@ def situation_create(request):
             "data": empty,
             "errors": [],
             "mode": "create",
-            "glosses": glosses,
-            "languages": languages,
-            "languages_serialized": languages_serialized,
-            "glosses_serialized": serialize_glosses(empty["glosses"]),
-            "descriptions_serialized": serialize_glosses(empty["descriptions"]),
-            "gloss_search_url": gloss_search_url,
-            "gloss_create_url": gloss_create_url,
+            **form_context(glosses=empty["glosses"], descriptions=empty["descriptions"]),
         },
     )
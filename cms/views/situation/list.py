@@ -2,7 +2,19 @@ from django.shortcuts import render
 
 from cms.models import Situation
 
+# Situations per situation_list page
+SITUATION_PAGE_SIZE = 50
+
 
 def situation_list(request):
-    situations = Situation.objects.prefetch_related("glosses").order_by("id")
-    return render(request, "cms/situation_list.html", {"situations": situations})
+    """List situations one keyset page at a time, ordered by id."""
+    situations = Situation.objects.with_summary().order_by("id")
+    after = request.GET.get("after")
+    if after:
+        situations = situations.filter(id__gt=after)
+    page = list(situations[:SITUATION_PAGE_SIZE + 1])
+    next_after = page[SITUATION_PAGE_SIZE - 1].id if len(page) > SITUATION_PAGE_SIZE else None
+    return render(request, "cms/situation_list.html", {
+        "situations": page[:SITUATION_PAGE_SIZE],
+        "next_after": next_after,
+    })
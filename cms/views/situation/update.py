@@ -1,18 +1,12 @@
 from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse
 
-from cms.models import Gloss, Language, Situation
-from cms.views.shared.utils import serialize_languages
-from .utils import parse_situation_payload, serialize_glosses
+from cms.models import Situation
+from cms.views.shared.utils import form_context
+from .utils import parse_situation_payload
 
 
 def situation_update(request, pk):
     situation = get_object_or_404(Situation, pk=pk)
-    glosses = Gloss.objects.order_by("content")
-    languages = Language.objects.order_by("name")
-    languages_serialized = serialize_languages(languages)
-    gloss_search_url = reverse("api_gloss_search")
-    gloss_create_url = reverse("api_gloss_create_or_get")
 
     if request.method == "POST":
         payload, errors = parse_situation_payload(request, instance=situation)
@@ -29,14 +23,8 @@ def situation_update(request, pk):
                 "data": payload,
                 "errors": errors,
                 "mode": "edit",
-                "glosses": glosses,
-                "languages": languages,
-                "languages_serialized": languages_serialized,
-                "glosses_serialized": serialize_glosses(payload["glosses"]),
-                "descriptions_serialized": serialize_glosses(payload["descriptions"]),
-                "gloss_search_url": gloss_search_url,
-                "gloss_create_url": gloss_create_url,
                 "situation": situation,
+                **form_context(glosses=payload["glosses"], descriptions=payload["descriptions"]),
             },
         )
 
@@ -53,13 +41,7 @@ def situation_update(request, pk):
             "data": data,
             "errors": [],
             "mode": "edit",
-            "glosses": glosses,
-            "languages": languages,
-            "languages_serialized": languages_serialized,
-            "glosses_serialized": serialize_glosses(data["glosses"]),
-            "descriptions_serialized": serialize_glosses(data["descriptions"]),
-            "gloss_search_url": gloss_search_url,
-            "gloss_create_url": gloss_create_url,
             "situation": situation,
+            **form_context(glosses=data["glosses"], descriptions=data["descriptions"]),
         },
     )
@@ -24,15 +24,3 @@ def parse_situation_payload(request, instance=None):
     }
     return payload, errors
 
-
-def serialize_glosses(glosses):
-    """Serialize a list of glosses for situations."""
-    return [
-        {
-            "id": gloss.pk,
-            "label": f"{gloss.language.iso}: {gloss.content}",
-            "content": gloss.content,
-            "language_iso": gloss.language.iso,
-        }
-        for gloss in glosses
-    ]
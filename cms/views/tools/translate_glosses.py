@@ -1,9 +1,12 @@
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.db import transaction
 from django.views.decorators.http import require_http_methods
 from urllib.parse import quote
 
+from cms.ingest.glosses import get_or_create_glosses
+from cms.ingest.relations import add_gloss_relations
 from cms.models import Gloss, Language
 from cms.ai.features.gloss_translation import generate_translations
 
@@ -72,27 +75,29 @@ def tools_translate_glosses(request):
             target_iso = translation_data["target_iso"]
             target_language = get_object_or_404(Language, iso=target_iso)
 
-            created_count = 0
-            linked_count = 0
+            pairs = []
+            for item in selected:
+                source_id, translation_text = item.split(":", 1)
+                pairs.append((int(source_id), translation_text))
 
             with transaction.atomic():
-                for item in selected:
-                    source_id, translation_text = item.split(":", 1)
-                    source_gloss = get_object_or_404(Gloss, id=int(source_id))
-
-                    # Create or get target gloss
-                    target_gloss, created = Gloss.objects.get_or_create(
-                        content=translation_text,
-                        language=target_language,
-                        defaults={'transcriptions': []}
-                    )
-
-                    if created:
-                        created_count += 1
-
-                    # Establish mutual translation relationship
-                    source_gloss.translations.add(target_gloss)
-                    linked_count += 1
+                # Resolve all sources, upsert all targets and link them in a
+                # fixed number of queries, however many items are selected
+                source_ids = {source_id for source_id, _ in pairs}
+                if Gloss.objects.filter(id__in=source_ids).count() != len(source_ids):
+                    raise Http404("No Gloss matches the given query.")
+
+                targets = get_or_create_glosses([
+                    (target_language.iso, translation_text) for _, translation_text in pairs
+                ])
+                created_count = sum(created for _, created in targets)
+
+                # Establish mutual translation relationships
+                add_gloss_relations("translations", [
+                    (source_id, target_id)
+                    for (source_id, _), (target_id, _) in zip(pairs, targets)
+                ])
+                linked_count = len(pairs)
 
             # Clear session data
             del request.session['translation_data']
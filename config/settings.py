@@ -135,3 +135,9 @@ LUCIDE_ICONS_DIR = BASE_DIR / "lucide_icons"
 
 # AI Configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+
+# Export Configuration
+# Worker processes for situation exports (1 = run inside the request process)
+EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', '1'))
+# Directory where background export jobs write their ZIP files
+EXPORT_ROOT = Path(os.getenv('EXPORT_ROOT', BASE_DIR / 'exports'))